@@ -0,0 +1,132 @@
+"""HTTP clients for slide-generator and voice-generator.
+
+The pipeline reuses the services' renderers rather than embedding them:
+slide-generator runs Marp on its resident Chromium pool (with its render
+and per-slide caches), and voice-generator runs KokoroModel behind its
+synthesis cache and admission control. Both clients keep one pooled
+``requests.Session`` and retry requests the service rejected as
+overloaded (429/503), honouring ``Retry-After``.
+"""
+import logging
+import os
+import tempfile
+import time
+import zipfile
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Longest wait between retries, whatever Retry-After says
+MAX_RETRY_WAIT = 10.0
+
+
+class UpstreamError(Exception):
+    """A service failed the request; *details* holds its error body."""
+
+    def __init__(self, message: str, details: str = "") -> None:
+        super().__init__(message)
+        self.details = details
+
+
+def _session(pool_size: int) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _post(session: requests.Session, url: str, payload: dict, timeout: float, retries: int) -> requests.Response:
+    """POST *payload* and return the streamed response, retrying 429/503."""
+    for attempt in range(retries + 1):
+        try:
+            response = session.post(url, json=payload, timeout=timeout, stream=True)
+        except requests.RequestException as exc:
+            raise UpstreamError(f"{url} is unreachable", str(exc))
+        if response.status_code in (429, 503) and attempt < retries:
+            wait = min(float(response.headers.get("Retry-After") or 1), MAX_RETRY_WAIT)
+            logger.info("%s is busy (%d); retrying in %.0fs", url, response.status_code, wait)
+            response.close()
+            time.sleep(wait)
+            continue
+        if not response.ok:
+            details = response.text
+            response.close()
+            raise UpstreamError(f"{url} returned {response.status_code}", details)
+        return response
+    raise AssertionError("unreachable")
+
+
+def _download(response: requests.Response, path: str) -> None:
+    with response, open(path, "wb") as f:
+        for chunk in response.iter_content(256 * 1024):
+            f.write(chunk)
+
+
+class SlideClient:
+    """Renders decks to per-slide PNGs with slide-generator."""
+
+    def __init__(self, base_url: str, timeout: float, retries: int = 3) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.session = _session(4)
+
+    def render_images(self, markdown: str, directory: str, width: Optional[int] = None) -> list[str]:
+        """Render *markdown* to one PNG per slide in *directory*; return their
+        paths in slide order."""
+        payload = {
+            "markdown": markdown,
+            "outputs": ["png"],
+            "package": "zip",
+            "timeout": self.timeout,
+        }
+        if width:
+            payload["png_width"] = width
+        # A little longer than the render itself, for the queue and transfer
+        response = _post(self.session, f"{self.base_url}/generate", payload, self.timeout + 30, self.retries)
+        fd, archive = tempfile.mkstemp(dir=directory, suffix=".zip")
+        os.close(fd)
+        try:
+            _download(response, archive)
+            with zipfile.ZipFile(archive) as zf:
+                # png/slide-001.png, png/slide-002.png, ... sort in slide order
+                names = sorted(name for name in zf.namelist() if name.startswith("png/") and name.endswith(".png"))
+                paths = []
+                for name in names:
+                    path = os.path.join(directory, os.path.basename(name))
+                    with zf.open(name) as src, open(path, "wb") as dst:
+                        while chunk := src.read(256 * 1024):
+                            dst.write(chunk)
+                    paths.append(path)
+        finally:
+            os.remove(archive)
+        return paths
+
+
+class VoiceClient:
+    """Synthesises narration with voice-generator."""
+
+    def __init__(self, base_url: str, timeout: float, retries: int = 3, pool_size: int = 4) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.session = _session(pool_size)
+
+    def synthesise(self, text: str, path: str, model: str, voice: str, speed: float, language: str) -> None:
+        """Write the narration of *text* to *path* as WAV."""
+        payload = {
+            "text": text,
+            "model": model,
+            "voice": voice,
+            "speed": speed,
+            "language": language,
+            "format": "wav",
+            # A deck's narration is bulk work; previews go first
+            "priority": "bulk",
+        }
+        response = _post(self.session, f"{self.base_url}/generate", payload, self.timeout, self.retries)
+        _download(response, path)
@@ -0,0 +1,63 @@
+"""Application configuration.
+
+All values are read from environment variables with sensible defaults so the
+service works out-of-the-box locally while remaining fully configurable in
+Docker deployments.
+"""
+import os
+
+# --------------------------------------------------------------------------
+# Server
+# --------------------------------------------------------------------------
+HOST: str = os.getenv("HOST", "0.0.0.0")
+PORT: int = int(os.getenv("PORT", "8100"))
+LOG_LEVEL: str = os.getenv("LOG_LEVEL", "info")
+
+# --------------------------------------------------------------------------
+# Upstream services
+# --------------------------------------------------------------------------
+SLIDE_GENERATOR_URL: str = os.getenv("SLIDE_GENERATOR_URL", "http://slide_generator:5000")
+VOICE_GENERATOR_URL: str = os.getenv("VOICE_GENERATOR_URL", "http://voice-generator:8000")
+# Longest the slide render may take, in seconds (passed on as its job timeout)
+RENDER_TIMEOUT: float = float(os.getenv("RENDER_TIMEOUT", "300"))
+# Longest one slide's narration may take, in seconds
+TTS_TIMEOUT: float = float(os.getenv("TTS_TIMEOUT", "120"))
+# Slides narrated at once; voice-generator's admission control queues the rest
+TTS_PARALLELISM: int = int(os.getenv("TTS_PARALLELISM", "4"))
+# Retries of a request the upstream rejected as overloaded (429/503)
+UPSTREAM_RETRIES: int = int(os.getenv("UPSTREAM_RETRIES", "3"))
+
+# --------------------------------------------------------------------------
+# Narration defaults (see voice-generator)
+# --------------------------------------------------------------------------
+DEFAULT_MODEL: str = os.getenv("DEFAULT_TTS_MODEL", "kokoro")
+DEFAULT_VOICE: str = os.getenv("DEFAULT_VOICE", "af_heart")
+DEFAULT_SPEED: float = float(os.getenv("DEFAULT_SPEED", "1.0"))
+DEFAULT_LANGUAGE: str = os.getenv("DEFAULT_LANGUAGE", "a")
+
+# --------------------------------------------------------------------------
+# Video
+# --------------------------------------------------------------------------
+FFMPEG_BINARY: str = os.getenv("FFMPEG_BINARY", "ffmpeg")
+# Slide images are rendered this wide; the video takes their size
+VIDEO_WIDTH: int = int(os.getenv("VIDEO_WIDTH", "1280"))
+# Slides are still images, and every frame costs encode time
+VIDEO_FPS: int = int(os.getenv("VIDEO_FPS", "5"))
+# Silence after each slide's narration, in seconds
+SLIDE_PADDING_S: float = float(os.getenv("SLIDE_PADDING_S", "0.5"))
+# How long a slide without a script is shown, in seconds
+SILENT_SLIDE_S: float = float(os.getenv("SILENT_SLIDE_S", "3"))
+# Slide segments encoded at once
+ENCODE_PARALLELISM: int = int(os.getenv("ENCODE_PARALLELISM", str(max(1, (os.cpu_count() or 2) // 2))))
+# Longest one ffmpeg run may take, in seconds
+FFMPEG_TIMEOUT: float = float(os.getenv("FFMPEG_TIMEOUT", "300"))
+
+# --------------------------------------------------------------------------
+# Narrations
+# --------------------------------------------------------------------------
+# Working files and finished videos
+NARRATION_DIR: str = os.getenv("NARRATION_DIR", "/tmp/narrations")
+# Narrations running at once; more get 429
+MAX_CONCURRENT_NARRATIONS: int = int(os.getenv("MAX_CONCURRENT_NARRATIONS", "2"))
+# How long finished videos are kept, in seconds
+NARRATION_TTL: float = float(os.getenv("NARRATION_TTL", "3600"))
@@ -0,0 +1,338 @@
+"""Narrated deck pipeline: slide images and narration produced side by side.
+
+A narration renders the deck to one PNG per slide (slide-generator) while
+the per-slide scripts are synthesised (voice-generator, ``TTS_PARALLELISM``
+at a time). Neither waits for the other: each slide's video segment is
+encoded as soon as its image and its audio both exist, and the segments are
+finally joined without re-encoding. Wall-clock time therefore approaches
+max(render, TTS) plus the last segment and the join, rather than their sum.
+
+Progress is reported through an ``emit`` callback, one event dict per step
+(``started``, ``rendered``, ``narrated``, ``slide_done``, then ``done`` or
+``error``), and the finished narration records per-stage and per-slide
+timings. Narrations live in memory and under ``NARRATION_DIR/<id>/`` until
+``NARRATION_TTL`` after they finish.
+"""
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Optional
+
+import config
+import video
+from clients import SlideClient, UpstreamError, VoiceClient
+
+logger = logging.getLogger(__name__)
+
+Emit = Callable[[dict], None]
+
+
+class PipelineError(Exception):
+    """The narration cannot be produced; *status_code* is the HTTP status to report."""
+
+    def __init__(self, message: str, status_code: int = 500, details: str = "") -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.details = details
+
+
+class Busy(Exception):
+    """``MAX_CONCURRENT_NARRATIONS`` are already running."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(f"{config.MAX_CONCURRENT_NARRATIONS} narrations are already running")
+        self.retry_after = retry_after
+
+
+def _timed(fn: Callable, t0: float) -> Callable:
+    """Wrap *fn* to return (result, started, finished), in seconds since *t0*."""
+
+    def run(*args, **kwargs):
+        started = time.perf_counter() - t0
+        result = fn(*args, **kwargs)
+        return result, started, time.perf_counter() - t0
+
+    return run
+
+
+def _span(intervals: list[tuple[float, float]]) -> float:
+    """Wall-clock seconds from the first start to the last finish."""
+    if not intervals:
+        return 0.0
+    return round(max(end for _, end in intervals) - min(start for start, _ in intervals), 3)
+
+
+class NarrationPipeline:
+    def __init__(
+        self,
+        slides: SlideClient,
+        voice: VoiceClient,
+        root: str,
+        max_concurrent: int,
+        ttl: float,
+    ) -> None:
+        self.slides = slides
+        self.voice = voice
+        self.root = root
+        self.ttl = ttl
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._narrations: dict[str, dict] = {}
+        os.makedirs(root, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Registry
+    # ------------------------------------------------------------------
+
+    def create(self, script_count: int) -> dict:
+        """Register a narration of *script_count* scripts and take a running
+        slot for it; raise Busy when none is free. ``run`` gives it back."""
+        self.sweep()
+        if not self._slots.acquire(blocking=False):
+            raise Busy(retry_after=5)
+        narration = {
+            "id": uuid.uuid4().hex,
+            "status": "running",
+            "scripts": script_count,
+            "created_at": time.time(),
+        }
+        with self._lock:
+            self._narrations[narration["id"]] = narration
+        return narration
+
+    def get(self, narration_id: str) -> Optional[dict]:
+        with self._lock:
+            narration = self._narrations.get(narration_id)
+            return dict(narration) if narration is not None else None
+
+    def video_path(self, narration_id: str) -> str:
+        return os.path.join(self.root, narration_id, "narration.mp4")
+
+    def sweep(self) -> None:
+        """Forget finished narrations older than the TTL and delete their files."""
+        now = time.time()
+        with self._lock:
+            expired = [
+                narration_id
+                for narration_id, narration in self._narrations.items()
+                if narration.get("expires_at", now + 1) <= now
+            ]
+            for narration_id in expired:
+                del self._narrations[narration_id]
+        for narration_id in expired:
+            shutil.rmtree(os.path.join(self.root, narration_id), ignore_errors=True)
+
+    def clear(self) -> None:
+        """Delete everything under the narration directory (left by an earlier process)."""
+        for name in os.listdir(self.root):
+            shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+
+    def _finish(self, narration_id: str, **fields) -> None:
+        now = time.time()
+        with self._lock:
+            self._narrations[narration_id].update(fields, finished_at=now, expires_at=now + self.ttl)
+
+    # ------------------------------------------------------------------
+    # Pipeline
+    # ------------------------------------------------------------------
+
+    def run(
+        self,
+        narration_id: str,
+        markdown: str,
+        scripts: list[str],
+        emit: Emit,
+        model: str,
+        voice: str,
+        speed: float,
+        language: str,
+        png_width: Optional[int] = None,
+    ) -> None:
+        """Produce the narration's video, emitting progress events. Never
+        raises: a failure is emitted as an ``error`` event and recorded."""
+        workdir = os.path.join(self.root, narration_id)
+        try:
+            os.makedirs(workdir)
+            emit({"event": "started", "id": narration_id, "scripts": len(scripts)})
+            timings = self._produce(workdir, markdown, scripts, emit, model, voice, speed, language, png_width)
+        except Exception as exc:
+            if isinstance(exc, PipelineError):
+                error = {"error": str(exc), "details": exc.details, "status_code": exc.status_code}
+            else:
+                logger.exception("Narration %s failed", narration_id)
+                error = {"error": "Narration failed", "details": str(exc), "status_code": 500}
+            shutil.rmtree(workdir, ignore_errors=True)
+            self._finish(narration_id, status="failed", error=error)
+            emit({"event": "error", "id": narration_id, **error})
+        else:
+            self._finish(narration_id, status="done", timings=timings)
+            emit({"event": "done", "id": narration_id, "timings": timings})
+        finally:
+            self._slots.release()
+
+    def _produce(
+        self,
+        workdir: str,
+        markdown: str,
+        scripts: list[str],
+        emit: Emit,
+        model: str,
+        voice: str,
+        speed: float,
+        language: str,
+        png_width: Optional[int],
+    ) -> dict:
+        t0 = time.perf_counter()
+        slides_dir = os.path.join(workdir, "slides")
+        audio_dir = os.path.join(workdir, "audio")
+        segment_dir = os.path.join(workdir, "segments")
+        for directory in (slides_dir, audio_dir, segment_dir):
+            os.makedirs(directory)
+
+        def elapsed() -> float:
+            return round(time.perf_counter() - t0, 3)
+
+        def narrate(index: int) -> tuple[str, float]:
+            path = os.path.join(audio_dir, f"slide-{index + 1:03d}.wav")
+            self.voice.synthesise(scripts[index], path, model, voice, speed, language)
+            return path, video.wav_duration(path)
+
+        def encode(index: int) -> str:
+            path = os.path.join(segment_dir, f"slide-{index + 1:03d}.mp4")
+            if index in audio:
+                wav, duration = audio[index]
+                duration += config.SLIDE_PADDING_S
+            else:
+                wav, duration = None, config.SILENT_SLIDE_S
+            video.encode_segment(
+                config.FFMPEG_BINARY, images[index], wav, path, duration, config.VIDEO_FPS, config.FFMPEG_TIMEOUT
+            )
+            return path
+
+        render_pool = ThreadPoolExecutor(1, thread_name_prefix="render")
+        tts_pool = ThreadPoolExecutor(config.TTS_PARALLELISM, thread_name_prefix="tts")
+        encode_pool = ThreadPoolExecutor(config.ENCODE_PARALLELISM, thread_name_prefix="encode")
+        pools = (render_pool, tts_pool, encode_pool)
+
+        # future -> (stage, slide index)
+        pending: dict[Future, tuple[str, Optional[int]]] = {
+            render_pool.submit(_timed(self.slides.render_images, t0), markdown, slides_dir, png_width): ("render", None)
+        }
+        for index, script in enumerate(scripts):
+            # Blank scripts are silent slides
+            if script.strip():
+                pending[tts_pool.submit(_timed(narrate, t0), index)] = ("tts", index)
+
+        images: Optional[list[str]] = None
+        audio: dict[int, tuple[str, float]] = {}
+        segments: dict[int, str] = {}
+        per_slide: dict[int, dict] = {}
+        render_span = (0.0, 0.0)
+        tts_spans: list[tuple[float, float]] = []
+        encode_spans: list[tuple[float, float]] = []
+
+        def encode_when_ready(index: int) -> None:
+            pending[encode_pool.submit(_timed(encode, t0), index)] = ("encode", index)
+
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, index = pending.pop(future)
+                    try:
+                        result, started, finished = future.result()
+                    except UpstreamError as exc:
+                        service = "Slide render" if stage == "render" else f"Narration of slide {index + 1}"
+                        raise PipelineError(f"{service} failed: {exc}", 502, exc.details)
+                    except video.EncodeError as exc:
+                        raise PipelineError(f"Encoding slide {index + 1} failed: {exc}", 500, exc.details)
+
+                    if stage == "render":
+                        images, render_span = result, (started, finished)
+                        if not images:
+                            raise PipelineError("The deck has no slides", 400)
+                        if len(scripts) > len(images):
+                            raise PipelineError(f"{len(scripts)} scripts for a deck of {len(images)} slides", 400)
+                        emit({"event": "rendered", "slides": len(images), "elapsed_s": elapsed()})
+                        for slide in range(len(images)):
+                            per_slide.setdefault(slide, {"slide": slide + 1})
+                            # Narrated slides already synthesised, and silent ones
+                            if slide in audio or slide >= len(scripts) or not scripts[slide].strip():
+                                encode_when_ready(slide)
+                    elif stage == "tts":
+                        audio[index] = result
+                        tts_spans.append((started, finished))
+                        per_slide.setdefault(index, {"slide": index + 1}).update(
+                            tts_s=round(finished - started, 3), audio_s=round(result[1], 3)
+                        )
+                        emit({"event": "narrated", "slide": index + 1, "audio_s": round(result[1], 3), "elapsed_s": elapsed()})
+                        if images is not None:
+                            encode_when_ready(index)
+                    else:
+                        segments[index] = result
+                        encode_spans.append((started, finished))
+                        per_slide[index]["encode_s"] = round(finished - started, 3)
+                        emit({
+                            "event": "slide_done",
+                            "slide": index + 1,
+                            "completed": len(segments),
+                            "total": len(images),
+                            "elapsed_s": elapsed(),
+                        })
+        except BaseException:
+            # Drop the queued work; requests and ffmpeg runs in flight finish
+            # on their own and their output is deleted with the work directory
+            for pool in pools:
+                pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        for pool in pools:
+            pool.shutdown()
+
+        mux_started = time.perf_counter()
+        output = os.path.join(workdir, "narration.mp4")
+        try:
+            video.concat(config.FFMPEG_BINARY, [segments[i] for i in range(len(images))], output, config.FFMPEG_TIMEOUT)
+        except video.EncodeError as exc:
+            raise PipelineError(f"Joining the slides failed: {exc}", 500, exc.details)
+        mux_s = time.perf_counter() - mux_started
+
+        # Only the video is kept
+        for directory in (slides_dir, audio_dir, segment_dir):
+            shutil.rmtree(directory, ignore_errors=True)
+
+        render_s = round(render_span[1] - render_span[0], 3)
+        tts_s = _span(tts_spans)
+        return {
+            "slides": len(images),
+            "narrated": len(audio),
+            "duration_s": round(sum(d for _, d in audio.values()) + len(audio) * config.SLIDE_PADDING_S
+                                + (len(images) - len(audio)) * config.SILENT_SLIDE_S, 3),
+            "render_s": render_s,
+            "tts_s": tts_s,
+            "encode_s": _span(encode_spans),
+            "mux_s": round(mux_s, 3),
+            "total_s": elapsed(),
+            # What running the stages one after another would have cost at least
+            "sequential_s": round(render_s + tts_s, 3),
+            "per_slide": [per_slide[i] for i in range(len(images))],
+        }
+
+
+_pipeline: Optional[NarrationPipeline] = None
+
+
+def get_pipeline() -> NarrationPipeline:
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = NarrationPipeline(
+            SlideClient(config.SLIDE_GENERATOR_URL, config.RENDER_TIMEOUT, config.UPSTREAM_RETRIES),
+            VoiceClient(config.VOICE_GENERATOR_URL, config.TTS_TIMEOUT, config.UPSTREAM_RETRIES, config.TTS_PARALLELISM),
+            config.NARRATION_DIR,
+            config.MAX_CONCURRENT_NARRATIONS,
+            config.NARRATION_TTL,
+        )
+    return _pipeline
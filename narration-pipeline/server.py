@@ -0,0 +1,158 @@
+"""Narration-pipeline microservice: slide markdown + per-slide scripts → narrated MP4.
+
+Routes
+------
+GET  /health                    — liveness probe
+POST /narrations                — start a narration and stream its progress
+                                  as NDJSON events until the video is ready
+GET  /narrations/{id}           — status and per-stage timings
+GET  /narrations/{id}/video     — the finished MP4
+
+Slides are rendered by slide-generator and narration synthesised by
+voice-generator at the same time; see pipeline.py. The stream ends with a
+``done`` event (timings and ``video_url``) or an ``error`` event. A client
+that disconnects does not stop the narration; its status and video stay
+available for ``NARRATION_TTL`` seconds.
+"""
+import json
+import logging
+import queue
+import threading
+from contextlib import asynccontextmanager
+from typing import Iterator, Optional
+
+import uvicorn
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+import config
+from pipeline import Busy, get_pipeline
+
+logging.basicConfig(level=config.LOG_LEVEL.upper())
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """Clear narrations left behind by an earlier process; their registry is gone."""
+    get_pipeline().clear()
+    yield
+
+
+app = FastAPI(
+    title="Narration Pipeline Service",
+    description="Turns slide markdown and per-slide scripts into a narrated MP4.",
+    version="1.0.0",
+    lifespan=lifespan,
+)
+
+
+# ---------------------------------------------------------------------------
+# Request / response schemas
+# ---------------------------------------------------------------------------
+
+class NarrationRequest(BaseModel):
+    markdown: str = Field(..., min_length=1, description="Marp slide markdown")
+    scripts: list[str] = Field(
+        ...,
+        description="Narration per slide, in order; blank or missing trailing entries give silent slides",
+    )
+    model: str = Field(default=config.DEFAULT_MODEL, description="TTS model name")
+    voice: str = Field(default=config.DEFAULT_VOICE, description="Voice identifier")
+    speed: float = Field(default=config.DEFAULT_SPEED, ge=0.5, le=2.0, description="Speech rate multiplier")
+    language: str = Field(default=config.DEFAULT_LANGUAGE, description="Language code")
+    width: Optional[int] = Field(default=None, ge=16, le=3840, description="Video width in px (default VIDEO_WIDTH)")
+
+
+# ---------------------------------------------------------------------------
+# Routes
+# ---------------------------------------------------------------------------
+
+@app.get("/health", tags=["ops"])
+def health() -> dict:
+    return {"status": "ok"}
+
+
+@app.post("/narrations", tags=["narration"], response_class=StreamingResponse)
+def create_narration(req: NarrationRequest) -> StreamingResponse:
+    """Start a narration and stream its progress, one JSON event per line."""
+    pipeline = get_pipeline()
+    try:
+        narration = pipeline.create(len(req.scripts))
+    except Busy as exc:
+        raise HTTPException(status_code=429, detail=str(exc), headers={"Retry-After": str(exc.retry_after)})
+    narration_id = narration["id"]
+    events: queue.Queue = queue.Queue()
+
+    def emit(event: dict) -> None:
+        if event["event"] == "done":
+            event["video_url"] = app.url_path_for("narration_video", narration_id=narration_id)
+        events.put(event)
+
+    def run() -> None:
+        try:
+            pipeline.run(
+                narration_id,
+                req.markdown,
+                req.scripts,
+                emit,
+                model=req.model,
+                voice=req.voice,
+                speed=req.speed,
+                language=req.language,
+                png_width=req.width or config.VIDEO_WIDTH,
+            )
+        finally:
+            events.put(None)
+
+    # The narration runs on its own thread, whether or not anyone is listening
+    threading.Thread(target=run, name=f"narration-{narration_id[:8]}", daemon=True).start()
+
+    def stream() -> Iterator[bytes]:
+        while (event := events.get()) is not None:
+            yield (json.dumps(event) + "\n").encode()
+
+    return StreamingResponse(
+        stream(),
+        media_type="application/x-ndjson",
+        headers={"Location": app.url_path_for("narration_status", narration_id=narration_id)},
+    )
+
+
+@app.get("/narrations/{narration_id}", tags=["narration"])
+def narration_status(narration_id: str) -> dict:
+    narration = get_pipeline().get(narration_id)
+    if narration is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired narration '{narration_id}'")
+    if narration["status"] == "done":
+        narration["video_url"] = app.url_path_for("narration_video", narration_id=narration_id)
+    return narration
+
+
+@app.get("/narrations/{narration_id}/video", tags=["narration"], response_class=FileResponse)
+def narration_video(narration_id: str) -> FileResponse:
+    pipeline = get_pipeline()
+    narration = pipeline.get(narration_id)
+    if narration is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired narration '{narration_id}'")
+    if narration["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Narration is {narration['status']}")
+    return FileResponse(
+        pipeline.video_path(narration_id),
+        media_type="video/mp4",
+        filename=f"narration_{narration_id}.mp4",
+    )
+
+
+# ---------------------------------------------------------------------------
+# Entrypoint
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    uvicorn.run(
+        "server:app",
+        host=config.HOST,
+        port=config.PORT,
+        log_level=config.LOG_LEVEL,
+    )
@@ -0,0 +1,88 @@
+"""ffmpeg helpers: one MP4 segment per slide, then a lossless concatenation.
+
+Every segment is encoded with the same codec settings (H.264 still-image
+tune, yuv420p, AAC 48 kHz stereo), so the final video is a stream copy of
+the segments in order and segments can be encoded in parallel, each as soon
+as its slide image and narration exist.
+"""
+import logging
+import os
+import subprocess
+import wave
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+AUDIO_RATE = 48000
+
+
+class EncodeError(Exception):
+    """ffmpeg failed; *details* holds its error output."""
+
+    def __init__(self, message: str, details: str = "") -> None:
+        super().__init__(message)
+        self.details = details
+
+
+def wav_duration(path: str) -> float:
+    """Length of the WAV file at *path* in seconds."""
+    with wave.open(path, "rb") as f:
+        return f.getnframes() / f.getframerate()
+
+
+def _run(cmd: list[str], timeout: float) -> None:
+    logger.debug("Executing: %s", " ".join(cmd))
+    try:
+        subprocess.run(cmd, check=True, capture_output=True, text=True, timeout=timeout)
+    except subprocess.CalledProcessError as exc:
+        raise EncodeError("ffmpeg failed", exc.stderr)
+    except subprocess.TimeoutExpired:
+        raise EncodeError(f"ffmpeg did not finish within {timeout:.0f}s")
+
+
+def encode_segment(
+    ffmpeg: str,
+    image: str,
+    audio: Optional[str],
+    output: str,
+    duration: float,
+    fps: int,
+    timeout: float,
+) -> None:
+    """Show *image* for *duration* seconds over *audio* (silence if None),
+    padding the audio with silence to the full duration."""
+    cmd = [ffmpeg, "-y", "-hide_banner", "-loglevel", "error", "-loop", "1", "-framerate", str(fps), "-i", image]
+    if audio is not None:
+        cmd += ["-i", audio]
+    else:
+        cmd += ["-f", "lavfi", "-i", f"anullsrc=r={AUDIO_RATE}:cl=stereo"]
+    cmd += [
+        "-t", f"{duration:.3f}",
+        # H.264 needs even dimensions
+        "-vf", "scale=trunc(iw/2)*2:trunc(ih/2)*2,format=yuv420p",
+        "-c:v", "libx264", "-preset", "veryfast", "-tune", "stillimage", "-r", str(fps),
+        "-af", "apad",
+        "-c:a", "aac", "-b:a", "128k", "-ar", str(AUDIO_RATE), "-ac", "2",
+        output,
+    ]  # fmt: skip
+    _run(cmd, timeout)
+
+
+def concat(ffmpeg: str, segments: list[str], output: str, timeout: float) -> None:
+    """Join *segments* (encoded alike) into *output* without re-encoding."""
+    listing = output + ".txt"
+    with open(listing, "w") as f:
+        for segment in segments:
+            f.write(f"file '{os.path.abspath(segment)}'\n")
+    try:
+        _run(
+            [
+                ffmpeg, "-y", "-hide_banner", "-loglevel", "error",
+                "-f", "concat", "-safe", "0", "-i", listing,
+                "-c", "copy", "-movflags", "+faststart",
+                output,
+            ],  # fmt: skip
+            timeout,
+        )
+    finally:
+        os.remove(listing)
@@ -0,0 +1,334 @@
+"""Prefetch remote images referenced by a deck.
+
+Decks often pull pictures from the web (``![bg left:40%](https://...)``),
+which Chromium would fetch again on every render, adding latency that
+depends on someone else's server and failing the render when it times out.
+`AssetPrefetcher.localize` finds the image URLs in the markdown (markdown
+images, ``<img src>`` and CSS ``url()``), downloads the ones not already
+cached concurrently over one pooled HTTP session, and rewrites the markdown
+to point at local copies in the render's working directory, which Marp then
+loads as local files.
+
+Downloads are kept in their own `RenderCache` directory (``ASSET_CACHE_DIR``),
+bounded in size and age like the render cache. With Pillow installed,
+raster images larger than the deck's slides (times
+``ASSET_RESOLUTION_SCALE``) are downscaled before they are cached, so big
+originals are neither decoded nor embedded at full size. An image that
+cannot be fetched keeps its remote URL and is left to Chromium as before.
+"""
+import importlib.util
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from render_cache import RenderCache
+
+logger = logging.getLogger(__name__)
+
+# Subdirectory of the working directory the local copies are placed in
+ASSET_DIR = "assets"
+
+_SUFFIXES = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "image/gif": ".gif",
+    "image/avif": ".avif",
+    "image/svg+xml": ".svg",
+}
+# Unknown image types are still cached; Chromium sniffs raster formats
+_FALLBACK_SUFFIX = ".img"
+_ALL_SUFFIXES = tuple(_SUFFIXES.values()) + (_FALLBACK_SUFFIX,)
+
+# Formats Pillow downscales (and writes back in the same format)
+_DOWNSCALE_FORMATS = {"JPEG", "PNG", "WEBP"}
+
+# Slide sizes (px) of Marp's built-in ``size`` presets; 16:9 is the default
+_SLIDE_SIZES = {"16:9": (1280, 720), "4:3": (960, 720)}
+
+_FENCE = re.compile(r"^(`{3,}|~{3,}).*?^\1[ \t]*$", re.MULTILINE | re.DOTALL)
+_URL_PATTERNS = (
+    # ![alt](url "title") and ![bg left:40%](<url>)
+    re.compile(r"!\[[^\]]*\]\(\s*<?(?P<url>https?://[^\s)>]+)>?"),
+    # <img src="url">
+    re.compile(r"<img\b[^>]*?\ssrc\s*=\s*[\"'](?P<url>https?://[^\"']+)[\"']", re.IGNORECASE),
+    # url(...) in style blocks and backgroundImage directives
+    re.compile(r"url\(\s*[\"']?(?P<url>https?://[^\"')\s]+)[\"']?\s*\)", re.IGNORECASE),
+)
+_SIZE_DIRECTIVE = re.compile(r"^size:\s*(?P<size>\S+)\s*$", re.MULTILINE)
+
+
+class AssetError(Exception):
+    """A remote image could not be fetched or stored."""
+
+
+def _outside_code(markdown: str, rewrite: Callable[[str], str]) -> str:
+    """Apply *rewrite* to *markdown* except inside fenced code blocks."""
+    parts, start = [], 0
+    for fence in _FENCE.finditer(markdown):
+        parts.append(rewrite(markdown[start:fence.start()]))
+        parts.append(fence.group(0))
+        start = fence.end()
+    parts.append(rewrite(markdown[start:]))
+    return "".join(parts)
+
+
+def image_urls(markdown: str) -> list[str]:
+    """Remote image URLs referenced by *markdown*, in order of first use."""
+    urls: list[str] = []
+
+    def collect(text: str) -> str:
+        for pattern in _URL_PATTERNS:
+            urls.extend(match.group("url") for match in pattern.finditer(text))
+        return text
+
+    _outside_code(markdown, collect)
+    return list(dict.fromkeys(urls))
+
+
+def slide_size(markdown: str) -> tuple[int, int]:
+    """Slide size in px from the deck's front-matter ``size`` directive."""
+    if markdown.startswith("---"):
+        end = markdown.find("\n---", 3)
+        match = _SIZE_DIRECTIVE.search(markdown[3:end if end != -1 else None])
+        if match:
+            return _SLIDE_SIZES.get(match.group("size").strip("\"'"), _SLIDE_SIZES["16:9"])
+    return _SLIDE_SIZES["16:9"]
+
+
+def downscale(path: str, box: tuple[int, int]) -> bool:
+    """Shrink the raster image at *path* in place so it still covers *box*.
+
+    Returns False (leaving the file alone) if Pillow is missing, the format
+    is not a still JPEG/PNG/WebP, or the image is already small enough.
+    """
+    try:
+        from PIL import Image, ImageOps  # noqa: PLC0415
+    except ImportError:
+        return False
+    with Image.open(path) as image:
+        if image.format not in _DOWNSCALE_FORMATS or getattr(image, "is_animated", False):
+            return False
+        image_format = image.format
+        # Sized to cover the box, as a ``bg`` image does, not to fit in it
+        scale = max(box[0] / image.width, box[1] / image.height)
+        if scale >= 1:
+            return False
+        # Apply the EXIF orientation before it is dropped with the metadata
+        image = ImageOps.exif_transpose(image)
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        resized = image.resize(size, Image.LANCZOS)
+    options = {"quality": 90} if image_format in ("JPEG", "WEBP") else {"optimize": True}
+    tmp = path + ".resized"
+    resized.save(tmp, image_format, **options)
+    os.replace(tmp, path)
+    return True
+
+
+class AssetPrefetcher:
+    """Downloads remote images into a `RenderCache` and localises decks."""
+
+    def __init__(
+        self,
+        cache: RenderCache,
+        concurrency: int = 8,
+        timeout: float = 10.0,
+        max_bytes: int = 20 * 1024 * 1024,
+        resolution_scale: Optional[float] = 2.0,
+    ) -> None:
+        self.cache = cache
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        if resolution_scale and importlib.util.find_spec("PIL") is None:
+            logger.warning("Pillow is not installed; remote images are cached at full size")
+            resolution_scale = None
+        # None or 0 disables downscaling
+        self.resolution_scale = resolution_scale
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.concurrency,
+            pool_maxsize=self.concurrency,
+            # One retry for refused connections and gateway errors; a read
+            # timeout is not retried, it already cost ``timeout``
+            max_retries=Retry(
+                total=1, read=False, backoff_factor=0.2, status_forcelist=(502, 503, 504), allowed_methods=["GET"]
+            ),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._lock = threading.Lock()
+        # One lock per URL being fetched, so concurrent renders fetch it once
+        self._inflight: dict[str, threading.Lock] = {}
+        self.cached = 0
+        self.fetched = 0
+        self.failures = 0
+        self.bytes_fetched = 0
+
+    # ------------------------------------------------------------------
+
+    def _box(self, markdown: str) -> Optional[tuple[int, int]]:
+        if not self.resolution_scale:
+            return None
+        width, height = slide_size(markdown)
+        return round(width * self.resolution_scale), round(height * self.resolution_scale)
+
+    def _lookup(self, key: str) -> Optional[str]:
+        for suffix in _ALL_SUFFIXES:
+            path = self.cache.get(key, suffix)
+            if path is not None:
+                return path
+        return None
+
+    def _download(self, url: str, box: Optional[tuple[int, int]]) -> tuple[str, str]:
+        """Fetch *url* into a temporary file in the cache directory; return
+        ``(path, suffix)``."""
+        fd, tmp = tempfile.mkstemp(dir=self.cache.directory, prefix=".tmp-asset-")
+        try:
+            with os.fdopen(fd, "wb") as f, self.session.get(url, stream=True, timeout=self.timeout) as response:
+                response.raise_for_status()
+                content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+                if not content_type.startswith("image/"):
+                    raise AssetError(f"{url} is not an image ({content_type or 'no Content-Type'})")
+                size = 0
+                for chunk in response.iter_content(64 * 1024):
+                    size += len(chunk)
+                    if self.max_bytes and size > self.max_bytes:
+                        raise AssetError(f"{url} is larger than {self.max_bytes} bytes")
+                    f.write(chunk)
+            suffix = _SUFFIXES.get(content_type)
+            if suffix is None:
+                extension = os.path.splitext(urlparse(url).path)[1].lower()
+                suffix = extension if extension in _ALL_SUFFIXES else _FALLBACK_SUFFIX
+            with self._lock:
+                self.bytes_fetched += size
+            if box is not None and suffix != ".svg":
+                try:
+                    downscale(tmp, box)
+                except Exception as exc:
+                    # Not every file labelled image/* decodes; keep the original
+                    logger.warning("Could not downscale %s: %s", url, exc)
+            return tmp, suffix
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+    def fetch(self, url: str, box: Optional[tuple[int, int]] = None) -> str:
+        """Return the cached copy of *url* (downscaled to cover *box*),
+        downloading it first if needed. Raises AssetError or
+        ``requests.RequestException`` on failure."""
+        key = self.cache.key(url, {"format": "asset", "box": box})
+        path = self._lookup(key)
+        if path is None:
+            with self._lock:
+                inflight = self._inflight.setdefault(key, threading.Lock())
+            try:
+                with inflight:
+                    path = self._lookup(key)
+                    if path is None:
+                        tmp, suffix = self._download(url, box)
+                        path = self.cache.put(key, tmp, suffix)
+                        with self._lock:
+                            self.fetched += 1
+                        return path
+            finally:
+                with self._lock:
+                    if self._inflight.get(key) is inflight and not inflight.locked():
+                        del self._inflight[key]
+        with self._lock:
+            self.cached += 1
+        return path
+
+    def _place(self, url: str, box: Optional[tuple[int, int]], directory: str) -> str:
+        """Put a copy of *url* into *directory*; return its path relative to it."""
+        path = self.fetch(url, box)
+        name = os.path.join(ASSET_DIR, os.path.basename(path))
+        target = os.path.join(directory, name)
+        if not os.path.exists(target):
+            # A hard link survives the cache evicting the entry mid-render;
+            # copy when the scratch space is on another filesystem
+            try:
+                os.link(path, target)
+            except OSError as exc:
+                if isinstance(exc, FileNotFoundError) and not os.path.exists(path):
+                    raise AssetError(f"{url} was evicted before it could be used")
+                shutil.copyfile(path, target)
+        return name
+
+    def localize(self, markdown: str, directory: str) -> tuple[str, dict]:
+        """Fetch the remote images of *markdown* into *directory* and return
+        ``(markdown, stats)``, the markdown pointing at the local copies by
+        paths relative to *directory* (so render there)."""
+        urls = image_urls(markdown)
+        stats = {"images": len(urls), "failed": 0}
+        if not urls:
+            return markdown, stats
+        os.makedirs(os.path.join(directory, ASSET_DIR), exist_ok=True)
+        box = self._box(markdown)
+
+        def place(url: str) -> Optional[str]:
+            try:
+                return self._place(url, box, directory)
+            except (AssetError, requests.RequestException, OSError) as exc:
+                logger.warning("Leaving %s to the browser: %s", url, exc)
+                with self._lock:
+                    self.failures += 1
+                return None
+
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(urls)), thread_name_prefix="asset-fetch") as pool:
+            local = {url: name for url, name in zip(urls, pool.map(place, urls)) if name is not None}
+        stats["failed"] = len(urls) - len(local)
+
+        def rewrite(text: str) -> str:
+            for pattern in _URL_PATTERNS:
+                text = pattern.sub(
+                    lambda m: m.group(0).replace(m.group("url"), local.get(m.group("url"), m.group("url"))), text
+                )
+            return text
+
+        return _outside_code(markdown, rewrite), stats
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = {
+                "cached": self.cached,
+                "fetched": self.fetched,
+                "failures": self.failures,
+                "bytes_fetched": self.bytes_fetched,
+            }
+        return {**counters, "cache": self.cache.stats()}
+
+
+_PREFETCHER: Optional[AssetPrefetcher] = None
+_PREFETCHER_LOCK = threading.Lock()
+
+
+def get_asset_prefetcher() -> AssetPrefetcher:
+    """Return the process-wide asset prefetcher, built from config on first use."""
+    import config  # local import to avoid circular dependency at module level
+
+    global _PREFETCHER
+    with _PREFETCHER_LOCK:
+        if _PREFETCHER is None:
+            _PREFETCHER = AssetPrefetcher(
+                cache=RenderCache(
+                    directory=config.ASSET_CACHE_DIR,
+                    max_bytes=config.ASSET_CACHE_MAX_BYTES,
+                    ttl=config.ASSET_CACHE_TTL,
+                ),
+                concurrency=config.ASSET_FETCH_CONCURRENCY,
+                timeout=config.ASSET_FETCH_TIMEOUT,
+                max_bytes=config.ASSET_MAX_BYTES,
+                resolution_scale=config.ASSET_RESOLUTION_SCALE if config.ASSET_DOWNSCALE else None,
+            )
+    return _PREFETCHER
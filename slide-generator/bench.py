@@ -0,0 +1,133 @@
+"""Compare per-request ``marp`` CLI renders with the resident render pool.
+
+Renders the same deck ``--runs`` times through each path (``--concurrency``
+at a time) and prints latency percentiles and the pool's speedup as JSON.
+The pool is warmed first, as it would be in the running service; the CLI
+path has no warm state to build.
+
+    python bench.py --runs 20 --concurrency 2
+    python bench.py --markdown deck.md --pool-size 4 --concurrency 4
+
+``--incremental`` instead times a cold per-slide render of the deck and a
+re-render after editing one slide (see ``renderer.render_slides``),
+using the pool configured by RENDER_POOL_SIZE and a throwaway cache.
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import config
+from render_pool import RenderPool
+from renderer import render_cli
+
+
+def _default_markdown() -> str:
+    from test import markdown_payload
+    return markdown_payload
+
+
+def _measure(render: Callable[[str], None], runs: int, concurrency: int, workdir: str) -> dict:
+    def one(index: int) -> float:
+        output = os.path.join(workdir, f"bench_{index}.pdf")
+        start = time.perf_counter()
+        render(output)
+        elapsed = time.perf_counter() - start
+        os.remove(output)
+        return elapsed
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = sorted(pool.map(one, range(runs)))
+    wall = time.perf_counter() - start
+    return {
+        "runs": runs,
+        "wall_s": round(wall, 3),
+        "renders_per_s": round(runs / wall, 3),
+        "mean_s": round(statistics.mean(latencies), 4),
+        "p50_s": round(latencies[len(latencies) // 2], 4),
+        "p95_s": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 4),
+    }
+
+
+def _incremental(markdown: str) -> dict:
+    import render_cache  # noqa: PLC0415
+    from renderer import render_slides  # noqa: PLC0415
+
+    with tempfile.TemporaryDirectory(prefix="slide-bench-") as workdir:
+        cache = render_cache.RenderCache(os.path.join(workdir, "cache"), max_bytes=0, ttl=0)
+        output = os.path.join(workdir, "deck.pdf")
+        report = {"pool_size": config.RENDER_POOL_SIZE, "parallelism": config.RENDER_PARALLELISM}
+        for label, deck in (
+            ("cold", markdown),
+            ("unchanged", markdown),
+            # Appending to the last slide changes exactly one page
+            ("one_slide_edited", markdown.rstrip() + "\n\n*Edited for the benchmark.*\n"),
+        ):
+            start = time.perf_counter()
+            reused, rendered = render_slides(deck, workdir, {"pdf": output}, cache=cache)
+            report[label] = {
+                "seconds": round(time.perf_counter() - start, 4),
+                "slides_reused": reused,
+                "slides_rendered": rendered,
+            }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--markdown", help="Deck to render (default: the deck from test.py).")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--pool-size", type=int, default=None, help="Render workers (default: --concurrency).")
+    parser.add_argument("--skip-cli", action="store_true", help="Only measure the pool.")
+    parser.add_argument("--incremental", action="store_true", help="Time per-slide re-rendering instead.")
+    args = parser.parse_args()
+
+    if args.markdown:
+        with open(args.markdown) as f:
+            markdown = f.read()
+    else:
+        markdown = _default_markdown()
+    base_dir = os.path.dirname(os.path.abspath(args.markdown)) if args.markdown else os.getcwd()
+
+    if args.incremental:
+        print(json.dumps(_incremental(markdown), indent=2))
+        return
+
+    report: dict = {"concurrency": args.concurrency}
+    with tempfile.TemporaryDirectory(prefix="slide-bench-") as workdir:
+        if not args.skip_cli:
+            report["cli"] = _measure(
+                lambda output: render_cli(markdown, output, base_dir), args.runs, args.concurrency, workdir
+            )
+
+        pool = RenderPool(size=args.pool_size or args.concurrency)
+        try:
+            start = time.perf_counter()
+            pool.warm()
+            report["pool_warmup_s"] = round(time.perf_counter() - start, 3)
+            report["pool"] = _measure(
+                lambda output: pool.render(
+                    {"markdown": markdown, "base_dir": base_dir, "allow_local_files": True, "outputs": {"pdf": output}}
+                ),
+                args.runs,
+                args.concurrency,
+                workdir,
+            )
+            report["pool"]["stats"] = pool.stats()
+        finally:
+            pool.close()
+
+    if "cli" in report:
+        report["speedup_p50"] = round(report["cli"]["p50_s"] / report["pool"]["p50_s"], 2)
+        report["speedup_throughput"] = round(report["pool"]["renders_per_s"] / report["cli"]["renders_per_s"], 2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Application configuration.
+
+All values are read from environment variables with sensible defaults so the
+service works out-of-the-box locally while remaining fully configurable in
+Docker deployments.
+"""
+import os
+
+# --------------------------------------------------------------------------
+# Server
+# --------------------------------------------------------------------------
+HOST: str = os.getenv("HOST", "0.0.0.0")
+PORT: int = int(os.getenv("PORT", "5000"))
+LOG_LEVEL: str = os.getenv("LOG_LEVEL", "info")
+# gunicorn processes and request threads per process (gunicorn.conf.py).
+# Every process has its own render pool and job runner, so it runs up to
+# RENDER_POOL_SIZE browsers.
+WEB_WORKERS: int = int(os.getenv("WEB_WORKERS", "2"))
+WEB_THREADS: int = int(os.getenv("WEB_THREADS", "8"))
+
+# --------------------------------------------------------------------------
+# Marp
+# --------------------------------------------------------------------------
+# CLI used when the render pool is disabled (and as the benchmark baseline)
+MARP_BINARY: str = os.getenv("MARP_BINARY", "marp")
+NODE_BINARY: str = os.getenv("NODE_BINARY", "node")
+# Longest a single render may take before its worker is killed, in seconds
+RENDER_TIMEOUT: float = float(os.getenv("RENDER_TIMEOUT", "60"))
+
+# --------------------------------------------------------------------------
+# Render worker pool
+# --------------------------------------------------------------------------
+# Resident Node processes (render_worker.js), each keeping one headless
+# Chromium alive between renders; 0 shells out to the marp CLI per request
+RENDER_POOL_SIZE: int = int(os.getenv("RENDER_POOL_SIZE", "2"))
+# Replace a worker after this many renders ...
+RENDER_WORKER_MAX_RENDERS: int = int(os.getenv("RENDER_WORKER_MAX_RENDERS", "200"))
+# ... or once it and its browser use more than this much memory (0 = no limit)
+RENDER_WORKER_MAX_RSS_MB: int = int(os.getenv("RENDER_WORKER_MAX_RSS_MB", "1024"))
+# How long a new worker may take to launch its browser, in seconds
+RENDER_WORKER_STARTUP_TIMEOUT: float = float(os.getenv("RENDER_WORKER_STARTUP_TIMEOUT", "30"))
+# Workers one document's changed slides are spread across
+RENDER_PARALLELISM: int = int(os.getenv("RENDER_PARALLELISM", str(max(1, RENDER_POOL_SIZE))))
+
+# --------------------------------------------------------------------------
+# Scratch space and render cache
+# --------------------------------------------------------------------------
+# Per-render working directories, removed after each render; a tmpfs such
+# as /dev/shm keeps intermediate files off disk
+SCRATCH_DIR: str = os.getenv("SCRATCH_DIR", "/tmp/slide-scratch")
+# Rendered documents keyed by a hash of the markdown and render options
+RENDER_CACHE_ENABLED: bool = os.getenv("RENDER_CACHE_ENABLED", "true").lower() == "true"
+RENDER_CACHE_DIR: str = os.getenv("RENDER_CACHE_DIR", "/tmp/slide-cache")
+RENDER_CACHE_MAX_BYTES: int = int(os.getenv("RENDER_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+# Entries unused for this many seconds expire; 0 keeps them until evicted for space
+RENDER_CACHE_TTL: float = float(os.getenv("RENDER_CACHE_TTL", str(7 * 24 * 3600)))
+# Widest PNG a request may ask for, in px
+PNG_MAX_WIDTH: int = int(os.getenv("PNG_MAX_WIDTH", "3840"))
+# Cache every slide as its own page too, so an edited deck only re-renders
+# the slides that changed. Needs the render pool and the render cache.
+SLIDE_CACHE_ENABLED: bool = os.getenv("SLIDE_CACHE_ENABLED", "true").lower() == "true"
+
+# --------------------------------------------------------------------------
+# Remote image prefetch
+# --------------------------------------------------------------------------
+# Download the remote images a deck references before rendering and point
+# the deck at local copies, instead of leaving every render to fetch them
+ASSET_PREFETCH_ENABLED: bool = os.getenv("ASSET_PREFETCH_ENABLED", "true").lower() == "true"
+ASSET_CACHE_DIR: str = os.getenv("ASSET_CACHE_DIR", "/tmp/slide-assets")
+ASSET_CACHE_MAX_BYTES: int = int(os.getenv("ASSET_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+ASSET_CACHE_TTL: float = float(os.getenv("ASSET_CACHE_TTL", str(24 * 3600)))
+# Downloads in flight at once (and pooled connections)
+ASSET_FETCH_CONCURRENCY: int = int(os.getenv("ASSET_FETCH_CONCURRENCY", "8"))
+ASSET_FETCH_TIMEOUT: float = float(os.getenv("ASSET_FETCH_TIMEOUT", "10"))
+# Larger images are left to the browser
+ASSET_MAX_BYTES: int = int(os.getenv("ASSET_MAX_BYTES", str(20 * 1024 * 1024)))
+# Shrink raster images (needs Pillow) to the slide size times this scale
+ASSET_DOWNSCALE: bool = os.getenv("ASSET_DOWNSCALE", "true").lower() == "true"
+ASSET_RESOLUTION_SCALE: float = float(os.getenv("ASSET_RESOLUTION_SCALE", "2"))
+
+# --------------------------------------------------------------------------
+# Render jobs
+# --------------------------------------------------------------------------
+# Job state and results, shared by all server processes
+JOBS_DIR: str = os.getenv("JOBS_DIR", "/tmp/slide-jobs")
+# Jobs each process renders at once
+JOB_CONCURRENCY: int = int(os.getenv("JOB_CONCURRENCY", str(max(1, RENDER_POOL_SIZE))))
+# Queued jobs (across processes) beyond which submissions get 429
+JOB_QUEUE_MAX: int = int(os.getenv("JOB_QUEUE_MAX", "32"))
+# Time a job may render before it is killed, in seconds; callers may ask
+# for up to JOB_MAX_TIMEOUT
+JOB_TIMEOUT: float = float(os.getenv("JOB_TIMEOUT", "300"))
+JOB_MAX_TIMEOUT: float = float(os.getenv("JOB_MAX_TIMEOUT", "900"))
+# How long /generate waits for its job beyond the job's timeout, to cover
+# time spent queued, before giving up with 504
+JOB_QUEUE_WAIT: float = float(os.getenv("JOB_QUEUE_WAIT", "120"))
+# How long finished jobs and their results are kept, in seconds
+JOB_RESULT_TTL: float = float(os.getenv("JOB_RESULT_TTL", "3600"))
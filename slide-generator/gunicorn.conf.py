@@ -0,0 +1,30 @@
+"""gunicorn settings for the slide generator (``gunicorn -c gunicorn.conf.py server:app``).
+
+Values come from config.py. Every worker process starts its own job runner
+and render pool once it has forked; jobs are shared through JOBS_DIR.
+"""
+# Not "config": gunicorn reads every module-level name as a setting
+import config as app_config
+import scratch
+
+bind = f"{app_config.HOST}:{app_config.PORT}"
+workers = app_config.WEB_WORKERS
+# Threads, so requests waiting on a render (/generate) do not block others
+worker_class = "gthread"
+threads = app_config.WEB_THREADS
+# gthread workers only need to heartbeat; renders are bounded by job timeouts
+timeout = 60
+graceful_timeout = 30
+loglevel = app_config.LOG_LEVEL
+accesslog = "-"
+
+
+def on_starting(server):
+    # Scratch directories of renders that cannot still be running
+    scratch.sweep(max_age=2 * max(app_config.RENDER_TIMEOUT, app_config.JOB_MAX_TIMEOUT))
+
+
+def post_worker_init(worker):
+    from server import start_background  # noqa: PLC0415
+
+    start_background()
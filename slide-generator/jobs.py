@@ -0,0 +1,430 @@
+"""Asynchronous render jobs.
+
+``POST /jobs`` stores the deck as a job and returns at once; the render runs
+in the background and the caller polls ``GET /jobs/<id>`` and fetches
+``GET /jobs/<id>/result`` when it is done, so a long deck never has to fit
+in one HTTP request.
+
+Jobs live on disk (``JOBS_DIR``), so every server process sees every job:
+
+    JOBS_DIR/queue/<created>-<id>   one empty marker per queued job, FIFO by name
+    JOBS_DIR/<id>/job.json          status and metadata, replaced atomically
+    JOBS_DIR/<id>/input.md          the deck
+    JOBS_DIR/<id>/result/           the outputs once done (slides.pdf, png/..., slides.html)
+    JOBS_DIR/<id>/result.zip        all of them, for jobs that asked for a zip
+
+Each process runs a `JobRunner` that starts up to ``JOB_CONCURRENCY`` jobs at
+a time. A runner claims a job by deleting its queue marker, which only one
+process can do. Submissions are rejected (429) once ``JOB_QUEUE_MAX`` jobs
+are waiting. A job that runs past its timeout has its render killed and
+fails with 504. Finished jobs are removed ``JOB_RESULT_TTL`` seconds after
+they finish. A running job whose process died is failed once its deadline
+has long passed, and so is a queued job whose marker is gone (claimed by a
+process that died before starting it) and that stays unchanged across two
+sweeps. A finished job's status is final.
+"""
+import json
+import logging
+import math
+import os
+import shutil
+import tempfile
+import threading
+import time
+import traceback
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Sequence
+
+from renderer import RenderError, RenderTimeout, rendered_outputs
+
+logger = logging.getLogger(__name__)
+
+STATUSES = ("queued", "running", "done", "failed")
+FINISHED = ("done", "failed")
+# How a job's outputs are handed back: the PDF itself (PDF-only jobs), one
+# zip of everything, or a manifest of files fetched one by one
+PACKAGES = ("pdf", "zip", "manifest")
+
+# Already compressed; deflating them again costs time and saves nothing
+_STORED_SUFFIXES = (".pdf", ".png", ".jpg", ".webp", ".gif", ".avif")
+
+# How long past its deadline a running job, or past its creation a claimed
+# job not yet running, may go unreported before it is considered lost with
+# its process
+LOST_GRACE = 60.0
+
+
+class Rejected(Exception):
+    """The job was not accepted; maps to an HTTP error with Retry-After."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+def _error(status_code: int, error: str, details: str) -> dict:
+    return {"status_code": status_code, "error": error, "details": details}
+
+
+class JobStore:
+    """Render jobs on disk, shared by every process using *directory*."""
+
+    def __init__(self, directory: str, max_queued: int, result_ttl: float) -> None:
+        self.directory = directory
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+        self._queue_dir = os.path.join(directory, "queue")
+        os.makedirs(self._queue_dir, exist_ok=True)
+        # Claimed jobs not yet running at the last sweep, by job.json mtime
+        self._unstarted: dict[str, int] = {}
+
+    def _job_dir(self, job_id: str) -> str:
+        # Ids come from URLs; never let one point outside the store
+        if not job_id or os.path.basename(job_id) != job_id or job_id.startswith("."):
+            raise KeyError(job_id)
+        return os.path.join(self.directory, job_id)
+
+    def _write(self, job: dict) -> None:
+        job_dir = self._job_dir(job["id"])
+        fd, tmp = tempfile.mkstemp(dir=job_dir, prefix=".job-")
+        with os.fdopen(fd, "w") as f:
+            json.dump(job, f)
+        os.replace(tmp, os.path.join(job_dir, "job.json"))
+
+    def input_path(self, job_id: str) -> str:
+        return os.path.join(self._job_dir(job_id), "input.md")
+
+    def result_dir(self, job_id: str) -> str:
+        return os.path.join(self._job_dir(job_id), "result")
+
+    def archive_path(self, job_id: str) -> str:
+        return os.path.join(self._job_dir(job_id), "result.zip")
+
+    # ------------------------------------------------------------------
+
+    def depth(self) -> int:
+        """Jobs waiting to start, across all processes."""
+        return sum(1 for name in os.listdir(self._queue_dir) if not name.startswith("."))
+
+    def create(self, markdown: str, options: dict, retry_after: int = 1) -> dict:
+        """Store a new queued job and return it; raises Rejected (429) when
+        the queue is full."""
+        if self.max_queued > 0 and self.depth() >= self.max_queued:
+            raise Rejected(429, "Too many queued render jobs", retry_after)
+        job_id = uuid.uuid4().hex
+        os.makedirs(self._job_dir(job_id))
+        with open(self.input_path(job_id), "w") as f:
+            f.write(markdown)
+        created = time.time()
+        job = {"id": job_id, "status": "queued", "created_at": created, **options}
+        self._write(job)
+        # The marker goes last: a runner may claim the job as soon as it exists
+        open(os.path.join(self._queue_dir, f"{time.time_ns():020d}-{job_id}"), "w").close()
+        return job
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """The job, or None if it does not exist or has expired."""
+        try:
+            with open(os.path.join(self._job_dir(job_id), "job.json")) as f:
+                job = json.load(f)
+        except (KeyError, FileNotFoundError, json.JSONDecodeError):
+            return None
+        if job["status"] in FINISHED and time.time() > job["expires_at"]:
+            self.delete(job_id)
+            return None
+        return job
+
+    def update(self, job_id: str, **fields) -> dict:
+        """Change the job's *fields* and return it. A finished job's status
+        is final: changing it returns the job unchanged."""
+        job = self.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        if job["status"] in FINISHED and "status" in fields:
+            return job
+        job.update(fields)
+        if job["status"] in FINISHED:
+            job.setdefault("finished_at", time.time())
+            job["expires_at"] = job["finished_at"] + self.result_ttl
+        self._write(job)
+        return job
+
+    def delete(self, job_id: str) -> None:
+        try:
+            shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
+        except KeyError:
+            pass
+
+    def queue_position(self, job_id: str) -> Optional[int]:
+        """0-based position of a queued job, or None if it is not queued."""
+        for position, name in enumerate(sorted(os.listdir(self._queue_dir))):
+            if name.endswith("-" + job_id):
+                return position
+        return None
+
+    def claim(self) -> Optional[str]:
+        """Take the oldest queued job for this process, or None if there is none."""
+        for name in sorted(os.listdir(self._queue_dir)):
+            try:
+                os.remove(os.path.join(self._queue_dir, name))
+            except FileNotFoundError:
+                # Another process claimed it first
+                continue
+            job_id = name.split("-", 1)[1]
+            if self.get(job_id) is not None:
+                return job_id
+        return None
+
+    def sweep(self) -> int:
+        """Remove expired jobs and fail jobs lost with their process; return
+        how many jobs were removed or failed."""
+        now = time.time()
+        changed = 0
+        # Listed before the jobs are read: a marker gone by then was claimed
+        queued = {name.split("-", 1)[1] for name in os.listdir(self._queue_dir) if not name.startswith(".")}
+        unstarted: dict[str, int] = {}
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name == "queue" or entry.name.startswith(".") or not entry.is_dir():
+                    continue
+                job = self.get(entry.name)
+                if job is None:
+                    # Expired (get removed it) or never fully written
+                    if not os.path.isdir(entry.path):
+                        changed += 1
+                    elif now - entry.stat().st_mtime > LOST_GRACE:
+                        shutil.rmtree(entry.path, ignore_errors=True)
+                        changed += 1
+                elif job["status"] == "running" and now > job["deadline"] + LOST_GRACE:
+                    logger.warning("Render job %s was lost with process %s", job["id"], job.get("pid"))
+                    self.update(
+                        job["id"], status="failed", error=_error(500, "Render job was lost", "The server restarted")
+                    )
+                    changed += 1
+                elif job["status"] == "queued" and job["id"] not in queued and now > job["created_at"] + LOST_GRACE:
+                    # A claim is followed at once by the job being marked
+                    # running; only a job still unchanged a sweep later is lost
+                    try:
+                        stamp = os.stat(os.path.join(entry.path, "job.json")).st_mtime_ns
+                    except FileNotFoundError:
+                        continue
+                    if self._unstarted.get(job["id"]) != stamp:
+                        unstarted[job["id"]] = stamp
+                        continue
+                    logger.warning("Render job %s was claimed but never started", job["id"])
+                    self.update(
+                        job["id"], status="failed", error=_error(500, "Render job was lost", "The server restarted")
+                    )
+                    changed += 1
+        self._unstarted = unstarted
+        return changed
+
+
+class JobRunner:
+    """Runs queued jobs from a `JobStore`, ``concurrency`` at a time."""
+
+    # How often the queue is polled for jobs submitted to other processes
+    POLL_INTERVAL = 0.25
+    SWEEP_INTERVAL = 30.0
+
+    def __init__(self, store: JobStore, concurrency: int, default_timeout: float, max_timeout: float) -> None:
+        self.store = store
+        self.concurrency = max(1, concurrency)
+        self.default_timeout = default_timeout
+        self.max_timeout = max_timeout
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="render-job")
+        self._slots = threading.Semaphore(self.concurrency)
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        # Mean job run time, for Retry-After estimates
+        self._avg_run = 10.0
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="render-job-dispatch", daemon=True)
+            self._thread.start()
+
+    def submit(
+        self,
+        markdown: str,
+        formats: Sequence[str] = ("pdf",),
+        png_width: Optional[int] = None,
+        package: str = "pdf",
+        cache: bool = True,
+        timeout: Optional[float] = None,
+    ) -> dict:
+        """Queue a render of *markdown* to *formats* and return the new job."""
+        if package not in PACKAGES:
+            raise ValueError(f"Unknown package '{package}'. Expected one of {list(PACKAGES)}")
+        if package == "pdf" and list(formats) != ["pdf"]:
+            raise ValueError("Only PDF-only jobs can return a bare PDF")
+        timeout = min(timeout or self.default_timeout, self.max_timeout)
+        options = {
+            "formats": list(formats),
+            "png_width": png_width,
+            "package": package,
+            "cache": cache,
+            "timeout": timeout,
+        }
+        job = self.store.create(markdown, options, self.retry_after())
+        self._wake.set()
+        return job
+
+    def retry_after(self) -> int:
+        """Seconds until a newly queued job would likely start."""
+        with self._lock:
+            avg_run = self._avg_run
+        return max(1, math.ceil(avg_run * (self.store.depth() + 1) / self.concurrency))
+
+    def wait(self, job_id: str, timeout: float, poll: float = 0.05) -> Optional[dict]:
+        """Block until the job finishes and return it (None if it vanished).
+        After *timeout* seconds the job is returned unfinished."""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.store.get(job_id)
+            if job is None or job["status"] in FINISHED or time.monotonic() > deadline:
+                return job
+            time.sleep(poll)
+
+    # ------------------------------------------------------------------
+
+    def _loop(self) -> None:
+        last_sweep = 0.0
+        while True:
+            if time.monotonic() - last_sweep > self.SWEEP_INTERVAL:
+                last_sweep = time.monotonic()
+                try:
+                    self.store.sweep()
+                except Exception:
+                    logger.exception("Render job sweep failed")
+            self._slots.acquire()
+            try:
+                job_id = self.store.claim()
+            except Exception:
+                logger.exception("Claiming a render job failed")
+                job_id = None
+            if job_id is None:
+                self._slots.release()
+                self._wake.wait(self.POLL_INTERVAL)
+                self._wake.clear()
+                continue
+            self._executor.submit(self._run, job_id)
+
+    def _run(self, job_id: str) -> None:
+        start = time.monotonic()
+        outcome = None
+        with self._lock:
+            self._running += 1
+        try:
+            job = self.store.get(job_id)
+            if job is None:
+                return
+            now = time.time()
+            job = self.store.update(
+                job_id, status="running", started_at=now, deadline=now + job["timeout"], pid=os.getpid()
+            )
+            if job["status"] != "running":
+                # Given up on (swept as lost) before it could start
+                logger.warning("Render job %s was %s before it started", job_id, job["status"])
+                return
+            with open(self.store.input_path(job_id)) as f:
+                markdown = f.read()
+            try:
+                outputs = rendered_outputs(
+                    markdown, job["formats"], job["png_width"], cache=job["cache"], timeout=job["timeout"]
+                )
+                with outputs as (files, info):
+                    result = self.store.result_dir(job_id)
+                    for name, path in files.items():
+                        target = os.path.join(result, name)
+                        os.makedirs(os.path.dirname(target), exist_ok=True)
+                        # Often cache entries: link them rather than copy them
+                        try:
+                            os.link(path, target)
+                        except OSError:
+                            shutil.copyfile(path, target)
+                if job["package"] == "zip":
+                    self._archive(job_id, sorted(files))
+                self.store.update(job_id, status="done", info=info, files=sorted(files))
+                outcome = "completed"
+            except RenderTimeout as exc:
+                logger.warning("Render job %s timed out: %s", job_id, exc)
+                self.store.update(job_id, status="failed", error=_error(504, "Marp timed out generating PDF", str(exc)))
+                outcome = "failed"
+            except RenderError as exc:
+                logger.warning("Render job %s failed: %s %s", job_id, exc, exc.details)
+                self.store.update(
+                    job_id, status="failed", error=_error(500, "Marp failed to generate PDF", exc.details or str(exc))
+                )
+                outcome = "failed"
+            except Exception as exc:
+                logger.exception("Render job %s crashed", job_id)
+                self.store.update(
+                    job_id,
+                    status="failed",
+                    error={**_error(500, "Internal Server Error", str(exc)), "trace": traceback.format_exc()},
+                )
+                outcome = "failed"
+        except Exception:
+            logger.exception("Render job %s could not be updated", job_id)
+            outcome = "failed"
+        finally:
+            with self._lock:
+                self._running -= 1
+                if outcome is not None:
+                    self._avg_run = 0.9 * self._avg_run + 0.1 * (time.monotonic() - start)
+                    self._completed += outcome == "completed"
+                    self._failed += outcome == "failed"
+            self._slots.release()
+            self._wake.set()
+
+    def _archive(self, job_id: str, names: list[str]) -> None:
+        """Zip the job's outputs, streaming each file from disk."""
+        result = self.store.result_dir(job_id)
+        archive = self.store.archive_path(job_id)
+        with zipfile.ZipFile(archive + ".part", "w") as zf:
+            for name in names:
+                compression = zipfile.ZIP_STORED if name.endswith(_STORED_SUFFIXES) else zipfile.ZIP_DEFLATED
+                zf.write(os.path.join(result, name), name, compress_type=compression)
+        os.replace(archive + ".part", archive)
+
+    def stats(self) -> dict:
+        depth = self.store.depth()
+        with self._lock:
+            return {
+                "queued": depth,
+                "max_queued": self.store.max_queued,
+                "concurrency": self.concurrency,
+                "running": self._running,
+                "completed": self._completed,
+                "failed": self._failed,
+                "avg_run_s": round(self._avg_run, 4),
+            }
+
+
+_RUNNER: Optional[JobRunner] = None
+_RUNNER_LOCK = threading.Lock()
+
+
+def get_job_runner() -> JobRunner:
+    """Return this process's job runner, built from config on first use."""
+    import config  # local import to avoid circular dependency at module level
+
+    global _RUNNER
+    with _RUNNER_LOCK:
+        if _RUNNER is None:
+            _RUNNER = JobRunner(
+                JobStore(config.JOBS_DIR, max_queued=config.JOB_QUEUE_MAX, result_ttl=config.JOB_RESULT_TTL),
+                concurrency=config.JOB_CONCURRENCY,
+                default_timeout=config.JOB_TIMEOUT,
+                max_timeout=config.JOB_MAX_TIMEOUT,
+            )
+    return _RUNNER
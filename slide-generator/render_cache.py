@@ -0,0 +1,187 @@
+"""On-disk cache of rendered documents, keyed by content hash.
+
+The key is a SHA-256 of the markdown plus every option that changes the
+output, so a retried or repeated request is served from disk without
+starting Marp. Entries live in one directory (``RENDER_CACHE_DIR``) that is
+bounded in size (least recently used entries go first) and in age (entries
+unused for ``RENDER_CACHE_TTL`` seconds expire). The directory is the source
+of truth, so several server processes can share it.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump when rendering changes in a way that makes cached output stale
+RENDER_VERSION = 1
+
+
+class RenderCache:
+    """Size- and TTL-bounded directory of rendered files."""
+
+    def __init__(self, directory: str, max_bytes: int, ttl: float) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        # One lock per key being rendered, so concurrent identical requests
+        # render once
+        self._inflight: dict[str, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(content: str, options: Optional[dict] = None) -> str:
+        payload = json.dumps(
+            {"version": RENDER_VERSION, "content": content, "options": options or {}},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, key + suffix)
+
+    def get(self, key: str, suffix: str = ".pdf") -> Optional[str]:
+        """Return the cached file for *key*, or None if absent or expired."""
+        path = self._path(key, suffix)
+        try:
+            age = time.time() - os.stat(path).st_mtime
+            if self.ttl > 0 and age > self.ttl:
+                os.remove(path)
+                return None
+            # mtime doubles as last-use time for LRU eviction and the TTL
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, source: str, suffix: str = ".pdf", evict: bool = True) -> str:
+        """Move *source* into the cache under *key* and return its new path.
+
+        Eviction scans the whole directory; callers storing many entries at
+        once pass ``evict=False`` and call `evict` once afterwards.
+        """
+        path = self._path(key, suffix)
+        # Copy next to the destination first so readers never see a partial
+        # file, even when *source* is on another filesystem (e.g. tmpfs)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        os.close(fd)
+        try:
+            shutil.move(source, tmp)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        if evict:
+            self.evict(keep=path)
+        return path
+
+    def get_or_create(self, key: str, create: Callable[[], str], suffix: str = ".pdf") -> tuple[str, bool]:
+        """Return ``(path, hit)`` for *key*, calling *create* on a miss.
+
+        *create* returns the path of a freshly rendered file, which is moved
+        into the cache. Concurrent misses for the same key create it once.
+        """
+        path = self.get(key, suffix)
+        if path is not None:
+            with self._lock:
+                self.hits += 1
+            return path, True
+        with self._lock:
+            inflight = self._inflight.setdefault(key, threading.Lock())
+        try:
+            with inflight:
+                path = self.get(key, suffix)
+                if path is not None:
+                    with self._lock:
+                        self.hits += 1
+                    return path, True
+                with self._lock:
+                    self.misses += 1
+                return self.put(key, create(), suffix), False
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is inflight and not inflight.locked():
+                    del self._inflight[key]
+
+    def _entries(self) -> list[tuple[float, int, str]]:
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.startswith(".") or not entry.is_file():
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """Remove expired entries, then the least recently used ones until
+        the cache fits in ``max_bytes``. *keep* (a path) is never removed."""
+        now = time.time()
+        entries = sorted(e for e in self._entries() if e[2] != keep)
+        total = sum(size for _mtime, size, _path in entries)
+        if keep is not None and os.path.exists(keep):
+            total += os.path.getsize(keep)
+        removed = 0
+        for mtime, size, path in entries:
+            expired = self.ttl > 0 and now - mtime > self.ttl
+            if not expired and (self.max_bytes <= 0 or total <= self.max_bytes):
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        if removed:
+            logger.info("Evicted %d cache entries from %s", removed, self.directory)
+            with self._lock:
+                self.evictions += removed
+
+    def stats(self) -> dict:
+        entries = self._entries()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "directory": self.directory,
+                "entries": len(entries),
+                "bytes": sum(size for _mtime, size, _path in entries),
+                "max_bytes": self.max_bytes,
+                "ttl_s": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+_CACHE: Optional[RenderCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_render_cache() -> RenderCache:
+    """Return the process-wide render cache, built from config on first use."""
+    import config  # local import to avoid circular dependency at module level
+
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = RenderCache(
+                directory=config.RENDER_CACHE_DIR,
+                max_bytes=config.RENDER_CACHE_MAX_BYTES,
+                ttl=config.RENDER_CACHE_TTL,
+            )
+    return _CACHE
@@ -0,0 +1,309 @@
+"""Pool of resident Marp render workers.
+
+Running the ``marp`` CLI per request pays for a Node.js start-up and a fresh
+headless Chromium launch every time, which is most of a render's latency.
+`RenderPool` keeps ``size`` Node processes (``render_worker.js``) alive,
+each with its own browser, and hands every render to an idle one over its
+stdin/stdout pipe.
+
+A worker is replaced after ``max_renders`` renders, once it and its browser
+use more than ``max_rss`` bytes, after a render times out (it is killed, so
+a stuck browser cannot hold the slot), or when it dies.
+"""
+import json
+import logging
+import os
+import queue
+import subprocess
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "render_worker.js")
+
+
+class RenderError(Exception):
+    """Marp failed to render the document; *details* holds its error output."""
+
+    def __init__(self, message: str, details: str = "") -> None:
+        super().__init__(message)
+        self.details = details
+
+
+class RenderTimeout(RenderError):
+    """A render did not finish within its timeout."""
+
+
+def _children(pid: int) -> dict[int, list[int]]:
+    tree: dict[int, list[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces; fields resume after ")"
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        tree.setdefault(ppid, []).append(int(entry))
+    return tree
+
+
+def tree_rss(pid: int) -> int:
+    """Resident memory of *pid* and all its descendants (Linux only; 0 elsewhere)."""
+    if not os.path.isdir("/proc"):
+        return 0
+    tree = _children(pid)
+    page = os.sysconf("SC_PAGE_SIZE")
+    total, stack = 0, [pid]
+    while stack:
+        current = stack.pop()
+        try:
+            with open(f"/proc/{current}/statm") as f:
+                total += int(f.read().split()[1]) * page
+        except (OSError, IndexError, ValueError):
+            pass
+        stack.extend(tree.get(current, ()))
+    return total
+
+
+class RenderWorker:
+    """One ``render_worker.js`` process, driven over line-delimited JSON."""
+
+    def __init__(self, command: list[str], startup_timeout: float) -> None:
+        self.renders = 0
+        self._next_id = 0
+        self._lines: queue.Queue = queue.Queue()
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+            # A new session, so killing the worker takes its browser with it
+            start_new_session=True,
+        )
+        threading.Thread(target=self._read, name="render-worker-reader", daemon=True).start()
+        ready = self._receive(startup_timeout)
+        if not ready.get("ready"):
+            self.kill()
+            raise RenderError("Render worker failed to start", str(ready))
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def _read(self) -> None:
+        for line in self.process.stdout:
+            self._lines.put(line)
+        self._lines.put(None)
+
+    def _receive(self, timeout: float) -> dict:
+        try:
+            line = self._lines.get(timeout=timeout)
+        except queue.Empty:
+            self.kill()
+            raise RenderTimeout(f"Render worker did not answer within {timeout:.0f}s")
+        if line is None:
+            raise RenderError("Render worker exited", f"exit code {self.process.wait()}")
+        return json.loads(line)
+
+    def render(self, job: dict, timeout: float) -> dict:
+        """Send *job* (see render_worker.js), wait for it to finish and
+        return the worker's reply."""
+        self._next_id += 1
+        job = {**job, "id": self._next_id}
+        try:
+            self.process.stdin.write(json.dumps(job) + "\n")
+            self.process.stdin.flush()
+        except OSError as exc:
+            raise RenderError("Render worker is gone", str(exc))
+        while True:
+            reply = self._receive(timeout)
+            # Replies to earlier, abandoned jobs cannot occur (timeouts kill
+            # the worker), but never mistake one for this job's
+            if reply.get("id") == job["id"]:
+                break
+        self.renders += 1
+        if not reply.get("ok"):
+            raise RenderError("Marp failed to render the document", reply.get("error", ""))
+        return reply
+
+    def rss(self) -> int:
+        return tree_rss(self.pid)
+
+    def kill(self) -> None:
+        if self.alive:
+            try:
+                os.killpg(self.pid, 9)
+            except OSError:
+                self.process.kill()
+        self.process.wait()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Ask the worker to exit (closing its browser), killing it if it does not."""
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout)
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+        self.kill()
+
+
+class RenderPool:
+    """``size`` resident render workers, started on demand and recycled."""
+
+    def __init__(
+        self,
+        size: int,
+        max_renders: int = 200,
+        max_rss: int = 0,
+        render_timeout: float = 60.0,
+        startup_timeout: float = 30.0,
+        command: Optional[list[str]] = None,
+    ) -> None:
+        import config  # local import to avoid circular dependency at module level
+
+        self.size = max(1, size)
+        self.max_renders = max_renders
+        self.max_rss = max_rss
+        self.render_timeout = render_timeout
+        self.startup_timeout = startup_timeout
+        self.command = command or [config.NODE_BINARY, WORKER_SCRIPT]
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        # Free slots; a slot without an idle worker starts a new one
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._started = 0
+        self._recycled: dict[str, int] = {}
+        self._renders = 0
+        self._failures = 0
+        self._render_seconds = 0.0
+
+    # ------------------------------------------------------------------
+
+    def _start_worker(self) -> RenderWorker:
+        start = time.perf_counter()
+        worker = RenderWorker(self.command, self.startup_timeout)
+        logger.info("Started render worker %d in %.2fs", worker.pid, time.perf_counter() - start)
+        with self._lock:
+            self._started += 1
+        return worker
+
+    def _acquire(self) -> RenderWorker:
+        self._slots.acquire()
+        try:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                return self._start_worker()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _retire_reason(self, worker: RenderWorker) -> Optional[str]:
+        if not worker.alive:
+            return "died"
+        if self.max_renders and worker.renders >= self.max_renders:
+            return "max_renders"
+        if self.max_rss and worker.rss() > self.max_rss:
+            return "max_rss"
+        return None
+
+    def _release(self, worker: RenderWorker, reason: Optional[str] = None) -> None:
+        try:
+            reason = reason or self._retire_reason(worker)
+            if reason is None and not self._closed:
+                self._idle.put(worker)
+                return
+            reason = reason or "closed"
+            logger.info("Retiring render worker %d (%s)", worker.pid, reason)
+            with self._lock:
+                self._recycled[reason] = self._recycled.get(reason, 0) + 1
+            worker.close()
+        finally:
+            self._slots.release()
+
+    def render(self, job: dict, timeout: Optional[float] = None) -> dict:
+        """Run *job* (see render_worker.js) on an idle worker and return the reply.
+
+        Blocks while all workers are busy. Raises RenderError if Marp fails
+        and RenderTimeout if the render takes longer than *timeout*.
+        """
+        if self._closed:
+            raise RenderError("Render pool is closed")
+        worker = self._acquire()
+        reason = None
+        start = time.perf_counter()
+        try:
+            return worker.render(job, timeout or self.render_timeout)
+        except RenderTimeout:
+            reason = "timeout"
+            raise
+        except RenderError:
+            with self._lock:
+                self._failures += 1
+            raise
+        finally:
+            with self._lock:
+                self._renders += 1
+                self._render_seconds += time.perf_counter() - start
+            self._release(worker, reason)
+
+    def warm(self) -> None:
+        """Start every worker now instead of on first use."""
+        workers = []
+        try:
+            for _ in range(self.size):
+                workers.append(self._acquire())
+        finally:
+            for worker in workers:
+                self._release(worker)
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": self.size,
+                "idle": self._idle.qsize(),
+                "workers_started": self._started,
+                "workers_recycled": dict(self._recycled),
+                "renders": self._renders,
+                "failures": self._failures,
+                "avg_render_s": round(self._render_seconds / self._renders, 4) if self._renders else None,
+            }
+
+
+_POOL: Optional[RenderPool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_render_pool() -> RenderPool:
+    """Return the process-wide render pool, built from config on first use."""
+    import config  # local import to avoid circular dependency at module level
+
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = RenderPool(
+                size=config.RENDER_POOL_SIZE,
+                max_renders=config.RENDER_WORKER_MAX_RENDERS,
+                max_rss=config.RENDER_WORKER_MAX_RSS_MB * 1024 * 1024,
+                render_timeout=config.RENDER_TIMEOUT,
+                startup_timeout=config.RENDER_WORKER_STARTUP_TIMEOUT,
+            )
+    return _POOL
@@ -0,0 +1,206 @@
+#!/usr/bin/env node
+// Resident Marp renderer used by render_pool.py.
+//
+// Converts Marp markdown with marp-core and prints it to PDF in a headless
+// Chromium that stays up between renders, so neither Node.js start-up nor a
+// browser launch is paid per request.
+//
+// Protocol: one JSON object per line. Once the browser is up the worker
+// prints {"ready": true}. Each request line
+//
+//   {"id": 1, "markdown": "...", "base_dir": "/tmp/x",
+//    "allow_local_files": true, "outputs": {"pdf": "/tmp/x/out.pdf"}}
+//
+// is answered with {"id": 1, "ok": true} or {"id": 1, "ok": false, "error": "..."}.
+// With "slides": [0, 4] only those slides (0-based, in that order) are
+// printed, one page each. Directives, inheritance and page numbers still
+// come from the whole deck.
+//
+// Besides "pdf", "outputs" may ask for "png": {"dir": "/tmp/x/png", "width": 640},
+// one image per slide named slide-<index>.png (deck index, 0-based) and
+// "width" px wide (default: the slide width), and "html": "/tmp/x/out.html",
+// a standalone document of the slides. All of them come from one page load;
+// the images are taken one slide at a time, so memory does not grow with
+// the deck.
+//
+// {"id": 2, "op": "parse", "markdown": "..."} renders nothing and answers
+// {"id": 2, "ok": true, "slides": ["<sha256>", ...]}: one hash per slide of
+// its rendered HTML plus the deck's CSS (theme and style), i.e. of
+// everything that determines how that page looks. It also writes
+// "outputs": {"html": ...} if asked, which needs no browser.
+// Requests are handled one at a time. The worker exits when stdin closes or
+// the browser dies; the pool replaces it.
+'use strict'
+
+const crypto = require('crypto')
+const fs = require('fs/promises')
+const path = require('path')
+const readline = require('readline')
+const { pathToFileURL } = require('url')
+const { Marp } = require('@marp-team/marp-core')
+const puppeteer = require('puppeteer-core')
+
+const CHROME_PATH = process.env.CHROME_PATH || '/usr/bin/chromium-browser'
+const NAVIGATION_TIMEOUT_MS = Number(process.env.RENDER_NAVIGATION_TIMEOUT_MS || 30000)
+
+// One slide per PDF page, edge to edge (matches `marp --pdf`)
+const PRINT_CSS = `
+@page { margin: 0; }
+html, body { margin: 0; padding: 0; }
+svg[data-marpit-svg] {
+  display: block; width: 100vw; height: 100vh;
+  break-after: page; page-break-after: always;
+}
+svg[data-marpit-svg]:last-of-type { break-after: auto; page-break-after: auto; }
+`
+
+// Standalone HTML output: slides stacked, scaled to the window width
+const VIEW_CSS = `
+html, body { margin: 0; padding: 0; background: #444; }
+svg[data-marpit-svg] { display: block; width: 100%; height: auto; margin: 0 auto 1rem; }
+`
+
+function send(message) {
+  process.stdout.write(JSON.stringify(message) + '\n')
+}
+
+function renderMarp(markdown) {
+  // One HTML string per slide; the container is left out
+  return new Marp().render(markdown, { htmlAsArray: true })
+}
+
+function slideHashes(markdown) {
+  const { html, css } = renderMarp(markdown)
+  const cssHash = crypto.createHash('sha256').update(css).digest('hex')
+  return html.map((slide) => crypto.createHash('sha256').update(cssHash).update('\0').update(slide).digest('hex'))
+}
+
+function htmlOutput(markdown) {
+  // Relative links are kept, so they resolve next to the written file
+  const { html, css } = renderMarp(markdown)
+  return '<!DOCTYPE html><html><head><meta charset="UTF-8">' +
+    '<meta name="viewport" content="width=device-width, initial-scale=1">' +
+    `<style>${css}</style><style>${VIEW_CSS}</style></head>` +
+    `<body><div class="marpit">${html.join('')}</div></body></html>`
+}
+
+function htmlDocument(job) {
+  const { html, css } = renderMarp(job.markdown)
+  const slides = job.slides ? job.slides.map((index) => html[index]) : html
+  if (slides.some((slide) => slide === undefined)) throw new Error(`No such slide in ${job.slides}`)
+  const base = pathToFileURL(path.resolve(job.base_dir) + path.sep).href
+  return `<!DOCTYPE html><html><head><meta charset="UTF-8"><base href="${base}">` +
+    `<style>${css}</style><style>${PRINT_CSS}</style></head>` +
+    `<body><div class="marpit">${slides.join('')}</div></body></html>`
+}
+
+async function openDocument(browser, job, documentPath) {
+  const page = await browser.newPage()
+  if (!job.allow_local_files) {
+    // Only the document itself may be read from disk
+    const documentUrl = pathToFileURL(documentPath).href
+    await page.setRequestInterception(true)
+    page.on('request', (request) => {
+      const url = request.url()
+      if (url.startsWith('file:') && url !== documentUrl) request.abort()
+      else request.continue()
+    })
+  }
+  await page.goto(pathToFileURL(documentPath).href, {
+    waitUntil: 'networkidle0',
+    timeout: NAVIGATION_TIMEOUT_MS,
+  })
+  return page
+}
+
+async function slideSize(page) {
+  return page.evaluate(() => {
+    const svg = document.querySelector('svg[data-marpit-svg]')
+    const box = svg ? svg.viewBox.baseVal : { width: 1280, height: 720 }
+    return { width: box.width, height: box.height }
+  })
+}
+
+async function screenshots(page, job, png) {
+  const { width, height } = await slideSize(page)
+  const count = await page.evaluate(() => document.querySelectorAll('svg[data-marpit-svg]').length)
+  const deckIndices = job.slides || [...Array(count).keys()]
+  // The viewport is exactly one slide; every other slide is hidden while
+  // one is captured, so each capture is one slide-sized surface
+  await page.setViewport({ width, height, deviceScaleFactor: (png.width || width) / width })
+  await fs.mkdir(png.dir, { recursive: true })
+  for (let n = 0; n < deckIndices.length; n++) {
+    await page.evaluate((visible) => {
+      document.querySelectorAll('svg[data-marpit-svg]').forEach((svg, i) => {
+        svg.style.display = i === visible ? 'block' : 'none'
+      })
+    }, n)
+    await page.screenshot({ path: path.join(png.dir, `slide-${deckIndices[n]}.png`), type: 'png' })
+  }
+}
+
+async function render(browser, job) {
+  const outputs = job.outputs || {}
+  if (outputs.html) await fs.writeFile(outputs.html, htmlOutput(job.markdown))
+  if (!outputs.pdf && !outputs.png) return
+  // Written next to the output so relative links resolve like `marp` does
+  const documentPath = path.join(job.base_dir, `.render-${process.pid}-${job.id}.html`)
+  await fs.writeFile(documentPath, htmlDocument(job))
+  let page
+  try {
+    page = await openDocument(browser, job, documentPath)
+    if (outputs.pdf) {
+      const { width, height } = await slideSize(page)
+      await page.pdf({
+        path: outputs.pdf,
+        width: `${width}px`,
+        height: `${height}px`,
+        printBackground: true,
+      })
+    }
+    // After the PDF, which needs every slide shown
+    if (outputs.png) await screenshots(page, job, outputs.png)
+  } finally {
+    if (page) await page.close().catch(() => {})
+    await fs.rm(documentPath, { force: true })
+  }
+}
+
+async function main() {
+  const browser = await puppeteer.launch({
+    executablePath: CHROME_PATH,
+    headless: true,
+    // The container has no user namespaces and a small /dev/shm
+    args: ['--no-sandbox', '--disable-dev-shm-usage', '--disable-gpu'],
+  })
+  browser.on('disconnected', () => {
+    console.error('render_worker: browser disconnected')
+    process.exit(1)
+  })
+  send({ ready: true, pid: process.pid })
+
+  const lines = readline.createInterface({ input: process.stdin, crlfDelay: Infinity })
+  for await (const line of lines) {
+    if (!line.trim()) continue
+    let job
+    try {
+      job = JSON.parse(line)
+      if (job.op === 'parse') {
+        const slides = slideHashes(job.markdown)
+        if (job.outputs && job.outputs.html) await fs.writeFile(job.outputs.html, htmlOutput(job.markdown))
+        send({ id: job.id, ok: true, slides })
+        continue
+      }
+      await render(browser, job)
+      send({ id: job.id, ok: true })
+    } catch (err) {
+      send({ id: job ? job.id : null, ok: false, error: String((err && err.stack) || err) })
+    }
+  }
+  await browser.close()
+}
+
+main().catch((err) => {
+  console.error(`render_worker: ${(err && err.stack) || err}`)
+  process.exit(1)
+})
@@ -0,0 +1,427 @@
+"""Marp markdown → PDF, per-slide PNGs and HTML.
+
+Renders go to the resident worker pool (`render_pool`) when
+``RENDER_POOL_SIZE`` > 0, and otherwise shell out to the ``marp`` CLI as the
+service always did. `rendered_outputs` adds the render cache, scratch space
+and prefetching of remote images (`assets`) on top.
+
+With the pool, `render_slides` also caches each slide as its own one-page
+PDF and PNG. The worker hashes every slide as marp-core renders it (after
+front-matter, inherited and spot directives, pagination, theme and style
+have been applied), so only slides whose page would actually change are
+rendered, spread across the pool, and the outputs are assembled from cached
+and fresh pages. Every requested format of a slide comes from the same page
+load.
+"""
+import glob
+import logging
+import os
+import shutil
+import subprocess
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from typing import Iterator, Optional, Sequence
+
+import config
+from assets import ASSET_DIR, get_asset_prefetcher, slide_size
+from render_cache import RenderCache, get_render_cache
+from render_pool import RenderError, RenderTimeout, get_render_pool
+from scratch import scratch_dir
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "OUTPUT_FORMATS",
+    "RenderError",
+    "RenderTimeout",
+    "render_cli",
+    "render_document",
+    "render_pdf",
+    "render_slides",
+    "rendered_outputs",
+]
+
+OUTPUT_FORMATS = ("pdf", "png", "html")
+
+# Names of the outputs in `rendered_outputs`
+PDF_NAME = "slides.pdf"
+HTML_NAME = "slides.html"
+PNG_DIR = "png"
+
+
+def png_name(index: int) -> str:
+    """Output name of the PNG of slide *index* (0-based); numbered from 1."""
+    return f"{PNG_DIR}/slide-{index + 1:03d}.png"
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    """Seconds left until *deadline* (a ``time.monotonic()`` value), or None."""
+    if deadline is None:
+        return None
+    left = deadline - time.monotonic()
+    if left <= 0:
+        raise RenderTimeout("Render did not finish within its time limit")
+    return left
+
+
+def _link(source: str, target: str) -> None:
+    """Hard-link *source* to *target* (so cache eviction cannot remove it),
+    copying when they are on different filesystems."""
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+def render_cli(
+    markdown: str,
+    output_path: str,
+    base_dir: str,
+    allow_local_files: bool = True,
+    timeout: Optional[float] = None,
+    args: Sequence[str] = ("--pdf",),
+) -> None:
+    """Render with a fresh ``marp`` process (and browser).
+
+    *args* pick the output format; ``()`` writes HTML.
+    """
+    timeout = timeout or config.RENDER_TIMEOUT
+    input_path = os.path.join(base_dir, f"slides_{uuid.uuid4()}.md")
+    with open(input_path, "w") as f:
+        f.write(markdown)
+    cmd = [config.MARP_BINARY, input_path, *args, "--output", output_path]
+    if allow_local_files:
+        cmd.append("--allow-local-files")
+    logger.info("Executing: %s", " ".join(cmd))
+    try:
+        subprocess.run(cmd, check=True, capture_output=True, text=True, timeout=timeout)
+    except subprocess.CalledProcessError as exc:
+        raise RenderError("Marp failed to render the document", exc.stderr)
+    except subprocess.TimeoutExpired:
+        raise RenderTimeout(f"Marp did not finish within {timeout:.0f}s")
+    finally:
+        os.remove(input_path)
+
+
+def _render_document_cli(
+    markdown: str, base_dir: str, outputs: dict, allow_local_files: bool, timeout: Optional[float]
+) -> None:
+    # The CLI makes one format per run (and browser); *timeout* covers all
+    deadline = time.monotonic() + (timeout or config.RENDER_TIMEOUT)
+    if "pdf" in outputs:
+        render_cli(markdown, outputs["pdf"], base_dir, allow_local_files, _remaining(deadline))
+    if "html" in outputs:
+        render_cli(markdown, outputs["html"], base_dir, allow_local_files, _remaining(deadline), args=())
+    if "png" in outputs:
+        png = outputs["png"]
+        width = png.get("width") or slide_size(markdown)[0]
+        staging = os.path.join(base_dir, f"png-cli-{uuid.uuid4()}")
+        os.makedirs(staging)
+        render_cli(
+            markdown,
+            os.path.join(staging, "slide.png"),
+            base_dir,
+            allow_local_files,
+            _remaining(deadline),
+            args=("--images", "png", "--image-scale", str(width / slide_size(markdown)[0])),
+        )
+        # marp writes slide.001.png, slide.002.png, ...
+        os.makedirs(png["dir"], exist_ok=True)
+        for index, path in enumerate(sorted(glob.glob(os.path.join(staging, "slide.*.png")))):
+            os.replace(path, os.path.join(png["dir"], f"slide-{index}.png"))
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def render_document(
+    markdown: str,
+    base_dir: str,
+    outputs: dict,
+    allow_local_files: bool = True,
+    slides: Optional[list[int]] = None,
+    timeout: Optional[float] = None,
+) -> None:
+    """Render *markdown* to the files in *outputs*.
+
+    *outputs* maps ``"pdf"`` and ``"html"`` to output paths and ``"png"``
+    to ``{"dir": ..., "width": ...}`` (images named ``slide-<index>.png``,
+    *width* px wide, default the slide width); see render_worker.js.
+    Relative links in the markdown resolve against *base_dir*. *slides*
+    (0-based indices, render pool only) limits the PDF and PNGs to those
+    slides, one page each. Raises RenderError (with Marp's error output in
+    ``details``) on failure, and RenderTimeout, after killing the render,
+    if it takes longer than *timeout* (default ``RENDER_TIMEOUT``).
+    """
+    if config.RENDER_POOL_SIZE <= 0:
+        if slides is not None:
+            raise ValueError("Rendering selected slides needs the render pool")
+        _render_document_cli(markdown, base_dir, outputs, allow_local_files, timeout)
+        return
+    job_outputs = {fmt: os.path.abspath(path) for fmt, path in outputs.items() if fmt != "png"}
+    if "png" in outputs:
+        job_outputs["png"] = {**outputs["png"], "dir": os.path.abspath(outputs["png"]["dir"])}
+    job = {
+        "markdown": markdown,
+        "base_dir": os.path.abspath(base_dir),
+        "allow_local_files": allow_local_files,
+        "outputs": job_outputs,
+    }
+    if slides is not None:
+        job["slides"] = slides
+    get_render_pool().render(job, timeout)
+
+
+def render_pdf(
+    markdown: str,
+    output_path: str,
+    base_dir: str,
+    allow_local_files: bool = True,
+    slides: Optional[list[int]] = None,
+    timeout: Optional[float] = None,
+) -> None:
+    """Render *markdown* to a PDF at *output_path*; see `render_document`."""
+    render_document(markdown, base_dir, {"pdf": output_path}, allow_local_files, slides, timeout)
+
+
+def _chunks(items: list[int], count: int) -> list[list[int]]:
+    """Split *items* into at most *count* contiguous, near-equal runs."""
+    count = max(1, min(count, len(items)))
+    size, extra = divmod(len(items), count)
+    chunks, start = [], 0
+    for n in range(count):
+        end = start + size + (1 if n < extra else 0)
+        chunks.append(items[start:end])
+        start = end
+    return chunks
+
+
+def render_slides(
+    markdown: str,
+    base_dir: str,
+    outputs: dict,
+    allow_local_files: bool = True,
+    deadline: Optional[float] = None,
+    cache: Optional[RenderCache] = None,
+) -> tuple[int, int]:
+    """Render *markdown* slide by slide to *outputs* (as for `render_document`).
+
+    Needs the render pool. The deck is parsed once, which also writes the
+    HTML. With a *cache*, slides whose page (and PNG) are cached are reused;
+    the rest are rendered in up to ``RENDER_PARALLELISM`` chunks on separate
+    workers, each chunk printing and capturing its slides in one page load,
+    and cached. The PDF is assembled from one-page PDFs and the PNGs are
+    named by deck index. Every render is killed at *deadline*
+    (``time.monotonic()``). Returns ``(slides reused, slides rendered)``.
+    """
+    from pypdf import PdfReader, PdfWriter  # noqa: PLC0415
+
+    parse = {"op": "parse", "markdown": markdown}
+    if "html" in outputs:
+        parse["outputs"] = {"html": os.path.abspath(outputs["html"])}
+    hashes = get_render_pool().render(parse, _remaining(deadline))["slides"]
+
+    # Per requested slide format: cache key options and file suffix
+    formats: dict[str, tuple[dict, str]] = {}
+    if "pdf" in outputs:
+        formats["pdf"] = ({"format": "pdf-page", "allow_local_files": allow_local_files}, ".pdf")
+    if "png" in outputs:
+        width = outputs["png"].get("width")
+        formats["png"] = ({"format": "png", "width": width, "allow_local_files": allow_local_files}, ".png")
+    if not formats:
+        return 0, 0
+
+    def key(fmt: str, index: int) -> str:
+        return RenderCache.key(hashes[index], formats[fmt][0])
+
+    with ExitStack() as files:
+        # Slide files by (format, slide hash). PDF pages are held open and
+        # PNGs linked into place from lookup on, so eviction cannot remove
+        # them before assembly.
+        found: dict[tuple[str, str], object] = {}
+
+        def keep(fmt: str, index: int, path: str) -> None:
+            if fmt == "pdf":
+                found[fmt, hashes[index]] = files.enter_context(open(path, "rb"))
+            else:
+                target = os.path.join(outputs["png"]["dir"], f"slide-{index}.png")
+                _link(path, target)
+                found[fmt, hashes[index]] = target
+
+        # First slide of each distinct slide that has to be rendered
+        missing: list[int] = []
+        seen: set[str] = set()
+        for index, slide_hash in enumerate(hashes):
+            if slide_hash in seen:
+                continue
+            seen.add(slide_hash)
+            paths = {fmt: cache.get(key(fmt, index), suffix) if cache else None for fmt, (_, suffix) in formats.items()}
+            if all(paths.values()):
+                for fmt, path in paths.items():
+                    keep(fmt, index, path)
+            else:
+                missing.append(index)
+
+        def render_chunk(chunk: list[int]) -> tuple[list[int], dict]:
+            name = f"slides-{chunk[0]}-{chunk[-1]}"
+            chunk_outputs: dict = {}
+            if "pdf" in formats:
+                chunk_outputs["pdf"] = os.path.join(base_dir, name + ".pdf")
+            if "png" in formats:
+                chunk_outputs["png"] = {**outputs["png"], "dir": os.path.join(base_dir, name)}
+            render_document(markdown, base_dir, chunk_outputs, allow_local_files, chunk, _remaining(deadline))
+            return chunk, chunk_outputs
+
+        if missing:
+            chunks = _chunks(missing, config.RENDER_PARALLELISM)
+            with ThreadPoolExecutor(max_workers=len(chunks), thread_name_prefix="slide-render") as pool:
+                for chunk, chunk_outputs in pool.map(render_chunk, chunks):
+                    if "pdf" in chunk_outputs:
+                        reader = PdfReader(chunk_outputs["pdf"])
+                        if len(reader.pages) != len(chunk):
+                            raise RenderError(
+                                "Unexpected page count",
+                                f"slides {chunk} rendered to {len(reader.pages)} pages",
+                            )
+                        for index, page in zip(chunk, reader.pages):
+                            page_path = os.path.join(base_dir, f"slide-{index}.pdf")
+                            single = PdfWriter()
+                            single.add_page(page)
+                            single.write(page_path)
+                            keep("pdf", index, cache.put(key("pdf", index), page_path, evict=False) if cache else page_path)
+                    if "png" in chunk_outputs:
+                        for index in chunk:
+                            path = os.path.join(chunk_outputs["png"]["dir"], f"slide-{index}.png")
+                            if not os.path.exists(path):
+                                raise RenderError("Missing slide image", f"slide {index} was not captured")
+                            keep("png", index, cache.put(key("png", index), path, ".png", evict=False) if cache else path)
+            # Once per render rather than per slide and format; everything
+            # this render needs is already held open or linked
+            if cache:
+                cache.evict()
+
+        if "pdf" in formats:
+            document = PdfWriter()
+            for slide_hash in hashes:
+                document.append(found["pdf", slide_hash])
+            document.write(outputs["pdf"])
+        if "png" in formats:
+            # Repeated slides share the first one's image
+            for index, slide_hash in enumerate(hashes):
+                target = os.path.join(outputs["png"]["dir"], f"slide-{index}.png")
+                if not os.path.exists(target):
+                    _link(found["png", slide_hash], target)
+
+    return len(hashes) - len(missing), len(missing)
+
+
+def _localize(markdown: str, work: str, allow_local_files: bool, info: dict) -> str:
+    """Point *markdown* at local copies of its remote images in *work*."""
+    # Without local file access the browser could not load the copies
+    if not (config.ASSET_PREFETCH_ENABLED and allow_local_files):
+        return markdown
+    markdown, stats = get_asset_prefetcher().localize(markdown, work)
+    if stats["images"]:
+        info["images_prefetched"] = stats["images"] - stats["failed"]
+        info["images_failed"] = stats["failed"]
+    return markdown
+
+
+def _collect(work: str, outputs: dict) -> dict[str, str]:
+    """Map output names to the rendered files of *outputs*."""
+    files = {}
+    if "pdf" in outputs:
+        files[PDF_NAME] = outputs["pdf"]
+    if "html" in outputs:
+        files[HTML_NAME] = outputs["html"]
+        # The HTML links the prefetched images relatively; ship them with it
+        asset_dir = os.path.join(work, ASSET_DIR)
+        if os.path.isdir(asset_dir):
+            for name in sorted(os.listdir(asset_dir)):
+                files[f"{ASSET_DIR}/{name}"] = os.path.join(asset_dir, name)
+    if "png" in outputs:
+        images = [name for name in os.listdir(outputs["png"]["dir"]) if name.startswith("slide-")]
+        for index in sorted(int(name[len("slide-"):-len(".png")]) for name in images):
+            files[png_name(index)] = os.path.join(outputs["png"]["dir"], f"slide-{index}.png")
+    return files
+
+
+@contextmanager
+def rendered_outputs(
+    markdown: str,
+    formats: Sequence[str] = ("pdf",),
+    png_width: Optional[int] = None,
+    allow_local_files: bool = True,
+    cache: bool = True,
+    timeout: Optional[float] = None,
+) -> Iterator[tuple[dict[str, str], dict]]:
+    """Yield ``(files, info)`` for *markdown* rendered to *formats*.
+
+    *files* maps output names (``slides.pdf``, ``slides.html`` and the
+    images it links under ``assets/``, ``png/slide-001.png``, ...) to paths
+    that only exist inside the ``with`` block: open or link them there.
+    PNGs are *png_width* px wide (default: the slide width). *timeout*
+    bounds the whole render, however many Marp runs it takes; without it
+    each run gets ``RENDER_TIMEOUT``.
+
+    ``info["cache"]`` is ``"hit"`` (served without rendering), ``"miss"``
+    or ``"bypass"``; after a slide-by-slide render ``info`` also has
+    ``slides_reused`` and ``slides_rendered``, and, when the deck has remote
+    images, ``images_prefetched`` and ``images_failed``. Rendering happens
+    in a scratch directory that is removed afterwards; relative links in
+    the markdown resolve against it.
+    """
+    formats = [fmt for fmt in OUTPUT_FORMATS if fmt in formats]
+    if not formats:
+        raise ValueError(f"No output formats requested; expected some of {list(OUTPUT_FORMATS)}")
+    deadline = time.monotonic() + timeout if timeout else None
+    caching = cache and config.RENDER_CACHE_ENABLED
+    by_slide = config.SLIDE_CACHE_ENABLED and config.RENDER_POOL_SIZE > 0
+    info: dict = {}
+
+    with scratch_dir() as work:
+        out = os.path.join(work, "out")
+        outputs: dict = {}
+        if "pdf" in formats:
+            outputs["pdf"] = os.path.join(out, PDF_NAME)
+        if "html" in formats:
+            outputs["html"] = os.path.join(out, HTML_NAME)
+        if "png" in formats:
+            outputs["png"] = {"dir": os.path.join(out, PNG_DIR), "width": png_width}
+        os.makedirs(out)
+
+        if formats == ["pdf"] and caching:
+            # Whole documents are cached too: a repeat is one file lookup
+            def create() -> str:
+                # Images are fetched only on a miss; the key is the deck as sent
+                local = _localize(markdown, work, allow_local_files, info)
+                if by_slide:
+                    info["slides_reused"], info["slides_rendered"] = render_slides(
+                        local, work, outputs, allow_local_files, deadline, get_render_cache()
+                    )
+                else:
+                    render_pdf(local, outputs["pdf"], work, allow_local_files, timeout=_remaining(deadline))
+                return outputs["pdf"]
+
+            render_cache = get_render_cache()
+            options = {"format": "pdf", "allow_local_files": allow_local_files}
+            path, hit = render_cache.get_or_create(render_cache.key(markdown, options), create)
+            info["cache"] = "hit" if hit else "miss"
+            yield {PDF_NAME: path}, info
+            return
+
+        local = _localize(markdown, work, allow_local_files, info)
+        # HTML alone has no slides to cache or capture; it is rendered whole
+        slide_formats = "pdf" in formats or "png" in formats
+        if config.RENDER_POOL_SIZE > 0 and slide_formats and (caching and by_slide or "png" in formats):
+            # Slide by slide, so the images are captured in parallel
+            reused, rendered = render_slides(
+                local, work, outputs, allow_local_files, deadline, get_render_cache() if caching and by_slide else None
+            )
+            info["slides_reused"], info["slides_rendered"] = reused, rendered
+            info["cache"] = ("miss" if rendered else "hit") if caching and by_slide else "bypass"
+        else:
+            render_document(local, work, outputs, allow_local_files, timeout=_remaining(deadline))
+            info["cache"] = "bypass"
+        yield _collect(work, outputs), info
@@ -0,0 +1,57 @@
+"""Scratch space for renders.
+
+Every render works in its own directory under ``SCRATCH_DIR`` (point it at a
+tmpfs such as /dev/shm to keep intermediate files off disk), which is removed
+when the render finishes, whether it succeeded or not. Directories left
+behind by a crashed process are swept at start-up.
+"""
+import logging
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "render-"
+
+
+@contextmanager
+def scratch_dir() -> Iterator[str]:
+    """Yield a fresh, private directory that is deleted on exit."""
+    import config  # local import to avoid circular dependency at module level
+
+    os.makedirs(config.SCRATCH_DIR, exist_ok=True)
+    path = tempfile.mkdtemp(prefix=PREFIX, dir=config.SCRATCH_DIR)
+    try:
+        yield path
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def sweep(max_age: float) -> int:
+    """Remove scratch directories older than *max_age* seconds; return how many.
+
+    Only directories no live render can still be using should go, so
+    *max_age* must exceed the longest render.
+    """
+    import config  # local import to avoid circular dependency at module level
+
+    if not os.path.isdir(config.SCRATCH_DIR):
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    with os.scandir(config.SCRATCH_DIR) as it:
+        for entry in it:
+            try:
+                stale = entry.name.startswith(PREFIX) and entry.is_dir() and entry.stat().st_mtime < cutoff
+            except FileNotFoundError:
+                continue
+            if stale:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                removed += 1
+    if removed:
+        logger.info("Removed %d stale scratch directories from %s", removed, config.SCRATCH_DIR)
+    return removed
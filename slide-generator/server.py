@@ -1,54 +1,164 @@
-from flask import Flask, request, send_file
-import subprocess
+from flask import Flask, request, send_file, url_for
 import os
 import uuid
+import threading
 import traceback  # Import this to print detailed error logs
 
+import config
+import scratch
+from assets import get_asset_prefetcher
+from jobs import FINISHED, Rejected, get_job_runner
+from render_cache import get_render_cache
+from render_pool import get_render_pool
+from renderer import OUTPUT_FORMATS
+
 app = Flask(__name__)
 
+
+def _read_job_request():
+    """Validate a render request body; return (markdown, options) or an error response."""
+    data = request.get_json(silent=True)
+    if not data:
+        return None, ({"error": "Invalid JSON body"}, 400)
+
+    markdown_content = data.get('markdown')
+    if not markdown_content:
+        return None, ({"error": "No 'markdown' field provided"}, 400)
+
+    timeout = data.get('timeout')
+    if timeout is not None and (not isinstance(timeout, (int, float)) or timeout <= 0):
+        return None, ({"error": "'timeout' must be a positive number of seconds"}, 400)
+
+    # e.g. ["pdf", "png", "html"]; all of them come from one render
+    formats = data.get('outputs', ['pdf'])
+    if not isinstance(formats, list) or not formats or any(fmt not in OUTPUT_FORMATS for fmt in formats):
+        return None, ({"error": f"'outputs' must be a list of {list(OUTPUT_FORMATS)}"}, 400)
+
+    png_width = data.get('png_width')
+    if png_width is not None and (not isinstance(png_width, int) or not 16 <= png_width <= config.PNG_MAX_WIDTH):
+        return None, ({"error": f"'png_width' must be between 16 and {config.PNG_MAX_WIDTH} pixels"}, 400)
+
+    # A bare PDF stays the default for PDF-only requests
+    package = data.get('package', 'pdf' if formats == ['pdf'] else 'zip')
+    if package not in ('pdf', 'zip', 'manifest') or (package == 'pdf' and formats != ['pdf']):
+        return None, ({"error": "'package' must be 'zip' or 'manifest' ('pdf' for PDF-only requests)"}, 400)
+
+    options = {
+        "formats": formats,
+        "png_width": png_width,
+        "package": package,
+        "cache": data.get('cache', True),
+        "timeout": timeout,
+    }
+    return (markdown_content, options), None
+
+
+def _submit(markdown_content, options):
+    try:
+        return get_job_runner().submit(markdown_content, **options), None
+    except Rejected as e:
+        return None, ({"error": e.detail}, e.status_code, {"Retry-After": str(e.retry_after)})
+
+
+def _job_status(job):
+    runner = get_job_runner()
+    fields = (
+        'id', 'status', 'formats', 'package', 'created_at', 'started_at', 'finished_at', 'expires_at', 'timeout',
+        'info', 'error',
+    )
+    status = {key: job[key] for key in fields if key in job}
+    if job['status'] == 'queued':
+        status['queue_position'] = runner.store.queue_position(job['id'])
+    if job['status'] == 'done':
+        status['result_url'] = url_for('job_result', job_id=job['id'])
+    return status
+
+
+def _manifest(job):
+    store = get_job_runner().store
+    result = store.result_dir(job['id'])
+    return {
+        "id": job['id'],
+        "expires_at": job['expires_at'],
+        "info": job['info'],
+        "files": [
+            {
+                "name": name,
+                "url": url_for('job_file', job_id=job['id'], name=name),
+                "bytes": os.path.getsize(os.path.join(result, name)),
+            }
+            for name in job['files']
+        ],
+    }
+
+
+def _send_result(job, download_name):
+    """Send a finished job's outputs (PDF, zip or manifest, as the job
+    asked), or its error with the status /generate used."""
+    if job['status'] == 'failed':
+        error = dict(job['error'])
+        return error, error.pop('status_code')
+
+    store = get_job_runner().store
+    if job['package'] == 'manifest':
+        return _manifest(job)
+    # The open file outlives the job (and its expiry) until it has been sent
+    if job['package'] == 'zip':
+        result_file = open(store.archive_path(job['id']), 'rb')
+        response = send_file(result_file, mimetype='application/zip', as_attachment=True, download_name=download_name + '.zip')
+    else:
+        result_file = open(os.path.join(store.result_dir(job['id']), job['files'][0]), 'rb')
+        response = send_file(result_file, mimetype='application/pdf', as_attachment=True, download_name=download_name + '.pdf')
+    info = job['info']
+    response.headers['X-Render-Cache'] = info['cache']
+    if 'slides_rendered' in info:
+        response.headers['X-Render-Slides-Reused'] = str(info['slides_reused'])
+        response.headers['X-Render-Slides-Rendered'] = str(info['slides_rendered'])
+    if 'images_prefetched' in info:
+        response.headers['X-Render-Images-Prefetched'] = str(info['images_prefetched'])
+        response.headers['X-Render-Images-Failed'] = str(info['images_failed'])
+    return response
+
+
 @app.route('/generate', methods=['POST'])
 def generate_slides():
-    input_filename = None
-    output_filename = None
+    """Render synchronously: a job that the request waits for.
 
+    Body: markdown; optional outputs (any of "pdf", "png", "html"; default
+    ["pdf"]), png_width (px), package ("zip" or "manifest"; PDF-only
+    requests get the PDF itself), cache and timeout (seconds).
+    """
     try:
-        data = request.json
-        if not data:
-            return {"error": "Invalid JSON body"}, 400
-            
-        markdown_content = data.get('markdown')
-        if not markdown_content:
-            return {"error": "No 'markdown' field provided"}, 400
+        parsed, error = _read_job_request()
+        if error:
+            return error
+        markdown_content, options = parsed
+        # One render per Marp run's worth of time, as before jobs existed
+        options['timeout'] = options['timeout'] or config.RENDER_TIMEOUT
 
         # Create unique filenames
         run_id = str(uuid.uuid4())
-        input_filename = f"slides_{run_id}.md"
-        output_filename = f"slides_{run_id}.pdf"
-
-        # Write Markdown file
-        with open(input_filename, 'w') as f:
-            f.write(markdown_content)
-
-        # Run Marp
-        # We explicitly rely on the global install from the Dockerfile
-        cmd = [
-            "marp", 
-            input_filename, 
-            "--pdf", 
-            "--output", output_filename, 
-            "--allow-local-files"
-        ]
-        
-        print(f"Executing: {' '.join(cmd)}") # Print to Docker logs
-        
-        subprocess.run(cmd, check=True, capture_output=True, text=True)
-
-        return send_file(output_filename, as_attachment=True)
-
-    except subprocess.CalledProcessError as e:
-        # This catches Marp execution errors (e.g. syntax errors in slides)
-        print(f"Marp Error: {e.stderr}")
-        return {"error": "Marp failed to generate PDF", "details": e.stderr}, 500
+        output_filename = f"slides_{run_id}"
+
+        job, error = _submit(markdown_content, options)
+        if error:
+            return error
+        runner = get_job_runner()
+        job_id = job['id']
+        keep = False
+        try:
+            job = runner.wait(job_id, job['timeout'] + config.JOB_QUEUE_WAIT)
+            if job is None:
+                return {"error": "Internal Server Error", "details": "Render job disappeared"}, 500
+            if job['status'] not in FINISHED:
+                details = f"Render job still {job['status']} after {job['timeout'] + config.JOB_QUEUE_WAIT:.0f}s"
+                return {"error": "Render job timed out", "details": details}, 504
+            # A manifest points at the job's files, which must outlive the request
+            keep = job['status'] == 'done' and job['package'] == 'manifest'
+            return _send_result(job, output_filename)
+        finally:
+            if not keep:
+                runner.store.delete(job_id)
 
     except Exception as e:
         # This catches Python crashes (e.g. Command not found, Permission denied)
@@ -56,12 +166,80 @@ def generate_slides():
         print(f"Server Error: {error_trace}")
         return {"error": "Internal Server Error", "details": str(e), "trace": error_trace}, 500
 
-    finally:
-        # Cleanup
-        if input_filename and os.path.exists(input_filename):
-            os.remove(input_filename)
-        # Note: We don't delete the PDF immediately or send_file will fail. 
-        # For a simple test, we leave it.
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    """Queue a render and return its id at once (202), or 429 when the
+    queue is full. Body as for /generate: markdown, optional outputs,
+    png_width, package, cache and timeout (seconds)."""
+    parsed, error = _read_job_request()
+    if error:
+        return error
+    job, error = _submit(*parsed)
+    if error:
+        return error
+    return _job_status(job), 202, {"Location": url_for('job_status', job_id=job['id'])}
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = get_job_runner().store.get(job_id)
+    if job is None:
+        return {"error": "Unknown or expired job"}, 404
+    return _job_status(job)
+
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    """The PDF of a finished job; a failed job returns its error."""
+    job = get_job_runner().store.get(job_id)
+    if job is None:
+        return {"error": "Unknown or expired job"}, 404
+    if job['status'] not in ('done', 'failed'):
+        return {"error": "Job has not finished", "status": job['status']}, 409
+    return _send_result(job, f"slides_{job_id}")
+
+
+@app.route('/jobs/<job_id>/files/<path:name>', methods=['GET'])
+def job_file(job_id, name):
+    """One output of a finished job, as listed in its manifest."""
+    job = get_job_runner().store.get(job_id)
+    if job is None or name not in job.get('files', ()):
+        return {"error": "Unknown or expired job output"}, 404
+    return send_file(os.path.join(get_job_runner().store.result_dir(job_id), name))
+
+
+@app.route('/stats', methods=['GET'])
+def render_stats():
+    """Render worker pool status (workers started/recycled, render timings),
+    render cache counters, remote image prefetch counters and job queue."""
+    return {
+        "jobs": get_job_runner().stats(),
+        "pool": get_render_pool().stats() if config.RENDER_POOL_SIZE > 0 else None,
+        "cache": get_render_cache().stats() if config.RENDER_CACHE_ENABLED else None,
+        "assets": get_asset_prefetcher().stats() if config.ASSET_PREFETCH_ENABLED else None,
+    }
+
+
+def _warm_pool():
+    """Launch the render workers (and their browsers) ahead of the first request."""
+    try:
+        get_render_pool().warm()
+    except Exception:
+        print(f"Render pool warmup failed: {traceback.format_exc()}")
+
+
+def start_background():
+    """Start this process's job runner and warm its render pool; called once
+    per server process (see gunicorn.conf.py)."""
+    get_job_runner().start()
+    if config.RENDER_POOL_SIZE > 0:
+        threading.Thread(target=_warm_pool, name="render-warmup", daemon=True).start()
+
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000)
\ No newline at end of file
+    # Development server; production runs gunicorn with gunicorn.conf.py
+    # Scratch directories of renders that cannot still be running
+    scratch.sweep(max_age=2 * max(config.RENDER_TIMEOUT, config.JOB_MAX_TIMEOUT))
+    start_background()
+    app.run(host=config.HOST, port=config.PORT, threaded=True)
\ No newline at end of file
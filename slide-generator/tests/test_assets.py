@@ -0,0 +1,152 @@
+"""AssetPrefetcher.localize against a local HTTP stand-in."""
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from assets import ASSET_DIR, AssetPrefetcher
+from render_cache import RenderCache
+
+FETCH_TIMEOUT = 0.5
+
+
+def _png(width: int, height: int) -> bytes:
+    """A valid grey RGB PNG of *width* x *height*."""
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    rows = b"".join(b"\x00" + b"\x80" * (3 * width) for _ in range(height))
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(rows))
+        + chunk(b"IEND", b"")
+    )
+
+
+SMALL_PNG = _png(4, 3)
+LARGE_PNG = _png(4000, 3000)
+
+# path -> (status, content type, body, delay)
+ROUTES = {
+    "/photo.png": (200, "image/png", SMALL_PNG, 0),
+    "/inline.png": (200, "image/png", _png(2, 2), 0),
+    "/huge.png": (200, "image/png", LARGE_PNG, 0),
+    "/page.html": (200, "text/html", b"<html></html>", 0),
+    "/slow.png": (200, "image/png", SMALL_PNG, FETCH_TIMEOUT * 4),
+}
+
+
+@pytest.fixture
+def server():
+    hits: Counter = Counter()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits[self.path] += 1
+            if self.path not in ROUTES:
+                self.send_error(404)
+                return
+            status, content_type, body, delay = ROUTES[self.path]
+            time.sleep(delay)
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    httpd.hits = hits
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def prefetcher(tmp_path):
+    cache = RenderCache(str(tmp_path / "cache"), max_bytes=100 * 1024 * 1024, ttl=3600)
+    return AssetPrefetcher(cache, timeout=FETCH_TIMEOUT, max_bytes=1024 * 1024, resolution_scale=None)
+
+
+def _localize(prefetcher, markdown, directory):
+    os.makedirs(directory, exist_ok=True)
+    return prefetcher.localize(markdown, str(directory))
+
+
+def test_rewrites_markdown_and_img_to_local_copies(server, prefetcher, tmp_path):
+    markdown = (
+        f"![bg left:40%]({server.url}/photo.png)\n\n"
+        f'<img src="{server.url}/inline.png" width="100">\n\n'
+        f"```\n![kept]({server.url}/photo.png)\n```\n"
+    )
+    work = tmp_path / "work"
+    localized, stats = _localize(prefetcher, markdown, work)
+
+    assert stats == {"images": 2, "failed": 0}
+    lines = localized.splitlines()
+    photo = lines[0][len("![bg left:40%]("):-1]
+    inline = lines[2].split('"')[1]
+    for name, body in ((photo, SMALL_PNG), (inline, ROUTES["/inline.png"][2])):
+        assert name.startswith(ASSET_DIR + "/") and name.endswith(".png")
+        assert (work / name).read_bytes() == body
+    # Fenced code is shown as written, not rewritten
+    assert f"![kept]({server.url}/photo.png)" in localized
+
+
+def test_second_render_reuses_cache(server, prefetcher, tmp_path):
+    markdown = f"![bg]({server.url}/photo.png)"
+    first, _ = _localize(prefetcher, markdown, tmp_path / "one")
+    second, stats = _localize(prefetcher, markdown, tmp_path / "two")
+
+    assert server.hits["/photo.png"] == 1
+    assert stats == {"images": 1, "failed": 0}
+    assert first == second
+    assert (tmp_path / "two" / second[len("![bg]("):-1]).read_bytes() == SMALL_PNG
+    assert prefetcher.stats()["fetched"] == 1
+    assert prefetcher.stats()["cached"] == 1
+
+
+@pytest.mark.parametrize("path", ["/missing.png", "/slow.png", "/page.html"])
+def test_failed_fetch_keeps_remote_url(server, prefetcher, tmp_path, path):
+    markdown = f"![bg]({server.url}{path})\n\n![bg]({server.url}/photo.png)"
+    localized, stats = _localize(prefetcher, markdown, tmp_path / "work")
+
+    assert stats == {"images": 2, "failed": 1}
+    assert f"![bg]({server.url}{path})" in localized
+    assert f"{server.url}/photo.png" not in localized
+    assert prefetcher.stats()["failures"] == 1
+
+
+def test_oversized_image_is_left_to_browser(server, prefetcher, tmp_path):
+    prefetcher.max_bytes = len(SMALL_PNG) - 1
+    markdown = f"![bg]({server.url}/photo.png)"
+    localized, stats = _localize(prefetcher, markdown, tmp_path / "work")
+
+    assert stats == {"images": 1, "failed": 1}
+    assert localized == markdown
+    # The partial download is not left in the cache directory
+    assert not any(name.startswith(".tmp-asset-") for name in os.listdir(prefetcher.cache.directory))
+
+
+def test_large_image_is_downscaled_to_slide_size(server, prefetcher, tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    prefetcher.max_bytes = 0
+    prefetcher.resolution_scale = 1.0
+    localized, stats = _localize(prefetcher, f"![bg]({server.url}/huge.png)", tmp_path / "work")
+
+    assert stats == {"images": 1, "failed": 0}
+    with Image.open(tmp_path / "work" / localized[len("![bg]("):-1]) as image:
+        # Covers the default 1280x720 slide at the original aspect ratio
+        assert image.size == (1280, 960)
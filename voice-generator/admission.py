@@ -0,0 +1,209 @@
+"""Admission control for synthesis requests.
+
+`AdmissionController` caps how many requests synthesise at once and queues
+the rest in two priority classes: ``interactive`` (previews, waited on by a
+person) and ``bulk`` (deck renders, batch jobs). Interactive requests always
+start first, and bulk requests may only use ``bulk_max_concurrent`` of the
+slots, so a burst of bulk work cannot starve previews.
+
+Each class has a bounded queue. A request that finds its queue full is
+rejected straight away (429), and one that cannot start before its deadline
+or ``max_wait`` is rejected with 503, both with a ``Retry-After`` estimate,
+instead of piling up behind the model.
+"""
+import math
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from models.base import SynthesisCancelled
+
+PRIORITIES = ("interactive", "bulk")
+
+
+class Rejected(Exception):
+    """The request was not admitted; maps to an HTTP error with Retry-After."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class Slot:
+    """An admitted request's claim on a synthesis slot.
+
+    `release` is idempotent, so a slot can be released both by the code
+    that finishes with it and by a safety net such as a response background
+    task.
+    """
+
+    def __init__(self, controller: "AdmissionController", priority: str) -> None:
+        self.priority = priority
+        self._controller = controller
+        self._started = time.monotonic()
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._controller._release(self, time.monotonic() - self._started)
+
+    def __enter__(self) -> "Slot":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+
+class AdmissionController:
+    """Two-class priority admission in front of the models."""
+
+    # How often a queued request re-checks its cancel flag, in seconds
+    CANCEL_POLL = 0.25
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        queue_limits: dict[str, int],
+        bulk_max_concurrent: Optional[int] = None,
+        max_wait: float = 30.0,
+    ) -> None:
+        self.max_concurrent = max(1, max_concurrent)
+        self.bulk_max_concurrent = min(
+            self.max_concurrent, max(1, bulk_max_concurrent or self.max_concurrent)
+        )
+        self.queue_limits = {p: max(0, queue_limits.get(p, 0)) for p in PRIORITIES}
+        self.max_wait = max_wait
+        self._cond = threading.Condition()
+        self._waiting: dict[str, deque] = {p: deque() for p in PRIORITIES}
+        self._running = {p: 0 for p in PRIORITIES}
+        self._admitted = {p: 0 for p in PRIORITIES}
+        self._rejected = {p: 0 for p in PRIORITIES}
+        # Moving average of slot hold time, for Retry-After estimates
+        self._avg_service = 1.0
+
+    # ------------------------------------------------------------------
+
+    def _can_start(self, priority: str, ticket: object) -> bool:
+        """Must be called with the condition held."""
+        if self._waiting[priority][0] is not ticket:
+            return False
+        if sum(self._running.values()) >= self.max_concurrent:
+            return False
+        if priority == "bulk":
+            return not self._waiting["interactive"] and self._running["bulk"] < self.bulk_max_concurrent
+        return True
+
+    def _retry_after(self, priority: str) -> int:
+        """Seconds until a request of *priority* would likely get a slot."""
+        ahead = sum(self._running.values()) + len(self._waiting["interactive"])
+        if priority == "bulk":
+            ahead += len(self._waiting["bulk"])
+        return max(1, math.ceil(self._avg_service * ahead / self.max_concurrent))
+
+    def _reject(self, priority: str, status_code: int, detail: str) -> Rejected:
+        self._rejected[priority] += 1
+        return Rejected(status_code, detail, self._retry_after(priority))
+
+    def acquire(
+        self,
+        priority: str,
+        deadline: Optional[float] = None,
+        cancel=None,
+        bounded: bool = True,
+    ) -> Slot:
+        """Wait for a synthesis slot and return it.
+
+        *deadline* is a ``time.time()`` value. With *bounded* false the
+        request queues even when its class's queue is full (for callers
+        that already limit their own concurrency, like batch items).
+
+        Raises Rejected when the queue is full or no slot frees up in time,
+        and SynthesisCancelled if *cancel* is set while waiting.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}'. Expected one of {list(PRIORITIES)}")
+        wait_until = time.time() + self.max_wait
+        if deadline is not None:
+            wait_until = min(wait_until, deadline)
+
+        ticket = object()
+        with self._cond:
+            queue = self._waiting[priority]
+            queue.append(ticket)
+            if bounded and not self._can_start(priority, ticket) and len(queue) > self.queue_limits[priority]:
+                queue.remove(ticket)
+                raise self._reject(priority, 429, f"Too many queued {priority} requests")
+            try:
+                while not self._can_start(priority, ticket):
+                    if cancel is not None and cancel.is_set():
+                        raise SynthesisCancelled("Request was cancelled while queued")
+                    remaining = wait_until - time.time()
+                    if remaining <= 0:
+                        raise self._reject(priority, 503, "Timed out waiting for synthesis capacity")
+                    self._cond.wait(min(remaining, self.CANCEL_POLL))
+            except BaseException:
+                queue.remove(ticket)
+                # Whoever is now at the head may be able to start
+                self._cond.notify_all()
+                raise
+            queue.popleft()
+            self._running[priority] += 1
+            self._admitted[priority] += 1
+            self._cond.notify_all()
+        return Slot(self, priority)
+
+    def _release(self, slot: Slot, held: float) -> None:
+        with self._cond:
+            self._running[slot.priority] -= 1
+            self._avg_service = 0.9 * self._avg_service + 0.1 * held
+            self._cond.notify_all()
+
+    def queue_depths(self) -> dict[str, int]:
+        with self._cond:
+            return {p: len(q) for p, q in self._waiting.items()}
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "bulk_max_concurrent": self.bulk_max_concurrent,
+                "max_wait_s": self.max_wait,
+                "avg_service_s": round(self._avg_service, 4),
+                "classes": {
+                    p: {
+                        "running": self._running[p],
+                        "queued": len(self._waiting[p]),
+                        "queue_limit": self.queue_limits[p],
+                        "admitted": self._admitted[p],
+                        "rejected": self._rejected[p],
+                    }
+                    for p in PRIORITIES
+                },
+            }
+
+
+_CONTROLLER: Optional[AdmissionController] = None
+_CONTROLLER_LOCK = threading.Lock()
+
+
+def get_admission() -> AdmissionController:
+    """Return the process-wide admission controller, built from config on first use."""
+    import config  # local import to avoid circular dependency at module level
+
+    global _CONTROLLER
+    with _CONTROLLER_LOCK:
+        if _CONTROLLER is None:
+            _CONTROLLER = AdmissionController(
+                max_concurrent=config.ADMISSION_MAX_CONCURRENT,
+                queue_limits={
+                    "interactive": config.ADMISSION_INTERACTIVE_QUEUE,
+                    "bulk": config.ADMISSION_BULK_QUEUE,
+                },
+                bulk_max_concurrent=config.ADMISSION_BULK_MAX_CONCURRENT,
+                max_wait=config.ADMISSION_MAX_WAIT,
+            )
+    return _CONTROLLER
@@ -0,0 +1,30 @@
+from .encoder import ChunkEncoder, can_encode_incrementally, open_encoder
+from .formats import FORMATS, OutputFormat, available_formats, encode, get_format, output_rate, transcode
+from .resample import StreamResampler, resample, resample_stream
+from .stitch import silence, stitch, trim_silence
+from .wav import STREAMING_SIZE, decode_wav, encode_wav, to_pcm16, wav_duration, wav_header
+
+__all__ = [
+    "ChunkEncoder",
+    "FORMATS",
+    "OutputFormat",
+    "STREAMING_SIZE",
+    "StreamResampler",
+    "available_formats",
+    "can_encode_incrementally",
+    "decode_wav",
+    "encode",
+    "encode_wav",
+    "get_format",
+    "open_encoder",
+    "output_rate",
+    "resample",
+    "resample_stream",
+    "silence",
+    "stitch",
+    "to_pcm16",
+    "transcode",
+    "trim_silence",
+    "wav_duration",
+    "wav_header",
+]
@@ -0,0 +1,109 @@
+import tempfile
+from abc import ABC, abstractmethod
+from typing import Callable, Optional
+
+import numpy as np
+import soundfile as sf
+
+from .formats import OutputFormat, _libsndfile_supports
+from .wav import to_pcm16, wav_header
+
+# Size of the blocks copied out of the spool file by SpooledEncoder
+_COPY_BLOCK = 1024 * 1024
+
+
+class ChunkEncoder(ABC):
+    """Encode PCM chunks incrementally and pass the bytes to *sink*.
+
+    Call `write` for each chunk, then `finish`. `finish` may return a
+    replacement for the start of the output (e.g. a WAV header that now
+    carries the real length), which the sink's owner should patch in.
+    """
+
+    def __init__(self, sample_rate: int, sink: Callable[[bytes], None]) -> None:
+        self.sample_rate = sample_rate
+        self.sink = sink
+
+    @abstractmethod
+    def write(self, samples: np.ndarray) -> None:
+        """Encode *samples* (mono float PCM at ``sample_rate``)."""
+
+    @abstractmethod
+    def finish(self) -> Optional[bytes]:
+        """Flush the output; return a replacement for its start, if any."""
+
+
+class WavEncoder(ChunkEncoder):
+    """16-bit PCM WAV: header first, then PCM as it arrives."""
+
+    def __init__(self, sample_rate: int, sink: Callable[[bytes], None]) -> None:
+        super().__init__(sample_rate, sink)
+        self.data_size = 0
+        self.sink(wav_header(sample_rate))
+
+    def write(self, samples: np.ndarray) -> None:
+        pcm = to_pcm16(samples)
+        self.data_size += len(pcm)
+        self.sink(pcm)
+
+    def finish(self) -> Optional[bytes]:
+        return wav_header(self.sample_rate, self.data_size)
+
+
+class SpooledEncoder(ChunkEncoder):
+    """Any libsndfile format, encoded into an anonymous temp file.
+
+    libsndfile needs to seek while writing containers like FLAC and Ogg,
+    so chunks are encoded into a disk-backed temp file. On `finish` the
+    file is copied to the sink in fixed-size blocks. Memory use stays
+    constant; disk use is the size of the encoded output.
+    """
+
+    def __init__(
+        self,
+        fmt: OutputFormat,
+        sample_rate: int,
+        sink: Callable[[bytes], None],
+    ) -> None:
+        super().__init__(sample_rate, sink)
+        self._spool = tempfile.TemporaryFile()
+        self._file = sf.SoundFile(
+            self._spool,
+            mode="w",
+            samplerate=sample_rate,
+            channels=1,
+            format=fmt.sf_format,
+            subtype=fmt.sf_subtype,
+        )
+
+    def write(self, samples: np.ndarray) -> None:
+        self._file.write(samples)
+
+    def finish(self) -> Optional[bytes]:
+        self._file.close()
+        self._spool.seek(0)
+        try:
+            while block := self._spool.read(_COPY_BLOCK):
+                self.sink(block)
+        finally:
+            self._spool.close()
+        return None
+
+
+def can_encode_incrementally(fmt: OutputFormat) -> bool:
+    """Whether `open_encoder` supports *fmt* on this host. Formats only
+    available through ffmpeg are encoded in one go, not chunk by chunk."""
+    return fmt.name == "wav" or _libsndfile_supports(fmt)
+
+
+def open_encoder(
+    fmt: OutputFormat,
+    sample_rate: int,
+    sink: Callable[[bytes], None],
+) -> ChunkEncoder:
+    """Return an incremental encoder for *fmt* writing to *sink*."""
+    if not can_encode_incrementally(fmt):
+        raise ValueError(f"Output format '{fmt.name}' cannot be encoded incrementally on this host")
+    if fmt.name == "wav":
+        return WavEncoder(sample_rate, sink)
+    return SpooledEncoder(fmt, sample_rate, sink)
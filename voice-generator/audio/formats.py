@@ -0,0 +1,129 @@
+import io
+import shutil
+import subprocess
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import soundfile as sf
+
+from .resample import resample
+from .wav import decode_wav, encode_wav
+
+
+@dataclass(frozen=True)
+class OutputFormat:
+    """An encodable output format."""
+    name: str
+    extension: str
+    content_type: str
+    # libsndfile container/codec, used when the local build supports them
+    sf_format: str
+    sf_subtype: str
+    # Sample rates the codec accepts; None means any
+    sample_rates: Optional[tuple[int, ...]] = None
+
+
+FORMATS: dict[str, OutputFormat] = {
+    f.name: f
+    for f in (
+        OutputFormat("wav", ".wav", "audio/wav", "WAV", "PCM_16"),
+        OutputFormat("flac", ".flac", "audio/flac", "FLAC", "PCM_16"),
+        OutputFormat("ogg", ".ogg", "audio/ogg", "OGG", "VORBIS"),
+        OutputFormat(
+            "opus", ".opus", "audio/ogg; codecs=opus", "OGG", "OPUS",
+            sample_rates=(8_000, 12_000, 16_000, 24_000, 48_000),
+        ),
+        OutputFormat("mp3", ".mp3", "audio/mpeg", "MP3", "MPEG_LAYER_III"),
+    )
+}
+
+
+def _libsndfile_supports(fmt: OutputFormat) -> bool:
+    return (
+        fmt.sf_format in sf.available_formats()
+        and fmt.sf_subtype in sf.available_subtypes(fmt.sf_format)
+    )
+
+
+def _ffmpeg_supports(fmt: OutputFormat) -> bool:
+    # Only used as a fallback for MP3 on libsndfile builds older than 1.1.
+    return fmt.name == "mp3" and shutil.which("ffmpeg") is not None
+
+
+def available_formats() -> list[str]:
+    """Return the names of the formats that can be encoded on this host."""
+    return [
+        name for name, fmt in FORMATS.items()
+        if _libsndfile_supports(fmt) or _ffmpeg_supports(fmt)
+    ]
+
+
+def get_format(name: str, sample_rate: Optional[int] = None) -> OutputFormat:
+    """Look up *name* and check it can be encoded at *sample_rate*.
+
+    Raises ValueError for unknown or locally unavailable formats, and for
+    sample rates the codec does not accept.
+    """
+    fmt = FORMATS.get(name)
+    if fmt is None:
+        raise ValueError(f"Unknown output format '{name}'. Available: {available_formats()}")
+    if not (_libsndfile_supports(fmt) or _ffmpeg_supports(fmt)):
+        raise ValueError(
+            f"Output format '{name}' has no local encoder. Available: {available_formats()}"
+        )
+    if sample_rate is not None and fmt.sample_rates and sample_rate not in fmt.sample_rates:
+        raise ValueError(
+            f"Output format '{name}' supports sample rates {list(fmt.sample_rates)}, got {sample_rate}"
+        )
+    return fmt
+
+
+def output_rate(fmt: OutputFormat, native_rate: int, sample_rate: Optional[int] = None) -> int:
+    """Rate to encode *fmt* at: *sample_rate* if set, else *native_rate*, or
+    the nearest rate the codec accepts when it does not take *native_rate*
+    (e.g. Opus gets 24000 Hz for a 22050 Hz model)."""
+    if sample_rate:
+        return sample_rate
+    if fmt.sample_rates and native_rate not in fmt.sample_rates:
+        return min(fmt.sample_rates, key=lambda rate: (abs(rate - native_rate), -rate))
+    return native_rate
+
+
+def encode(samples: np.ndarray, sample_rate: int, fmt: OutputFormat) -> bytes:
+    """Encode float samples at *sample_rate* into *fmt*."""
+    if fmt.name == "wav":
+        return encode_wav(samples, sample_rate)
+    if _libsndfile_supports(fmt):
+        buf = io.BytesIO()
+        sf.write(buf, samples, sample_rate, format=fmt.sf_format, subtype=fmt.sf_subtype)
+        return buf.getvalue()
+    return _encode_with_ffmpeg(encode_wav(samples, sample_rate), fmt)
+
+
+def _encode_with_ffmpeg(wav_bytes: bytes, fmt: OutputFormat) -> bytes:
+    proc = subprocess.run(
+        ["ffmpeg", "-hide_banner", "-loglevel", "error",
+         "-f", "wav", "-i", "pipe:0", "-f", fmt.name, "pipe:1"],
+        input=wav_bytes,
+        capture_output=True,
+        check=True,
+    )
+    return proc.stdout
+
+
+def transcode(
+    wav_bytes: bytes,
+    fmt: OutputFormat,
+    sample_rate: Optional[int] = None,
+) -> bytes:
+    """Convert model WAV output into *fmt*, resampling to *sample_rate* if set
+    (or to a rate the codec accepts, see `output_rate`).
+
+    Native-rate WAV requests are returned untouched.
+    """
+    if fmt.name == "wav" and sample_rate is None:
+        return wav_bytes
+    samples, native_rate = decode_wav(wav_bytes)
+    target_rate = output_rate(fmt, native_rate, sample_rate)
+    return encode(resample(samples, native_rate, target_rate), target_rate, fmt)
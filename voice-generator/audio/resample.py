@@ -0,0 +1,109 @@
+from typing import Iterable, Iterator
+
+import numpy as np
+
+
+def resample(samples: np.ndarray, src_rate: int, dst_rate: int) -> np.ndarray:
+    """Band-limited resampling of mono float audio via the real FFT.
+
+    The spectrum is truncated (downsampling) or zero-padded (upsampling) to
+    the target length, which is an ideal low-pass and interpolation in one
+    vectorised step. For narration-length clips this is both faster and
+    cleaner than a time-domain filter written in Python.
+    """
+    if src_rate == dst_rate or samples.size == 0:
+        return samples
+
+    n_in = samples.shape[0]
+    n_out = max(1, int(round(n_in * dst_rate / src_rate)))
+
+    spectrum = np.fft.rfft(samples.astype(np.float32, copy=False))
+    out_bins = n_out // 2 + 1
+    resized = np.zeros(out_bins, dtype=spectrum.dtype)
+    keep = min(out_bins, spectrum.shape[0])
+    resized[:keep] = spectrum[:keep]
+
+    out = np.fft.irfft(resized, n_out) * (n_out / n_in)
+    return out.astype(np.float32, copy=False)
+
+
+class StreamResampler:
+    """Chunk-by-chunk resampling of mono float audio, continuous across chunks.
+
+    `resample` treats its input as one periodic block, so resampling a
+    stream chunk by chunk with it leaves discontinuities (clicks) at every
+    chunk boundary. This is a polyphase windowed-sinc resampler instead: the
+    ratio is reduced to L/M, each output sample is a Kaiser-windowed sinc
+    over the ``2 * half_width`` nearest input samples, and the input tail
+    those windows still need is carried over to the next chunk. Output lags
+    input by *half_width* input samples; `flush` returns the remainder.
+    """
+
+    def __init__(self, src_rate: int, dst_rate: int, half_width: int = 16, beta: float = 8.0) -> None:
+        divisor = np.gcd(src_rate, dst_rate)
+        self.up = dst_rate // divisor
+        self.down = src_rate // divisor
+        self.half_width = half_width
+
+        # One row of taps per output phase: output n sits at input position
+        # n * down / up, i.e. integer sample (n * down) // up plus phase / up
+        cutoff = min(1.0, dst_rate / src_rate) * 0.95
+        phases = np.arange(self.up)[:, None] / self.up
+        offsets = np.arange(-half_width + 1, half_width + 1)[None, :]
+        t = phases - offsets
+        window = np.i0(beta * np.sqrt(np.clip(1 - (t / half_width) ** 2, 0, None))) / np.i0(beta)
+        taps = cutoff * np.sinc(cutoff * t) * window
+        self._taps = (taps / taps.sum(axis=1, keepdims=True)).astype(np.float32)
+
+        # Input kept for upcoming windows; _buffer[0] is input sample _first
+        # (negative indices are the zeros before the stream starts)
+        self._buffer = np.zeros(half_width, dtype=np.float32)
+        self._first = -half_width
+        self._received = 0
+        self._produced = 0
+
+    def _emit(self, count: int) -> np.ndarray:
+        n = self._produced + np.arange(count)
+        base = n * self.down // self.up
+        index = base[:, None] + np.arange(-self.half_width + 1, self.half_width + 1)[None, :] - self._first
+        out = np.einsum("ij,ij->i", self._buffer[index], self._taps[n * self.down % self.up])
+        self._produced += count
+
+        # Drop input no later window reaches
+        drop = (self._produced * self.down // self.up) - self.half_width + 1 - self._first
+        if drop > 0:
+            self._buffer = self._buffer[drop:]
+            self._first += drop
+        return out.astype(np.float32, copy=False)
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Feed *samples*; return the output they complete."""
+        self._buffer = np.concatenate([self._buffer, samples.astype(np.float32, copy=False)])
+        self._received += samples.shape[0]
+        # Output n needs input up to (n * down) // up + half_width
+        ready = ((self._received - self.half_width) * self.up + self.down - 1) // self.down
+        return self._emit(max(0, ready - self._produced))
+
+    def flush(self) -> np.ndarray:
+        """Return the remaining output, as if the stream were followed by silence."""
+        total = int(round(self._received * self.up / self.down))
+        self._buffer = np.concatenate([self._buffer, np.zeros(self.half_width, dtype=np.float32)])
+        return self._emit(max(0, total - self._produced))
+
+
+def resample_stream(chunks: Iterable[np.ndarray], src_rate: int, dst_rate: int) -> Iterator[np.ndarray]:
+    """Resample a stream of chunks without clicks at their boundaries (see
+    `StreamResampler`). Chunks pass through untouched when the rates match.
+    Closing the returned generator closes *chunks*."""
+    try:
+        if src_rate == dst_rate:
+            yield from chunks
+            return
+        resampler = StreamResampler(src_rate, dst_rate)
+        for chunk in chunks:
+            yield resampler.process(chunk)
+        yield resampler.flush()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
@@ -0,0 +1,43 @@
+import numpy as np
+
+# Samples quieter than this (float PCM, full scale 1.0) count as silence
+SILENCE_THRESHOLD = 1e-3
+
+
+def trim_silence(
+    samples: np.ndarray,
+    sample_rate: int,
+    margin: float = 0.01,
+    threshold: float = SILENCE_THRESHOLD,
+) -> np.ndarray:
+    """Strip leading and trailing silence, keeping *margin* seconds on each side.
+
+    All-silent input is returned unchanged.
+    """
+    loud = np.flatnonzero(np.abs(samples) > threshold)
+    if loud.size == 0:
+        return samples
+    pad = int(margin * sample_rate)
+    start = max(0, loud[0] - pad)
+    end = min(len(samples), loud[-1] + 1 + pad)
+    return samples[start:end]
+
+
+def silence(seconds: float, sample_rate: int) -> np.ndarray:
+    return np.zeros(max(0, int(round(seconds * sample_rate))), dtype=np.float32)
+
+
+def stitch(segments: list[np.ndarray], pauses: list[float], sample_rate: int) -> np.ndarray:
+    """Join *segments*, inserting ``pauses[i]`` seconds of silence after segment *i*.
+
+    Segments should already be trimmed (see `trim_silence`) so that every
+    gap is exactly the requested pause. *pauses* has one entry fewer than
+    *segments*.
+    """
+    if not segments:
+        return np.zeros(0, dtype=np.float32)
+    parts = [segments[0]]
+    for pause, segment in zip(pauses, segments[1:]):
+        parts.append(silence(pause, sample_rate))
+        parts.append(segment)
+    return np.concatenate(parts).astype(np.float32, copy=False)
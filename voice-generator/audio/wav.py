@@ -0,0 +1,69 @@
+import io
+import struct
+from typing import Optional
+
+import numpy as np
+import soundfile as sf
+
+# Placeholder RIFF/data size used when the final length is unknown. Most
+# players (and ffmpeg, browsers, soundfile) treat it as "read until EOF".
+STREAMING_SIZE = 0xFFFFFFFF
+
+
+def wav_header(
+    sample_rate: int,
+    data_size: Optional[int] = None,
+    channels: int = 1,
+    bits_per_sample: int = 16,
+) -> bytes:
+    """Return a 44-byte PCM WAV header.
+
+    When *data_size* is None the RIFF and data chunk sizes are set to
+    ``STREAMING_SIZE`` so the header can be sent before the audio length
+    is known.
+    """
+    block_align = channels * bits_per_sample // 8
+    if data_size is None:
+        riff_size = data_size = STREAMING_SIZE
+    else:
+        riff_size = 36 + data_size
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        riff_size,
+        b"WAVE",
+        b"fmt ",
+        16,  # fmt chunk size
+        1,  # PCM
+        channels,
+        sample_rate,
+        sample_rate * block_align,
+        block_align,
+        bits_per_sample,
+        b"data",
+        data_size,
+    )
+
+
+def to_pcm16(samples: np.ndarray) -> bytes:
+    """Convert float samples in [-1, 1] to little-endian int16 PCM bytes."""
+    clipped = np.clip(samples, -1.0, 1.0)
+    return np.rint(clipped * 32767.0).astype("<i2").tobytes()
+
+
+def encode_wav(samples: np.ndarray, sample_rate: int) -> bytes:
+    """Encode float samples as a complete 16-bit PCM WAV file."""
+    buf = io.BytesIO()
+    sf.write(buf, samples, sample_rate, format="WAV", subtype="PCM_16")
+    return buf.getvalue()
+
+
+def wav_duration(data: bytes) -> float:
+    """Length of the WAV file *data* in seconds, read from its header."""
+    return sf.info(io.BytesIO(data)).duration
+
+
+def decode_wav(data: bytes) -> tuple[np.ndarray, int]:
+    """Decode WAV bytes into (float32 samples, sample rate)."""
+    samples, sample_rate = sf.read(io.BytesIO(data), dtype="float32")
+    return samples, sample_rate
@@ -0,0 +1 @@
+"""Reproducible throughput/latency benchmark for voice-generator (``python -m bench``)."""
@@ -0,0 +1,234 @@
+"""Voice-generator benchmark.
+
+Drives ``TTSModel.generate`` directly, ``POST /generate`` and
+``POST /generate/save`` with short, medium and long scripts at one or more
+concurrency levels, and prints a JSON report (throughput, p50/p95/p99
+latency, real-time factor, peak RSS) suitable for diffing across commits.
+
+Run from the voice-generator directory::
+
+    # Server and storage overhead only, no Kokoro or network needed
+    python -m bench --model fake --storage memory --concurrency 1,4,16
+
+    # Real model, S3 path against a local moto stand-in
+    python -m bench --model kokoro --targets save --storage s3 --s3-stand-in
+
+    # An already running server (model target is skipped)
+    python -m bench --url http://localhost:8000 --targets generate,save
+
+Unless ``--url`` is given the service runs in-process behind a real uvicorn
+listener, so HTTP overhead is included and peak RSS covers the server. The
+synthesis cache is disabled unless ``--cache`` is passed, so repeated
+scripts are re-synthesised.
+"""
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from .corpus import load_corpus
+from .runner import (
+    HttpClient,
+    Scenario,
+    generate_target,
+    model_target,
+    remote_rss,
+    run_scenario,
+    save_target,
+)
+
+TARGETS = ("model", "generate", "save")
+
+
+def _parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m bench", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--model", default="fake", help="TTS model name (default: fake).")
+    parser.add_argument("--voice", default="default")
+    parser.add_argument("--language", default="a")
+    parser.add_argument("--targets", default=",".join(TARGETS), help="Comma list of: model, generate, save.")
+    parser.add_argument("--sizes", default=None, help="Comma list of corpus sizes (default: all).")
+    parser.add_argument("--corpus", default=None, help="JSON corpus file (default: built-in).")
+    parser.add_argument("--concurrency", default="1,4", help="Comma list of concurrency levels.")
+    parser.add_argument("--requests", type=int, default=16, help="Requests per scenario.")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured requests per scenario.")
+    parser.add_argument("--storage", default="memory", help="Backend for the save target: memory, local or s3.")
+    parser.add_argument("--cache", action="store_true", help="Leave the synthesis cache enabled.")
+    parser.add_argument("--url", default=None, help="Benchmark a running server instead of an in-process one.")
+    parser.add_argument("--s3-stand-in", action="store_true", help="Serve S3 from a local moto server.")
+    parser.add_argument("--output", default=None, help="Write the JSON report here instead of stdout.")
+    return parser.parse_args(argv)
+
+
+def _csv(value: str) -> list[str]:
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_s3_stand_in():
+    """Start a moto S3 server and point the S3 config at it."""
+    try:
+        from moto.server import ThreadedMotoServer  # noqa: PLC0415
+    except ImportError:
+        sys.exit("--s3-stand-in requires moto: pip install 'moto[server]'")
+
+    port = _free_port()
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=port, verbose=False)
+    server.start()
+    os.environ.update({
+        "S3_ENDPOINT_URL": f"http://127.0.0.1:{port}",
+        "S3_BUCKET": "voice-bench",
+        "S3_REGION": "us-east-1",
+        "AWS_ACCESS_KEY_ID": "bench",
+        "AWS_SECRET_ACCESS_KEY": "bench",
+    })
+    import boto3  # noqa: PLC0415
+    boto3.client(
+        "s3",
+        endpoint_url=os.environ["S3_ENDPOINT_URL"],
+        region_name="us-east-1",
+        aws_access_key_id="bench",
+        aws_secret_access_key="bench",
+    ).create_bucket(Bucket="voice-bench")
+    return server
+
+
+def _start_server():
+    """Run the app under uvicorn on a free local port; return (server, url)."""
+    import uvicorn  # noqa: PLC0415
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config("server:app", host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="bench-server", daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 300
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            sys.exit("In-process server failed to start")
+        time.sleep(0.05)
+    return server, thread, f"http://127.0.0.1:{port}"
+
+
+def _wait_ready(client: HttpClient, timeout: float = 600.0) -> None:
+    """Block until the service's warmup has finished."""
+    deadline = time.monotonic() + timeout
+    while True:
+        status, body = client.request("GET", "/ready")
+        if status == 200:
+            return
+        if b'"failed"' in body or time.monotonic() > deadline:
+            sys.exit(f"Service did not become ready: {body[:500]!r}")
+        time.sleep(0.2)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    args = _parse_args(argv)
+    targets = _csv(args.targets)
+    unknown = set(targets) - set(TARGETS)
+    if unknown:
+        sys.exit(f"Unknown targets: {sorted(unknown)}")
+    if args.url and "model" in targets:
+        targets.remove("model")
+
+    corpus = load_corpus(args.corpus)
+    sizes = _csv(args.sizes) if args.sizes else list(corpus)
+    concurrency = [int(c) for c in _csv(args.concurrency)]
+
+    # Configure the service before config.py is imported
+    scratch = tempfile.TemporaryDirectory(prefix="voice-bench-")
+    os.environ.setdefault("ENV", "benchmark")
+    os.environ.setdefault("LOCAL_OUTPUT_DIR", os.path.join(scratch.name, "output"))
+    os.environ.setdefault("CACHE_DIR", os.path.join(scratch.name, "cache"))
+    os.environ.setdefault("WARMUP_MODELS", args.model)
+    if not args.cache:
+        os.environ["CACHE_ENABLED"] = "false"
+
+    moto = _start_s3_stand_in() if args.s3_stand_in else None
+    server = thread = None
+    try:
+        if args.url:
+            url = args.url
+        else:
+            server, thread, url = _start_server()
+        client = HttpClient(url)
+        _wait_ready(client)
+
+        if args.url:
+            rss = remote_rss(client)
+        else:
+            from metrics import rss_bytes  # noqa: PLC0415
+            rss = rss_bytes
+
+        def make_target(name: str):
+            if name == "model":
+                return model_target(args.model, args.voice, args.language)
+            if name == "generate":
+                return generate_target(client, args.model, args.voice, args.language)
+            return save_target(client, args.model, args.voice, args.language, args.storage)
+
+        results = []
+        for name in targets:
+            target = make_target(name)
+            for size in sizes:
+                for level in concurrency:
+                    scenario = Scenario(name, size, level, args.requests)
+                    print(f"bench: {name} {size} x{level}", file=sys.stderr)
+                    results.append(run_scenario(scenario, target, corpus[size], rss, args.warmup))
+    finally:
+        if server is not None:
+            server.should_exit = True
+            thread.join(timeout=10)
+        if moto is not None:
+            moto.stop()
+        scratch.cleanup()
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": {"platform": platform.platform(), "cpus": os.cpu_count()},
+        "settings": {
+            "model": args.model,
+            "voice": args.voice,
+            "language": args.language,
+            "storage": args.storage,
+            "cache": args.cache,
+            "url": args.url,
+            "s3_stand_in": args.s3_stand_in,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "corpus_chars": {size: [len(s) for s in corpus[size]] for size in sizes},
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
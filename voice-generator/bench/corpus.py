@@ -0,0 +1,65 @@
+"""Benchmark scripts grouped by length.
+
+The built-in corpus is generated deterministically from a fixed set of
+narration sentences, so every run (and every commit) synthesises exactly
+the same text. A custom corpus can be supplied as a JSON file mapping
+size names to lists of scripts, e.g. ``{"short": ["..."], "long": ["..."]}``.
+"""
+import json
+from typing import Optional
+
+_SENTENCES = [
+    "Welcome to today's lecture on distributed systems.",
+    "We will start with a quick recap of last week's material.",
+    "A process is an instance of a program that is being executed.",
+    "Threads share the memory of the process that created them.",
+    "Message passing avoids many of the pitfalls of shared state.",
+    "Consensus protocols let a group of machines agree on a single value.",
+    "Latency is the time it takes for one request to complete.",
+    "Throughput measures how many requests finish per unit of time.",
+    "Caching trades memory for repeated computation.",
+    "Always measure before and after you optimise anything.",
+    "Replication keeps copies of data on several machines.",
+    "A partition can separate the network into isolated groups.",
+    "Clocks on different machines drift apart over time.",
+    "Idempotent operations can be retried safely.",
+    "Back-pressure stops a fast producer from overwhelming a slow consumer.",
+    "Let us look at an example on the next slide.",
+]
+
+# Number of sentences per script and scripts per size
+_SIZES = {
+    "short": (1, 8),
+    "medium": (8, 8),
+    "long": (80, 4),
+}
+
+
+def _script(sentences: int, offset: int) -> str:
+    lines = []
+    for i in range(sentences):
+        lines.append(_SENTENCES[(offset + i) % len(_SENTENCES)])
+    # A paragraph break every four sentences, like narration split per slide
+    paragraphs = [" ".join(lines[i:i + 4]) for i in range(0, len(lines), 4)]
+    return "\n".join(paragraphs)
+
+
+def builtin_corpus() -> dict[str, list[str]]:
+    """Return the built-in corpus: ``{"short": [...], "medium": [...], "long": [...]}``."""
+    corpus = {}
+    for size, (sentences, count) in _SIZES.items():
+        corpus[size] = [_script(sentences, offset * 3) for offset in range(count)]
+    return corpus
+
+
+def load_corpus(path: Optional[str] = None) -> dict[str, list[str]]:
+    """Load a corpus from *path*, or return the built-in one."""
+    if path is None:
+        return builtin_corpus()
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or not all(
+        isinstance(v, list) and v and all(isinstance(s, str) for s in v) for v in data.values()
+    ):
+        raise ValueError(f"{path}: expected an object mapping size names to lists of scripts")
+    return data
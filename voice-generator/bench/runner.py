@@ -0,0 +1,247 @@
+"""Benchmark targets and the load driver."""
+import http.client
+import io
+import json
+import math
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Optional
+from urllib.parse import urlsplit
+
+import soundfile as sf
+
+# A target sends one script and returns the seconds of audio produced.
+Target = Callable[[str], float]
+
+
+@dataclass
+class Scenario:
+    target: str
+    corpus: str
+    concurrency: int
+    requests: int
+
+
+# ---------------------------------------------------------------------------
+# Targets
+# ---------------------------------------------------------------------------
+
+class HttpClient:
+    """Keep-alive JSON client with one connection per calling thread."""
+
+    def __init__(self, base_url: str, timeout: float = 600.0) -> None:
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return conn
+
+    def request(self, method: str, path: str, payload: Optional[dict] = None) -> tuple[int, bytes]:
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        # A reused connection may have been closed by the server's keep-alive
+        # timeout, so retry once on a fresh one
+        for attempt in range(2):
+            reused = getattr(self._local, "conn", None) is not None
+            conn = self._connection()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                return response.status, response.read()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                self._local.conn = None
+                if not reused or attempt:
+                    raise
+        raise AssertionError("unreachable")
+
+
+def model_target(model_name: str, voice: str, language: str) -> Target:
+    """Call ``TTSModel.generate`` in-process, bypassing HTTP and storage."""
+    from audio import decode_wav  # noqa: PLC0415
+    from models import get_model  # noqa: PLC0415
+    from models.base import TTSRequest  # noqa: PLC0415
+
+    model = get_model(model_name)
+
+    def run(text: str) -> float:
+        wav = model.generate(TTSRequest(text=text, voice=voice, language=language))
+        samples, rate = decode_wav(wav)
+        return len(samples) / rate
+
+    return run
+
+
+def generate_target(client: HttpClient, model_name: str, voice: str, language: str) -> Target:
+    """POST /generate and measure the returned WAV."""
+
+    def run(text: str) -> float:
+        status, body = client.request(
+            "POST", "/generate",
+            {"text": text, "model": model_name, "voice": voice, "language": language},
+        )
+        if status != 200:
+            raise RuntimeError(f"/generate returned {status}: {body[:200]!r}")
+        return sf.info(io.BytesIO(body)).duration
+
+    return run
+
+
+def save_target(client: HttpClient, model_name: str, voice: str, language: str, storage: str) -> Target:
+    """POST /generate/save to *storage* and read the duration from the response."""
+
+    def run(text: str) -> float:
+        status, body = client.request(
+            "POST", "/generate/save",
+            {"text": text, "model": model_name, "voice": voice, "language": language, "storage": storage},
+        )
+        if status != 200:
+            raise RuntimeError(f"/generate/save returned {status}: {body[:200]!r}")
+        return json.loads(body)["duration"] or 0.0
+
+    return run
+
+
+# ---------------------------------------------------------------------------
+# Memory sampling
+# ---------------------------------------------------------------------------
+
+class PeakSampler:
+    """Poll *read* in a background thread and keep the largest value seen."""
+
+    def __init__(self, read: Callable[[], Optional[int]], interval: float = 0.05) -> None:
+        self._read = read
+        self._interval = interval
+        self._stop = threading.Event()
+        self.peak = 0
+        self._thread = threading.Thread(target=self._run, name="bench-rss", daemon=True)
+
+    def _sample(self) -> None:
+        try:
+            value = self._read()
+        except Exception:
+            return
+        if value is not None:
+            self.peak = max(self.peak, value)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            self._sample()
+
+    def __enter__(self) -> "PeakSampler":
+        self._sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+def remote_rss(client: HttpClient) -> Callable[[], Optional[int]]:
+    """Read the server's RSS from its /metrics endpoint."""
+
+    def read() -> Optional[int]:
+        status, body = client.request("GET", "/metrics")
+        if status != 200:
+            return None
+        for line in body.decode("utf-8").splitlines():
+            if line.startswith("process_resident_memory_bytes "):
+                return int(float(line.split()[1]))
+        return None
+
+    return read
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+def percentile(values: list[float], p: float) -> float:
+    """Nearest-rank percentile of *values* (0 if empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(p / 100.0 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def run_scenario(
+    scenario: Scenario,
+    target: Target,
+    scripts: list[str],
+    rss: Callable[[], Optional[int]],
+    warmup: int = 1,
+) -> dict:
+    """Drive *target* with *scenario* and return its result record."""
+    for i in range(warmup):
+        target(scripts[i % len(scripts)])
+
+    latencies: list[float] = []
+    rtfs: list[float] = []
+    audio_seconds = 0.0
+    characters = 0
+    errors: list[str] = []
+    lock = threading.Lock()
+
+    def one(index: int) -> None:
+        nonlocal audio_seconds, characters
+        text = scripts[index % len(scripts)]
+        start = time.perf_counter()
+        try:
+            seconds = target(text)
+        except Exception as exc:
+            with lock:
+                errors.append(str(exc))
+            return
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            audio_seconds += seconds
+            characters += len(text)
+            if elapsed > 0:
+                rtfs.append(seconds / elapsed)
+
+    with PeakSampler(rss) as sampler:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=scenario.concurrency, thread_name_prefix="bench") as pool:
+            list(pool.map(one, range(scenario.requests)))
+        wall = time.perf_counter() - start
+
+    ms = [x * 1000.0 for x in latencies]
+    return {
+        "target": scenario.target,
+        "corpus": scenario.corpus,
+        "concurrency": scenario.concurrency,
+        "requests": scenario.requests,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "wall_seconds": round(wall, 4),
+        "throughput_rps": round(len(latencies) / wall, 3) if wall else 0.0,
+        "characters_per_second": round(characters / wall, 1) if wall else 0.0,
+        "latency_ms": {
+            "mean": round(statistics.fmean(ms), 2) if ms else 0.0,
+            "p50": round(percentile(ms, 50), 2),
+            "p95": round(percentile(ms, 95), 2),
+            "p99": round(percentile(ms, 99), 2),
+            "max": round(max(ms), 2) if ms else 0.0,
+        },
+        "real_time_factor": {
+            # Per-request audio seconds per wall second, and for the whole run
+            "p50": round(percentile(rtfs, 50), 3),
+            "mean": round(statistics.fmean(rtfs), 3) if rtfs else 0.0,
+            "aggregate": round(audio_seconds / wall, 3) if wall else 0.0,
+        },
+        "audio_seconds": round(audio_seconds, 3),
+        "peak_rss_bytes": sampler.peak,
+    }
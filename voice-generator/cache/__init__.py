@@ -0,0 +1,37 @@
+from typing import Optional
+
+from .disk import DiskCache
+from .memory import LRUCache
+from .synthesis import CacheStats, SynthesisCache, make_key
+
+_SYNTHESIS_CACHE: Optional[SynthesisCache] = None
+
+
+def get_synthesis_cache() -> SynthesisCache:
+    """Return the process-wide synthesis cache, building it on first use.
+
+    Sizes and the on-disk location are read from the application config
+    (config.py). Setting ``CACHE_DISK_MAX_BYTES=0`` disables the disk tier.
+    """
+    import config  # local import to avoid circular dependency at module level
+
+    global _SYNTHESIS_CACHE
+    if _SYNTHESIS_CACHE is None:
+        disk = None
+        if config.CACHE_DISK_MAX_BYTES > 0:
+            disk = DiskCache(config.CACHE_DIR, config.CACHE_DISK_MAX_BYTES)
+        _SYNTHESIS_CACHE = SynthesisCache(
+            memory=LRUCache(config.CACHE_MEMORY_MAX_BYTES),
+            disk=disk,
+        )
+    return _SYNTHESIS_CACHE
+
+
+__all__ = [
+    "CacheStats",
+    "DiskCache",
+    "LRUCache",
+    "SynthesisCache",
+    "get_synthesis_cache",
+    "make_key",
+]
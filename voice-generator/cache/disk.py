@@ -0,0 +1,101 @@
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+
+class DiskCache:
+    """On-disk ``bytes`` store bounded by total size.
+
+    Each entry is a file named after its key, sharded by the first two
+    characters so no single directory grows too large. Writes go through a
+    temporary file and ``os.replace`` so readers never observe a partial
+    entry.
+
+    Sizes and recency are kept in an in-memory LRU index, built once from
+    the files' mtimes at start, so eviction pops least-recently-used
+    entries without touching the rest of the directory. Reads also bump the
+    file's mtime, so the order survives restarts.
+    """
+
+    _SUFFIX = ".bin"
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> size, least recently used first
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()
+        self._size = 0
+        self._scan()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}{self._SUFFIX}"
+
+    def _scan(self) -> None:
+        """Rebuild the index from whatever is already on disk, oldest first."""
+        entries = []
+        for path in self.directory.glob(f"*/*{self._SUFFIX}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+        for _mtime, key, size in sorted(entries):
+            self._sizes[key] = size
+            self._size += size
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            if key in self._sizes:
+                self._sizes.move_to_end(key)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def put(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(value)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+        with self._lock:
+            self._size += len(value) - self._sizes.pop(key, 0)
+            self._sizes[key] = len(value)
+            while self._size > self.max_bytes:
+                self._evict_oldest()
+
+    def _evict_oldest(self) -> None:
+        """Remove the least recently used entry. Must be called with the lock held."""
+        key, size = self._sizes.popitem(last=False)
+        self._size -= size
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
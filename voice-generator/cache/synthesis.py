@@ -0,0 +1,161 @@
+import hashlib
+import json
+import threading
+from dataclasses import asdict, dataclass
+from typing import Callable, Optional
+
+from .disk import DiskCache
+from .memory import LRUCache
+
+# How often a caller waiting on an identical in-flight synthesis runs its
+# cancellation check, in seconds
+_WAIT_SLICE = 0.1
+
+
+def make_key(*parts) -> str:
+    """Return a stable content hash for the given key parts.
+
+    Parts are JSON-encoded before hashing, so ``("a", 1.0)`` and
+    ``("a", "1.0")`` produce different keys.
+    """
+    payload = json.dumps(parts, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    # Requests that waited on an identical in-flight synthesis
+    coalesced: int = 0
+    # Requests that skipped the cache entirely
+    bypassed: int = 0
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        lookups = self.memory_hits + self.disk_hits + self.misses + self.coalesced
+        hits = lookups - self.misses
+        data["hit_rate"] = hits / lookups if lookups else 0.0
+        return data
+
+
+class _InFlight:
+    """A computation that other callers with the same key can wait on."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Optional[bytes] = None
+        self.error: Optional[BaseException] = None
+
+
+class SynthesisCache:
+    """Two-tier (memory LRU + disk) cache with in-flight request coalescing.
+
+    ``get_or_compute`` looks the key up in memory, then on disk (promoting
+    disk hits into memory), and only then calls *compute*. While a key is
+    being computed, concurrent callers for the same key block on the first
+    caller's result instead of starting their own computation; their
+    *check* runs every ``_WAIT_SLICE`` seconds while they wait and may raise
+    to give up (e.g. on cancellation or a passed deadline).
+    """
+
+    def __init__(self, memory: LRUCache, disk: Optional[DiskCache] = None) -> None:
+        self.memory = memory
+        self.disk = disk
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._in_flight: dict[str, _InFlight] = {}
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached value for *key* from either tier, or None."""
+        value = self.memory.get(key)
+        if value is not None:
+            with self._lock:
+                self.stats.memory_hits += 1
+            return value
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.put(key, value)
+                with self._lock:
+                    self.stats.disk_hits += 1
+                return value
+        return None
+
+    def lookup(self, key: str, bypass: bool = False) -> Optional[bytes]:
+        """Like `get`, but also counts misses and bypasses.
+
+        For callers that compute and `put` the value themselves (e.g. while
+        streaming) instead of going through `get_or_compute`.
+        """
+        if bypass:
+            with self._lock:
+                self.stats.bypassed += 1
+            return None
+        value = self.get(key)
+        if value is None:
+            with self._lock:
+                self.stats.misses += 1
+        return value
+
+    def put(self, key: str, value: bytes) -> None:
+        self.memory.put(key, value)
+        if self.disk is not None:
+            self.disk.put(key, value)
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], bytes],
+        bypass: bool = False,
+        check: Optional[Callable[[], None]] = None,
+    ) -> bytes:
+        if bypass:
+            with self._lock:
+                self.stats.bypassed += 1
+            return compute()
+
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = _InFlight()
+                self.stats.misses += 1
+            else:
+                self.stats.coalesced += 1
+
+        if not leader:
+            while not flight.done.wait(_WAIT_SLICE if check is not None else None):
+                check()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            value = compute()
+            self.put(key, value)
+            flight.value = value
+            return value
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            flight.done.set()
+
+    def snapshot(self) -> dict:
+        """Return counters plus current tier occupancy."""
+        with self._lock:
+            data = self.stats.as_dict()
+        data["memory_entries"] = len(self.memory)
+        data["memory_bytes"] = self.memory.size_bytes
+        if self.disk is not None:
+            data["disk_entries"] = len(self.disk)
+            data["disk_bytes"] = self.disk.size_bytes
+        return data
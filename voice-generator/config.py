@@ -6,6 +6,11 @@ Docker / Kubernetes / cloud deployments.
 """
 import os
 
+
+def _list_env(name: str, default: str = "") -> list[str]:
+    """Read a comma-separated list from the environment."""
+    return [item.strip() for item in os.getenv(name, default).split(",") if item.strip()]
+
 # --------------------------------------------------------------------------
 # Server
 # --------------------------------------------------------------------------
@@ -21,6 +26,79 @@ DEFAULT_MODEL: str = os.getenv("DEFAULT_TTS_MODEL", "kokoro")
 DEFAULT_VOICE: str = os.getenv("DEFAULT_VOICE", "af_heart")
 DEFAULT_SPEED: float = float(os.getenv("DEFAULT_SPEED", "1.0"))
 DEFAULT_LANGUAGE: str = os.getenv("DEFAULT_LANGUAGE", "a")
+# Output format: wav | flac | ogg | opus | mp3
+DEFAULT_FORMAT: str = os.getenv("DEFAULT_FORMAT", "wav")
+
+# --------------------------------------------------------------------------
+# Kokoro
+# --------------------------------------------------------------------------
+# Maximum number of per-language pipelines kept alive (LRU-evicted beyond)
+KOKORO_MAX_PIPELINES: int = int(os.getenv("KOKORO_MAX_PIPELINES", "4"))
+# Comma-separated language codes to build at startup, e.g. "a,b"
+KOKORO_PRELOAD_LANGUAGES: list[str] = _list_env("KOKORO_PRELOAD_LANGUAGES")
+# Sentence → phonemes results kept in the per-process G2P LRU cache; 0 disables
+KOKORO_G2P_CACHE_SIZE: int = int(os.getenv("KOKORO_G2P_CACHE_SIZE", "8192"))
+# Exported graphs for the ONNX Runtime backends ("kokoro-onnx",
+# "kokoro-onnx-int8"); create them with `python -m export_onnx`
+KOKORO_ONNX_PATH: str = os.getenv("KOKORO_ONNX_PATH", "/models/kokoro.onnx")
+KOKORO_ONNX_INT8_PATH: str = os.getenv("KOKORO_ONNX_INT8_PATH", "/models/kokoro.int8.onnx")
+# ONNX Runtime intra-op threads; 0 uses INFERENCE_WORKER_THREADS with a
+# worker pool, otherwise ONNX Runtime's default (one per core)
+KOKORO_ONNX_THREADS: int = int(os.getenv("KOKORO_ONNX_THREADS", "0"))
+
+# --------------------------------------------------------------------------
+# espeak-ng (registered as "espeak")
+# --------------------------------------------------------------------------
+ESPEAK_BINARY: str = os.getenv("ESPEAK_BINARY", "espeak-ng")
+# espeak-ng processes allowed to run at once
+ESPEAK_MAX_CONCURRENT: int = int(os.getenv("ESPEAK_MAX_CONCURRENT", str(os.cpu_count() or 1)))
+
+# --------------------------------------------------------------------------
+# Warmup / readiness
+# --------------------------------------------------------------------------
+# Build models, load voices and run a dummy synthesis in the background at
+# startup; GET /ready reports 503 until this has finished
+WARMUP_ENABLED: bool = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+WARMUP_MODELS: list[str] = _list_env("WARMUP_MODELS", DEFAULT_MODEL)
+WARMUP_LANGUAGES: list[str] = _list_env("WARMUP_LANGUAGES") or KOKORO_PRELOAD_LANGUAGES or [DEFAULT_LANGUAGE]
+# Set to an empty list to load and preload models without a dummy synthesis
+WARMUP_VOICES: list[str] = _list_env("WARMUP_VOICES", DEFAULT_VOICE)
+WARMUP_TEXT: str = os.getenv("WARMUP_TEXT", "Hello, this is a warm-up sentence.")
+
+# --------------------------------------------------------------------------
+# Fake model (benchmarks and offline testing; registered as "fake")
+# --------------------------------------------------------------------------
+# Speaking rate used to size the synthetic audio
+FAKE_MODEL_CHARS_PER_SECOND: float = float(os.getenv("FAKE_MODEL_CHARS_PER_SECOND", "15"))
+# Simulated inference speed in audio seconds per wall second; 0 = no delay
+FAKE_MODEL_REAL_TIME_FACTOR: float = float(os.getenv("FAKE_MODEL_REAL_TIME_FACTOR", "0"))
+
+# --------------------------------------------------------------------------
+# Incremental (per-segment) synthesis
+# --------------------------------------------------------------------------
+# Default for the per-request "incremental" flag: synthesise and cache each
+# sentence separately so an edited script only re-synthesises what changed.
+# Needs CACHE_ENABLED.
+INCREMENTAL_DEFAULT: bool = os.getenv("INCREMENTAL_DEFAULT", "false").lower() == "true"
+# Sentences longer than this are split further at clause punctuation
+SEGMENT_MAX_CHARS: int = int(os.getenv("SEGMENT_MAX_CHARS", "300"))
+# Silence inserted between stitched segments, and between paragraphs
+SEGMENT_PAUSE_MS: int = int(os.getenv("SEGMENT_PAUSE_MS", "250"))
+SEGMENT_PARAGRAPH_PAUSE_MS: int = int(os.getenv("SEGMENT_PARAGRAPH_PAUSE_MS", "500"))
+
+# --------------------------------------------------------------------------
+# Long-form synthesis
+# --------------------------------------------------------------------------
+# /generate/save streams scripts at least this long straight into storage
+# (constant memory, not cached) unless the request sets long_form explicitly
+LONG_FORM_MIN_CHARS: int = int(os.getenv("LONG_FORM_MIN_CHARS", "5000"))
+
+# --------------------------------------------------------------------------
+# Batch endpoint (/generate/batch)
+# --------------------------------------------------------------------------
+BATCH_REQUEST_MAX_ITEMS: int = int(os.getenv("BATCH_REQUEST_MAX_ITEMS", "200"))
+# Items synthesised concurrently per batch request
+BATCH_REQUEST_PARALLELISM: int = int(os.getenv("BATCH_REQUEST_PARALLELISM", "4"))
 
 # --------------------------------------------------------------------------
 # Local storage
@@ -34,7 +112,90 @@ S3_BUCKET: str = os.getenv("S3_BUCKET", "")
 S3_PREFIX: str = os.getenv("S3_PREFIX", "voice-output/")
 S3_REGION: str = os.getenv("S3_REGION", "us-east-1")
 S3_PRESIGN_TTL: int = int(os.getenv("S3_PRESIGN_TTL", "3600"))
+# Point at an S3-compatible stand-in (MinIO, moto server) for local testing
+S3_ENDPOINT_URL: str = os.getenv("S3_ENDPOINT_URL", "")
+S3_MAX_POOL_CONNECTIONS: int = int(os.getenv("S3_MAX_POOL_CONNECTIONS", "32"))
+S3_MAX_ATTEMPTS: int = int(os.getenv("S3_MAX_ATTEMPTS", "3"))
+# Part size for streamed (long-form) multipart uploads; S3 minimum is 5 MiB
+S3_MULTIPART_PART_SIZE: int = int(os.getenv("S3_MULTIPART_PART_SIZE", str(8 * 1024 * 1024)))
+
+# Background uploads (async_upload=true on /generate/save)
+UPLOAD_WORKERS: int = int(os.getenv("UPLOAD_WORKERS", "4"))
+UPLOAD_QUEUE_SIZE: int = int(os.getenv("UPLOAD_QUEUE_SIZE", "256"))
+UPLOAD_MAX_ATTEMPTS: int = int(os.getenv("UPLOAD_MAX_ATTEMPTS", "3"))
+# How long finished upload statuses stay queryable, in seconds
+UPLOAD_STATUS_TTL: int = int(os.getenv("UPLOAD_STATUS_TTL", "3600"))
 
 # Credentials — leave blank to use IAM role / instance profile
 AWS_ACCESS_KEY_ID: str = os.getenv("AWS_ACCESS_KEY_ID", "")
 AWS_SECRET_ACCESS_KEY: str = os.getenv("AWS_SECRET_ACCESS_KEY", "")
+
+# --------------------------------------------------------------------------
+# Inference worker pool
+# --------------------------------------------------------------------------
+# 0 runs inference in the API process; N > 0 forks N workers that share
+# the weights loaded by the parent copy-on-write.
+INFERENCE_WORKERS: int = int(os.getenv("INFERENCE_WORKERS", "0"))
+# Intra-op threads per worker; defaults to an even split of the cores
+INFERENCE_WORKER_THREADS: int = int(
+    os.getenv(
+        "INFERENCE_WORKER_THREADS",
+        str(max(1, (os.cpu_count() or 1) // max(1, INFERENCE_WORKERS))),
+    )
+)
+
+# --------------------------------------------------------------------------
+# Parallel long-text synthesis
+# --------------------------------------------------------------------------
+# Texts of at least PARALLEL_MIN_CHARS are split at sentence boundaries into
+# chunks of up to PARALLEL_SEGMENT_CHARS and synthesised PARALLEL_SYNTHESIS_WORKERS
+# at a time (across the worker pool if enabled). 1 disables splitting.
+PARALLEL_SYNTHESIS_WORKERS: int = int(
+    os.getenv("PARALLEL_SYNTHESIS_WORKERS", str(INFERENCE_WORKERS or min(4, os.cpu_count() or 1)))
+)
+PARALLEL_MIN_CHARS: int = int(os.getenv("PARALLEL_MIN_CHARS", "600"))
+PARALLEL_SEGMENT_CHARS: int = int(os.getenv("PARALLEL_SEGMENT_CHARS", "400"))
+
+# --------------------------------------------------------------------------
+# Synthesis cache
+# --------------------------------------------------------------------------
+CACHE_ENABLED: bool = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+CACHE_MEMORY_MAX_BYTES: int = int(os.getenv("CACHE_MEMORY_MAX_BYTES", str(256 * 1024 * 1024)))
+# Set to 0 to disable the on-disk tier
+CACHE_DISK_MAX_BYTES: int = int(os.getenv("CACHE_DISK_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))
+CACHE_DIR: str = os.getenv("CACHE_DIR", "/tmp/voice-cache")
+
+# --------------------------------------------------------------------------
+# Admission control
+# --------------------------------------------------------------------------
+# Caps concurrent syntheses and queues the rest by priority: "interactive"
+# (/generate) ahead of "bulk" (/generate/save, /generate/batch). Full queues
+# are rejected with 429, requests that cannot start in time with 503.
+ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+# Two per inference worker: one synthesising while the other is queued at
+# the worker or encoding and storing its audio
+ADMISSION_MAX_CONCURRENT: int = int(os.getenv("ADMISSION_MAX_CONCURRENT", str(2 * max(1, INFERENCE_WORKERS))))
+# Slots bulk requests may use; the rest stay free for interactive requests
+ADMISSION_BULK_MAX_CONCURRENT: int = int(
+    os.getenv("ADMISSION_BULK_MAX_CONCURRENT", str(max(1, ADMISSION_MAX_CONCURRENT * 3 // 4)))
+)
+ADMISSION_INTERACTIVE_QUEUE: int = int(os.getenv("ADMISSION_INTERACTIVE_QUEUE", "32"))
+ADMISSION_BULK_QUEUE: int = int(os.getenv("ADMISSION_BULK_QUEUE", "128"))
+# Longest a request may wait for a slot, in seconds
+ADMISSION_MAX_WAIT: float = float(os.getenv("ADMISSION_MAX_WAIT", "30"))
+
+# --------------------------------------------------------------------------
+# Quality tiers / load shedding
+# --------------------------------------------------------------------------
+# Cheap model serving quality="draft" requests, and quality="auto" requests
+# while the primary model is overloaded
+FALLBACK_MODEL: str = os.getenv("FALLBACK_MODEL", "espeak")
+# Quality for requests that do not set one: high | auto | draft
+QUALITY_DEFAULT: str = os.getenv("QUALITY_DEFAULT", "high")
+# "auto" requests degrade while at least this many requests are queued for
+# the primary model; 0 ignores queue depth
+DEGRADE_QUEUE_DEPTH: int = int(os.getenv("DEGRADE_QUEUE_DEPTH", "8"))
+# ... or while the p90 wait for a synthesis slot over the last
+# DEGRADE_WINDOW_S seconds is at least this long; 0 ignores waits
+DEGRADE_WAIT_MS: float = float(os.getenv("DEGRADE_WAIT_MS", "2000"))
+DEGRADE_WINDOW_S: float = float(os.getenv("DEGRADE_WINDOW_S", "30"))
@@ -0,0 +1 @@
+"""Export Kokoro to ONNX and verify it against PyTorch (``python -m export_onnx``)."""
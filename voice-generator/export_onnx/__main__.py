@@ -0,0 +1,76 @@
+"""Export Kokoro to ONNX and verify it against the PyTorch backend.
+
+Writes the graph served by the ``kokoro-onnx`` model (and with
+``--quantize`` the int8 graph served by ``kokoro-onnx-int8``), then
+synthesises a few sentences with each backend and prints a JSON report:
+spectral similarity to the PyTorch audio, speedup, and resident memory.
+Exits non-zero if any graph falls below ``--min-similarity``.
+
+Run from the voice-generator directory::
+
+    # Export both graphs to the paths the service reads by default
+    python -m export_onnx --quantize
+
+    # Re-check existing graphs only
+    python -m export_onnx --skip-export --quantize --voice bf_emma --language b
+
+Needs the export extras (``torch``, ``onnx``, ``onnxruntime``) in
+addition to the service requirements.
+"""
+import argparse
+import json
+import sys
+from typing import Optional
+
+import config
+
+from .export import export, quantize
+from .verify import verify
+
+
+def _parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m export_onnx", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--output", default=config.KOKORO_ONNX_PATH, help="Path of the fp32 graph.")
+    parser.add_argument("--int8-output", default=config.KOKORO_ONNX_INT8_PATH, help="Path of the int8 graph.")
+    parser.add_argument("--quantize", action="store_true", help="Also produce and verify the int8 graph.")
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument("--skip-export", action="store_true", help="Verify existing graphs only.")
+    parser.add_argument("--skip-verify", action="store_true", help="Export only.")
+    parser.add_argument("--voice", default=config.DEFAULT_VOICE)
+    parser.add_argument("--language", default=config.DEFAULT_LANGUAGE)
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per sentence (best is kept).")
+    parser.add_argument("--min-similarity", type=float, default=0.9)
+    parser.add_argument("--report", default=None, help="Write the JSON report here instead of stdout.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    args = _parse_args(argv)
+
+    if not args.skip_export:
+        print(f"export_onnx: exporting {args.output}", file=sys.stderr)
+        export(args.output, opset=args.opset)
+        if args.quantize:
+            print(f"export_onnx: quantizing to {args.int8_output}", file=sys.stderr)
+            quantize(args.output, args.int8_output)
+    if args.skip_verify:
+        return
+
+    candidates = {"kokoro-onnx": args.output}
+    if args.quantize:
+        candidates["kokoro-onnx-int8"] = args.int8_output
+    print("export_onnx: verifying against PyTorch", file=sys.stderr)
+    report = verify(candidates, args.voice, args.language, args.repeats, args.min_similarity)
+
+    text = json.dumps(report, indent=2)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if not report["passed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Export the Kokoro acoustic model to ONNX, optionally quantized to int8."""
+import os
+
+from models.kokoro_model import KokoroModel
+from models.kokoro_onnx_model import INPUT_IDS, SPEED, STYLE, WAVEFORM
+
+
+def export(path: str, opset: int = 17) -> str:
+    """Export the PyTorch KModel to *path* and return it.
+
+    The graph takes ``input_ids`` (int64, ``[1, tokens]``, zero-padded at
+    both ends), ``style`` (float32, ``[1, 256]``, one row of a voice pack)
+    and ``speed`` (float32, ``[1]``), and returns ``waveform`` (float32,
+    ``[samples]``) at 24 kHz.
+    """
+    import torch  # noqa: PLC0415
+    from kokoro import KModel  # noqa: PLC0415
+
+    class Graph(torch.nn.Module):
+        def __init__(self, kmodel) -> None:
+            super().__init__()
+            self.kmodel = kmodel
+
+        def forward(self, input_ids, style, speed):
+            audio, _pred_dur = self.kmodel.forward_with_tokens(input_ids, style, speed)
+            return audio
+
+    # disable_complex swaps torch.stft for an exportable real-valued STFT
+    kmodel = KModel(repo_id=KokoroModel.REPO_ID, disable_complex=True).eval()
+    input_ids = torch.zeros((1, 64), dtype=torch.long)
+    input_ids[0, 1:-1] = torch.randint(1, len(kmodel.vocab), (62,))
+    style = torch.randn(1, 256)
+    speed = torch.tensor([1.0])
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with torch.no_grad():
+        torch.onnx.export(
+            Graph(kmodel),
+            (input_ids, style, speed),
+            path,
+            input_names=[INPUT_IDS, STYLE, SPEED],
+            output_names=[WAVEFORM],
+            dynamic_axes={INPUT_IDS: {1: "tokens"}, WAVEFORM: {0: "samples"}},
+            opset_version=opset,
+            do_constant_folding=True,
+        )
+    return path
+
+
+def quantize(path: str, output_path: str) -> str:
+    """Write a dynamically int8-quantized copy of *path* to *output_path*.
+
+    Weights of MatMul/Gemm/LSTM nodes are stored as int8 and activations
+    are quantized on the fly, so no calibration data is needed.
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic  # noqa: PLC0415
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    quantize_dynamic(path, output_path, weight_type=QuantType.QInt8)
+    return output_path
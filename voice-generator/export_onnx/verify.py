@@ -0,0 +1,141 @@
+"""Compare ONNX backends with the PyTorch backend: audio similarity, speed, memory."""
+import multiprocessing as mp
+import resource
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+SENTENCES = [
+    "Welcome to the quarterly business review.",
+    "Revenue grew by twelve percent, driven mostly by new enterprise customers.",
+    "On the next slide, we will look at how churn changed across each region.",
+    "Thank you for listening, and please send any questions to the team.",
+]
+
+
+def _build(backend: str, path: Optional[str]):
+    from models.kokoro_model import KokoroModel  # noqa: PLC0415
+    from models.kokoro_onnx_model import KokoroOnnxModel  # noqa: PLC0415
+
+    if backend == "torch":
+        return KokoroModel()
+    return KokoroOnnxModel(model_path=path)
+
+
+def measure(backend: str, path: Optional[str], sentences: list[str], voice: str, language: str, repeats: int) -> dict:
+    """Synthesise *sentences* with one backend; runs in a fresh process.
+
+    Returns the audio, the best-of-*repeats* wall time per sentence, the
+    resident memory after loading and after synthesis, and peak RSS.
+    """
+    from audio import decode_wav  # noqa: PLC0415
+    from metrics import rss_bytes  # noqa: PLC0415
+    from models.base import TTSRequest  # noqa: PLC0415
+
+    baseline = rss_bytes()
+    model = _build(backend, path)
+    model.preload([language])
+    # First call pays for voice loading and graph initialisation
+    model.generate(TTSRequest(text=sentences[0], voice=voice, language=language))
+    loaded = rss_bytes()
+
+    audio, seconds = [], []
+    for sentence in sentences:
+        request = TTSRequest(text=sentence, voice=voice, language=language)
+        best = float("inf")
+        for _ in range(max(1, repeats)):
+            start = time.perf_counter()
+            wav = model.generate(request)
+            best = min(best, time.perf_counter() - start)
+        audio.append(decode_wav(wav)[0])
+        seconds.append(best)
+
+    return {
+        "audio": audio,
+        "seconds": seconds,
+        "loaded_rss_bytes": loaded - baseline,
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        "sample_rate": model.SAMPLE_RATE,
+    }
+
+
+def _log_spectrogram(samples: np.ndarray, n_fft: int = 1024, hop: int = 256) -> np.ndarray:
+    if len(samples) < n_fft:
+        samples = np.pad(samples, (0, n_fft - len(samples)))
+    frames = np.lib.stride_tricks.sliding_window_view(samples, n_fft)[::hop]
+    return np.log1p(np.abs(np.fft.rfft(frames * np.hanning(n_fft), axis=-1)))
+
+
+def spectral_similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Correlation of the log-magnitude spectrograms of *a* and *b*.
+
+    Both are cut to the shorter length, so small duration differences from
+    rounding in the duration predictor cost little. 1.0 means identical;
+    unrelated signals score near 0.
+    """
+    n = min(len(a), len(b))
+    sa, sb = _log_spectrogram(a[:n]).ravel(), _log_spectrogram(b[:n]).ravel()
+    sa, sb = sa - sa.mean(), sb - sb.mean()
+    denom = float(np.linalg.norm(sa) * np.linalg.norm(sb))
+    return float(sa @ sb) / denom if denom else 0.0
+
+
+def _summary(result: dict) -> dict:
+    audio_seconds = sum(len(a) for a in result["audio"]) / result["sample_rate"]
+    wall = sum(result["seconds"])
+    return {
+        "seconds_per_sentence": round(statistics.mean(result["seconds"]), 4),
+        "real_time_factor": round(audio_seconds / wall, 2) if wall else None,
+        "loaded_rss_bytes": result["loaded_rss_bytes"],
+        "peak_rss_bytes": result["peak_rss_bytes"],
+    }
+
+
+def verify(
+    candidates: dict[str, str],
+    voice: str,
+    language: str,
+    repeats: int = 3,
+    min_similarity: float = 0.9,
+    sentences: Optional[list[str]] = None,
+) -> dict:
+    """Compare each ONNX graph in *candidates* (name → path) with PyTorch.
+
+    Every backend runs in its own spawned process so memory figures are
+    not polluted by the others. A candidate passes when every sentence
+    reaches *min_similarity*.
+    """
+    sentences = sentences or SENTENCES
+    ctx = mp.get_context("spawn")
+
+    def run(backend: str, path: Optional[str]) -> dict:
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            return pool.submit(measure, backend, path, sentences, voice, language, repeats).result()
+
+    reference = run("torch", None)
+    report: dict = {"reference": {"backend": "torch", **_summary(reference)}, "candidates": {}}
+    passed = True
+    for name, path in candidates.items():
+        result = run("onnx", path)
+        similarity = [spectral_similarity(a, b) for a, b in zip(reference["audio"], result["audio"])]
+        duration_ratio = [len(b) / len(a) for a, b in zip(reference["audio"], result["audio"])]
+        summary = _summary(result)
+        ok = min(similarity) >= min_similarity
+        passed = passed and ok
+        report["candidates"][name] = {
+            "path": path,
+            **summary,
+            "similarity_min": round(min(similarity), 4),
+            "similarity_mean": round(statistics.mean(similarity), 4),
+            "duration_ratio_mean": round(statistics.mean(duration_ratio), 4),
+            "speedup": round(sum(reference["seconds"]) / sum(result["seconds"]), 2),
+            "rss_ratio": round(summary["loaded_rss_bytes"] / reference["loaded_rss_bytes"], 2)
+            if reference["loaded_rss_bytes"] else None,
+            "passed": ok,
+        }
+    report["min_similarity"] = min_similarity
+    report["passed"] = passed
+    return report
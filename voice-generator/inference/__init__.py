@@ -0,0 +1,4 @@
+from .parallel import ParallelModel
+from .worker_pool import ProcessPoolModel
+
+__all__ = ["ParallelModel", "ProcessPoolModel"]
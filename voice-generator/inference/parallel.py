@@ -0,0 +1,142 @@
+import collections
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterator
+
+import numpy as np
+
+from audio import decode_wav, encode_wav, silence, stitch, trim_silence
+from metrics import stage
+from models.base import TTSModel, TTSRequest, WrappedModel
+from models.segmented import Segment, pack_segments, split_segments
+
+
+class ParallelModel(WrappedModel):
+    """Synthesise long texts as concurrent sentence-aligned chunks.
+
+    Texts of at least *min_chars* characters are split at sentence
+    boundaries into chunks of up to *max_chars* characters (see
+    `pack_segments`). Up to *parallelism* chunks run at once through
+    ``inner.generate``: spread over the worker processes when a
+    ProcessPoolModel is below, otherwise on threads in this process, where
+    torch releases the GIL during the forward pass. Latency for a multi-minute
+    script therefore drops with the number of cores instead of running as
+    one long sequential inference.
+
+    Chunks are reassembled in text order, trimmed of edge silence and
+    joined with the same pauses as incremental synthesis. `generate_stream`
+    yields each chunk as soon as it and every chunk before it are done,
+    keeping at most ``2 * parallelism`` chunks in flight.
+
+    Set ``request.extra["parallel"]`` to ``False`` to synthesise a request
+    in one pass.
+    """
+
+    def __init__(
+        self,
+        inner: TTSModel,
+        parallelism: int,
+        min_chars: int = 600,
+        max_chars: int = 400,
+        pause: float = 0.25,
+        paragraph_pause: float = 0.5,
+    ) -> None:
+        super().__init__(inner)
+        self.parallelism = max(1, parallelism)
+        self.min_chars = min_chars
+        self.max_chars = max(1, max_chars)
+        self.pause = pause
+        self.paragraph_pause = paragraph_pause
+        self._executor = ThreadPoolExecutor(max_workers=self.parallelism, thread_name_prefix="tts-parallel")
+
+    def _chunks(self, request: TTSRequest) -> list[Segment]:
+        """Return the chunks to synthesise *request* in, or [] to run it whole."""
+        if request.extra.get("parallel") is False or len(request.text) < self.min_chars:
+            return []
+        chunks = pack_segments(split_segments(request.text, self.max_chars), self.max_chars)
+        return chunks if len(chunks) > 1 else []
+
+    def _chunk_request(self, request: TTSRequest, text: str) -> TTSRequest:
+        return TTSRequest(
+            text=text,
+            voice=request.voice,
+            speed=request.speed,
+            language=request.language,
+            extra=dict(request.extra),
+        )
+
+    def _pauses(self, chunks: list[Segment]) -> list[float]:
+        return [
+            self.paragraph_pause if nxt.paragraph != cur.paragraph else self.pause
+            for cur, nxt in zip(chunks, chunks[1:])
+        ]
+
+    def _submit(self, request: TTSRequest, chunk: Segment) -> "Future[bytes]":
+        return self._executor.submit(self.inner.generate, self._chunk_request(request, chunk.text))
+
+    def _samples(self, future: "Future[bytes]") -> np.ndarray:
+        return trim_silence(decode_wav(future.result())[0], self.SAMPLE_RATE)
+
+    def generate(self, request: TTSRequest) -> bytes:
+        chunks = self._chunks(request)
+        if not chunks:
+            return self.inner.generate(request)
+
+        futures = [self._submit(request, chunk) for chunk in chunks]
+        try:
+            audio = [self._samples(future) for future in futures]
+        finally:
+            for future in futures:
+                future.cancel()
+        with stage("stitch", request.extra.get("profile")):
+            return encode_wav(stitch(audio, self._pauses(chunks), self.SAMPLE_RATE), self.SAMPLE_RATE)
+
+    def generate_stream(self, request: TTSRequest) -> Iterator[np.ndarray]:
+        chunks = self._chunks(request)
+        if not chunks:
+            yield from self.inner.generate_stream(request)
+            return
+
+        pauses = self._pauses(chunks) + [0.0]
+        window = 2 * self.parallelism
+        pending: "collections.deque[Future[bytes]]" = collections.deque()
+        upcoming = iter(chunks)
+        try:
+            for pause in pauses:
+                # Keep the window full, then wait for the oldest chunk
+                for chunk in upcoming:
+                    pending.append(self._submit(request, chunk))
+                    if len(pending) >= window:
+                        break
+                yield self._samples(pending.popleft())
+                if pause:
+                    yield silence(pause, self.SAMPLE_RATE)
+        finally:
+            # Client went away or a chunk failed: drop work not yet started
+            for future in pending:
+                future.cancel()
+
+    def generate_batch(self, requests: list[TTSRequest]) -> list[bytes | Exception]:
+        """Pass short requests to *inner* as one batch; split the long ones."""
+        long_indices = [i for i, request in enumerate(requests) if self._chunks(request)]
+        if not long_indices:
+            return self.inner.generate_batch(requests)
+
+        short_indices = [i for i in range(len(requests)) if i not in long_indices]
+        results: list[bytes | Exception] = [None] * len(requests)  # type: ignore[list-item]
+        if short_indices:
+            batch = self.inner.generate_batch([requests[i] for i in short_indices])
+            for i, result in zip(short_indices, batch):
+                results[i] = result
+        for i in long_indices:
+            try:
+                results[i] = self.generate(requests[i])
+            except Exception as exc:
+                results[i] = exc
+        return results
+
+    def stats(self) -> dict:
+        return {
+            "parallelism": self.parallelism,
+            "min_chars": self.min_chars,
+            "max_chars": self.max_chars,
+        }
@@ -0,0 +1,462 @@
+import collections
+import dataclasses
+import gc
+import itertools
+import logging
+import multiprocessing as mp
+import os
+import queue
+import signal
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection, wait
+from typing import Iterator, Optional
+
+import numpy as np
+
+from models.base import DeadlineExceeded, SynthesisCancelled, TTSModel, TTSRequest, WrappedModel
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a streamed task in its chunk queue
+_END = object()
+
+
+def _limit_threads(torch_threads: int) -> None:
+    """Cap intra-op threads so N workers don't oversubscribe the cores."""
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(torch_threads)
+    try:
+        import torch  # noqa: PLC0415
+    except ImportError:
+        return
+    torch.set_num_threads(torch_threads)
+
+
+class _CancelFlag:
+    """Worker-side ``extra["cancel"]``: set once the parent cancels the task."""
+
+    def __init__(self, task_id: int, poll) -> None:
+        self.task_id = task_id
+        self._poll = poll
+
+    def is_set(self) -> bool:
+        return self.task_id in self._poll()
+
+
+def _worker_main(model: TTSModel, conn: Connection, torch_threads: int) -> None:
+    """Serve tasks from *conn* until the parent sends None or goes away."""
+    # Ctrl-C goes to the whole process group; let the parent decide.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _limit_threads(torch_threads)
+
+    # Tasks that arrived while another was running, and cancelled task ids
+    backlog: collections.deque = collections.deque()
+    cancelled: set[int] = set()
+    # G2P cache counters last reported to the parent
+    g2p_sent: Optional[dict] = None
+
+    def poll() -> set[int]:
+        """Read messages sent while a task is running; return cancelled ids."""
+        while conn.poll():
+            message = conn.recv()
+            if message is not None and message[1] == "cancel":
+                cancelled.add(message[0])
+            else:
+                backlog.append(message)
+        return cancelled
+
+    while True:
+        if backlog:
+            task = backlog.popleft()
+        else:
+            try:
+                task = conn.recv()
+            except EOFError:
+                return
+        if task is None:
+            return
+
+        task_id, kind, payload = task
+        if kind == "cancel":
+            # The task already finished, or is still waiting in the backlog
+            if any(t is not None and t[0] == task_id for t in backlog):
+                cancelled.add(task_id)
+            continue
+        if task_id in cancelled:
+            cancelled.discard(task_id)
+            conn.send((task_id, "cancelled", (False, "Request was cancelled")))
+            continue
+        if kind in ("generate", "stream"):
+            payload.extra["cancel"] = _CancelFlag(task_id, poll)
+
+        try:
+            if kind == "generate":
+                conn.send((task_id, "ok", model.generate(payload)))
+            elif kind == "stream":
+                for chunk in model.generate_stream(payload):
+                    conn.send((task_id, "chunk", chunk))
+                conn.send((task_id, "end", None))
+            elif kind == "preload":
+                model.preload(payload)
+                conn.send((task_id, "ok", None))
+            elif kind == "phonemize":
+                conn.send((task_id, "ok", model.phonemize(*payload)))
+            else:
+                raise ValueError(f"Unknown task kind '{kind}'")
+        except SynthesisCancelled as exc:
+            conn.send((task_id, "cancelled", (isinstance(exc, DeadlineExceeded), str(exc))))
+        except Exception as exc:
+            conn.send((task_id, "error", f"{type(exc).__name__}: {exc}"))
+        finally:
+            cancelled.discard(task_id)
+
+        # Pushed after each task, so reading the stats never waits on a busy worker
+        g2p = model.g2p_cache_stats()
+        if g2p != g2p_sent:
+            conn.send((None, "g2p_stats", g2p))
+            g2p_sent = g2p
+
+
+@dataclass
+class _Worker:
+    index: int
+    process: mp.Process
+    conn: Connection
+    started_at: float = field(default_factory=time.monotonic)
+    send_lock: threading.Lock = field(default_factory=threading.Lock)
+    in_flight: set[int] = field(default_factory=set)
+    # Exited; no longer read from or given tasks while its replacement starts
+    retired: bool = False
+    # G2P cache counters as of the worker's last finished task
+    g2p_stats: Optional[dict] = None
+
+
+@dataclass
+class _Task:
+    task_id: int
+    worker: _Worker
+    future: Optional[Future] = None
+    chunks: Optional[queue.Queue] = None
+
+
+class ProcessPoolModel(WrappedModel):
+    """Run inference for *inner* in a pool of forked worker processes.
+
+    Weights are loaded once in the parent (via ``inner.preload``) before
+    the workers are forked, so every worker shares the same physical
+    weight pages copy-on-write. ``gc.freeze()`` moves the loaded objects
+    out of the collector's reach, so the collector doesn't touch their
+    headers and trigger copies.
+
+    Tasks go to the worker with the fewest tasks in flight over a
+    per-worker pipe. A worker that dies closes its pipe. Its in-flight
+    tasks then fail with RuntimeError, and a replacement is forked in its
+    place.
+
+    ``extra["cancel"]`` flags stay in this process: while a caller waits,
+    a set flag (or a stream closed early) sends a cancel message, which the
+    worker picks up between chunks. Deadlines travel with the request.
+
+    A worker that dies within ``MIN_UPTIME`` seconds of starting is
+    restarted only after a short delay, so a worker that can never start
+    does not fork in a tight loop.
+
+    Forking happens at construction time, before any inference has run in
+    the parent, so torch's OpenMP pool is never inherited by workers.
+    """
+
+    MIN_UPTIME = 1.0
+
+    # How often a waiting caller checks its cancel flag, in seconds
+    CANCEL_POLL = 0.05
+
+    def __init__(
+        self,
+        inner: TTSModel,
+        workers: int,
+        torch_threads: int,
+        preload_languages: Optional[list[str]] = None,
+    ) -> None:
+        super().__init__(inner)
+        self.torch_threads = max(1, torch_threads)
+        self.restarts = 0
+        self._closed = False
+        self._ctx = mp.get_context("fork")
+        self._lock = threading.Lock()
+        self._task_ids = itertools.count()
+        self._tasks: dict[int, _Task] = {}
+
+        if preload_languages:
+            inner.preload(preload_languages)
+        gc.freeze()
+
+        self._workers = [self._spawn(i) for i in range(max(1, workers))]
+        self._reader = threading.Thread(
+            target=self._read_results, name="tts-pool-reader", daemon=True
+        )
+        self._reader.start()
+
+    # ------------------------------------------------------------------
+    # Worker lifecycle
+    # ------------------------------------------------------------------
+
+    def _spawn(self, index: int) -> _Worker:
+        parent_conn, child_conn = self._ctx.Pipe(duplex=True)
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(self.inner, child_conn, self.torch_threads),
+            name=f"tts-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        # Close our copy of the child's end so a dead worker reads as EOF.
+        child_conn.close()
+        logger.info("Started inference worker %d (pid %d)", index, process.pid)
+        return _Worker(index=index, process=process, conn=parent_conn)
+
+    def _replace(self, worker: _Worker) -> None:
+        """Fail *worker*'s in-flight tasks and fork a replacement.
+
+        Runs on the result reader, so a delayed restart is left to a timer
+        rather than holding up results from the other workers.
+        """
+        with self._lock:
+            if self._closed or worker.retired or self._workers[worker.index] is not worker:
+                return  # shutting down, or already replaced
+            worker.retired = True
+            worker.process.join(timeout=1)
+            logger.warning(
+                "Inference worker %d (pid %d) exited with code %s; restarting",
+                worker.index, worker.process.pid, worker.process.exitcode,
+            )
+            error = RuntimeError("Inference worker crashed")
+            for task_id in list(worker.in_flight):
+                self._finish(task_id, error)
+            worker.conn.close()
+        if time.monotonic() - worker.started_at < self.MIN_UPTIME:
+            timer = threading.Timer(self.MIN_UPTIME, self._respawn, args=(worker,))
+            timer.daemon = True
+            timer.start()
+        else:
+            self._respawn(worker)
+
+    def _respawn(self, worker: _Worker) -> None:
+        """Fork a replacement for the retired *worker*."""
+        with self._lock:
+            if self._closed or self._workers[worker.index] is not worker:
+                return
+            self._workers[worker.index] = self._spawn(worker.index)
+            self.restarts += 1
+
+    def close(self) -> None:
+        """Ask every worker to exit and wait briefly for them."""
+        with self._lock:
+            self._closed = True
+            workers = list(self._workers)
+        for worker in workers:
+            try:
+                with worker.send_lock:
+                    worker.conn.send(None)
+            except OSError:
+                pass
+        for worker in workers:
+            worker.process.join(timeout=5)
+
+    # ------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------
+
+    def _submit(self, kind: str, payload, worker: Optional[_Worker] = None) -> _Task:
+        with self._lock:
+            if worker is None:
+                # Retired workers only if every worker is being replaced (the send then fails)
+                worker = min(self._workers, key=lambda w: (w.retired, len(w.in_flight)))
+            task_id = next(self._task_ids)
+            task = _Task(task_id=task_id, worker=worker)
+            if kind == "stream":
+                task.chunks = queue.Queue()
+            else:
+                task.future = Future()
+            self._tasks[task_id] = task
+            worker.in_flight.add(task_id)
+
+        try:
+            with worker.send_lock:
+                worker.conn.send((task_id, kind, payload))
+        except OSError as exc:
+            with self._lock:
+                self._finish(task_id, RuntimeError(f"Inference worker unavailable: {exc}"))
+        return task
+
+    def _cancel(self, task: _Task) -> None:
+        """Ask the worker running *task* to abandon it."""
+        with self._lock:
+            if task.task_id not in self._tasks:
+                return  # already finished
+        try:
+            with task.worker.send_lock:
+                task.worker.conn.send((task.task_id, "cancel", None))
+        except OSError:
+            pass
+
+    def _wait(self, task: _Task, cancel) -> bytes:
+        """Wait for *task*, forwarding *cancel* to its worker once set."""
+        if cancel is None:
+            return task.future.result()
+        sent = False
+        while True:
+            try:
+                return task.future.result(timeout=self.CANCEL_POLL)
+            except FutureTimeout:
+                if not sent and cancel.is_set():
+                    self._cancel(task)
+                    sent = True
+
+    def _finish(self, task_id: int, result) -> None:
+        """Resolve and forget task *task_id*. Must be called with the lock held."""
+        task = self._tasks.pop(task_id, None)
+        if task is None:
+            return
+        task.worker.in_flight.discard(task_id)
+        if task.chunks is not None:
+            task.chunks.put(result if isinstance(result, Exception) else _END)
+        elif isinstance(result, Exception):
+            task.future.set_exception(result)
+        else:
+            task.future.set_result(result)
+
+    def _read_results(self) -> None:
+        while not self._closed:
+            with self._lock:
+                by_conn = {w.conn: w for w in self._workers if not w.retired}
+            for conn in wait(list(by_conn), timeout=1.0):
+                worker = by_conn[conn]
+                try:
+                    task_id, status, payload = conn.recv()
+                except (EOFError, OSError):
+                    self._replace(worker)
+                    continue
+
+                with self._lock:
+                    if status == "g2p_stats":
+                        worker.g2p_stats = payload
+                    elif status == "chunk":
+                        task = self._tasks.get(task_id)
+                        if task is not None:
+                            task.chunks.put(payload)
+                    elif status == "error":
+                        self._finish(task_id, RuntimeError(payload))
+                    elif status == "cancelled":
+                        deadline, message = payload
+                        error = DeadlineExceeded(message) if deadline else SynthesisCancelled(message)
+                        self._finish(task_id, error)
+                    else:
+                        self._finish(task_id, payload)
+
+    # ------------------------------------------------------------------
+    # TTSModel interface
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _payload(request: TTSRequest) -> TTSRequest:
+        """Drop the cancel flag, which cannot be pickled, before sending."""
+        if "cancel" not in request.extra:
+            return request
+        extra = {k: v for k, v in request.extra.items() if k != "cancel"}
+        return dataclasses.replace(request, extra=extra)
+
+    def generate(self, request: TTSRequest) -> bytes:
+        task = self._submit("generate", self._payload(request))
+        return self._wait(task, request.extra.get("cancel"))
+
+    def generate_stream(self, request: TTSRequest) -> Iterator[np.ndarray]:
+        cancel = request.extra.get("cancel")
+        task = self._submit("stream", self._payload(request))
+        finished = False
+        try:
+            while True:
+                try:
+                    item = task.chunks.get(timeout=self.CANCEL_POLL)
+                except queue.Empty:
+                    if cancel is not None and cancel.is_set():
+                        self._cancel(task)
+                        cancel = None
+                    continue
+                if item is _END:
+                    finished = True
+                    return
+                if isinstance(item, Exception):
+                    finished = True
+                    raise item
+                yield item
+        finally:
+            if not finished:
+                # The consumer stopped early; don't keep the worker busy
+                self._cancel(task)
+
+    def generate_batch(self, requests: list[TTSRequest]) -> list[bytes | Exception]:
+        """Spread the batch across workers and wait for all of it."""
+        tasks = [self._submit("generate", self._payload(request)) for request in requests]
+        results: list[bytes | Exception] = []
+        for task, request in zip(tasks, requests):
+            try:
+                results.append(self._wait(task, request.extra.get("cancel")))
+            except Exception as exc:
+                results.append(exc)
+        return results
+
+    def preload(self, languages: list[str]) -> None:
+        """Preload *languages* in every worker."""
+        with self._lock:
+            workers = list(self._workers)
+        for task in [self._submit("preload", languages, w) for w in workers]:
+            task.future.result()
+
+    def warm(self, request: TTSRequest) -> None:
+        """Run *request* in every worker, not just the least busy one."""
+        with self._lock:
+            workers = list(self._workers)
+        payload = self._payload(request)
+        for task in [self._submit("generate", payload, w) for w in workers]:
+            task.future.result()
+
+    def phonemize(self, text: str, language: str) -> list[list[tuple[str, str]]]:
+        return self._submit("phonemize", (text, language)).future.result()
+
+    def g2p_cache_stats(self) -> Optional[dict]:
+        """Sum the G2P cache counters of every worker, as each last reported
+        them (after its most recent task)."""
+        with self._lock:
+            per_worker = [w.g2p_stats for w in self._workers if w.g2p_stats]
+        if not per_worker:
+            return None
+        total = {key: sum(s[key] for s in per_worker) for key in ("entries", "max_entries", "hits", "misses")}
+        lookups = total["hits"] + total["misses"]
+        total["hit_rate"] = total["hits"] / lookups if lookups else 0.0
+        total["workers"] = len(per_worker)
+        return total
+
+    @property
+    def queue_depth(self) -> int:
+        """Tasks waiting behind the one each worker is running."""
+        with self._lock:
+            return sum(max(0, len(w.in_flight) - 1) for w in self._workers)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": [
+                    {
+                        "index": w.index,
+                        "pid": w.process.pid,
+                        "alive": w.process.is_alive(),
+                        "in_flight": len(w.in_flight),
+                    }
+                    for w in self._workers
+                ],
+                "torch_threads": self.torch_threads,
+                "restarts": self.restarts,
+            }
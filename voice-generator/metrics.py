@@ -0,0 +1,278 @@
+"""Process-wide metrics with Prometheus text exposition.
+
+Histograms and counters are recorded in-process and rendered by `render()`
+for the ``/metrics`` endpoint. Values owned by other components (queue
+depths, cache counters, RSS) are registered as callbacks and sampled at
+scrape time.
+
+Per-request stage timings are collected in a `Profile`. The server creates
+one per request, makes it current via a context variable, and attaches it
+to ``TTSRequest.extra["profile"]`` so model code running on another thread
+(e.g. parallel chunks or the worker pool) can still record into it.
+"""
+import contextvars
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
+
+_T = TypeVar("_T")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+RTF_BUCKETS = (0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0)
+CPS_BUCKETS = (10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0, 10000.0)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    @abstractmethod
+    def render(self) -> list[str]:
+        """Return the metric's lines in Prometheus text format."""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, *label_values: str) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labels, lv)} {_format_value(v)}" for lv, v in items
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label values -> (bucket counts, sum, count)
+        self._series: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted((lv, [list(s[0]), s[1], s[2]]) for lv, s in self._series.items())
+        lines = self._header()
+        for lv, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, lv, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, lv)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, lv)} {count}")
+        return lines
+
+
+class CallbackMetric(_Metric):
+    """A gauge or counter whose samples are produced by *callback* at scrape time.
+
+    *callback* returns ``{label values tuple: value}``; exceptions are
+    swallowed so one broken source cannot break the whole scrape.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], dict[tuple[str, ...], float]],
+        labels: tuple[str, ...] = (),
+        kind: str = "gauge",
+    ) -> None:
+        super().__init__(name, documentation, labels)
+        self.kind = kind
+        self.callback = callback
+
+    def render(self) -> list[str]:
+        try:
+            samples = self.callback()
+        except Exception:
+            return []
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labels, lv)} {_format_value(v)}"
+            for lv, v in sorted(samples.items())
+        ]
+
+
+REGISTRY: list[_Metric] = []
+
+
+def render() -> str:
+    """Return every registered metric in Prometheus text format."""
+    lines: list[str] = []
+    for metric in list(REGISTRY):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# Core metrics
+# ---------------------------------------------------------------------------
+
+REQUEST_LATENCY = Histogram(
+    "tts_request_duration_seconds", "HTTP request latency.", labels=("method", "route", "status")
+)
+STAGE_LATENCY = Histogram(
+    "tts_stage_duration_seconds", "Time spent in each synthesis stage.", labels=("stage",)
+)
+REAL_TIME_FACTOR = Histogram(
+    "tts_real_time_factor", "Seconds of audio produced per second of wall time.",
+    labels=("model",), buckets=RTF_BUCKETS,
+)
+CHARS_PER_SECOND = Histogram(
+    "tts_characters_per_second", "Input characters synthesised per second of wall time.",
+    labels=("model",), buckets=CPS_BUCKETS,
+)
+
+
+def rss_bytes() -> int:
+    """Return the current resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource  # noqa: PLC0415
+        # ru_maxrss is the peak, in KiB on Linux; the best we can do here
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+CallbackMetric(
+    "process_resident_memory_bytes", "Resident set size of this process.", lambda: {(): rss_bytes()}
+)
+
+
+def observe_synthesis(model: str, characters: int, audio_seconds: float, wall_seconds: float) -> None:
+    """Record real-time factor and throughput for one completed synthesis."""
+    if wall_seconds <= 0:
+        return
+    REAL_TIME_FACTOR.observe(audio_seconds / wall_seconds, model)
+    CHARS_PER_SECOND.observe(characters / wall_seconds, model)
+
+
+# ---------------------------------------------------------------------------
+# Per-request profiles
+# ---------------------------------------------------------------------------
+
+class Profile:
+    """Accumulated wall time per stage for a single request."""
+
+    def __init__(self) -> None:
+        self.stages: dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def server_timing(self) -> str:
+        """Format the stages as a ``Server-Timing`` header value."""
+        return ", ".join(f"{name};dur={seconds * 1000.0:.2f}" for name, seconds in self.stages.items())
+
+
+_CURRENT_PROFILE: contextvars.ContextVar[Optional[Profile]] = contextvars.ContextVar(
+    "tts_profile", default=None
+)
+
+
+def current_profile() -> Optional[Profile]:
+    return _CURRENT_PROFILE.get()
+
+
+def set_profile(profile: Optional[Profile]) -> contextvars.Token:
+    return _CURRENT_PROFILE.set(profile)
+
+
+def reset_profile(token: contextvars.Token) -> None:
+    _CURRENT_PROFILE.reset(token)
+
+
+def record_stage(name: str, seconds: float, profile: Optional[Profile] = None) -> None:
+    STAGE_LATENCY.observe(seconds, name)
+    profile = profile or _CURRENT_PROFILE.get()
+    if profile is not None:
+        profile.add(name, seconds)
+
+
+@contextmanager
+def stage(name: str, profile: Optional[Profile] = None) -> Iterator[None]:
+    """Time the enclosed block as stage *name*.
+
+    Always feeds the stage histogram. The duration is also added to
+    *profile*, or to the current request's profile if none is given.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start, profile)
+
+
+def timed_iter(iterable: Iterable[_T], name: str, profile: Optional[Profile] = None) -> Iterator[_T]:
+    """Yield from *iterable*, timing each step (not the consumer) as stage *name*."""
+    iterator = iter(iterable)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            record_stage(name, time.perf_counter() - start, profile)
+            return
+        record_stage(name, time.perf_counter() - start, profile)
+        yield item
@@ -1,13 +1,31 @@
-from .base import TTSModel, TTSRequest
+import threading
+from typing import Optional, TypeVar
+
+from .base import TTSModel, TTSRequest, WrappedModel
+from .cached import CachedModel
+from .espeak_model import EspeakModel
+from .fake_model import FakeModel
 from .kokoro_model import KokoroModel
+from .kokoro_onnx_model import KokoroOnnxInt8Model, KokoroOnnxModel
+from .segmented import SegmentedModel
 
 _REGISTRY: dict[str, type[TTSModel]] = {
     "kokoro": KokoroModel,
+    # Kokoro on ONNX Runtime; graphs exported with `python -m export_onnx`
+    "kokoro-onnx": KokoroOnnxModel,
+    "kokoro-onnx-int8": KokoroOnnxInt8Model,
+    # Fast formant synthesis; the fallback tier for drafts and load shedding
+    "espeak": EspeakModel,
+    # Deterministic synthetic audio for benchmarks and offline testing
+    "fake": FakeModel,
 }
 
 # Singleton cache — one instance per model name, reused across all requests.
 # This ensures the pipeline and HuggingFace weight downloads only happen once.
 _INSTANCES: dict[str, TTSModel] = {}
+_INSTANCES_LOCK = threading.Lock()
+
+_T = TypeVar("_T", bound=TTSModel)
 
 
 def get_model(name: str) -> TTSModel:
@@ -16,12 +34,81 @@ def get_model(name: str) -> TTSModel:
     Instances are created once and reused for the lifetime of the process,
     avoiding redundant HuggingFace Hub checks and pipeline re-initialisations
     on every request.
+
+    The instance is wrapped in optional layers, outermost first:
+
+    - CachedModel (``CACHE_ENABLED``) serves repeated syntheses from the
+      synthesis cache.
+    - SegmentedModel (``CACHE_ENABLED``) synthesises incremental requests
+      sentence by sentence, reusing cached sentences.
+    - ParallelModel (``PARALLEL_SYNTHESIS_WORKERS > 1``) splits long texts
+      into sentence-aligned chunks and synthesises them concurrently.
+    - ProcessPoolModel (``INFERENCE_WORKERS > 0``) runs inference in forked
+      worker processes that share the model weights.
+
+    Lightweight models (``TTSModel.LIGHTWEIGHT``) only get the cache layers.
     """
-    if name not in _INSTANCES:
-        cls = _REGISTRY.get(name)
-        if cls is None:
-            raise ValueError(
-                f"Unknown TTS model '{name}'. Available: {list(_REGISTRY.keys())}"
-            )
-        _INSTANCES[name] = cls()
+    with _INSTANCES_LOCK:
+        if name not in _INSTANCES:
+            _INSTANCES[name] = _build(name)
     return _INSTANCES[name]
+
+
+def _build(name: str) -> TTSModel:
+    """Instantiate model *name* and wrap it in the configured layers."""
+    import config  # local import to avoid circular dependency at module level
+
+    cls = _REGISTRY.get(name)
+    if cls is None:
+        raise ValueError(
+            f"Unknown TTS model '{name}'. Available: {list(_REGISTRY.keys())}"
+        )
+    model: TTSModel = cls()
+    heavy = not model.LIGHTWEIGHT
+    if heavy and config.INFERENCE_WORKERS > 0:
+        from inference import ProcessPoolModel  # noqa: PLC0415
+        model = ProcessPoolModel(
+            model,
+            workers=config.INFERENCE_WORKERS,
+            torch_threads=config.INFERENCE_WORKER_THREADS,
+            preload_languages=config.KOKORO_PRELOAD_LANGUAGES or [config.DEFAULT_LANGUAGE],
+        )
+    if heavy and config.PARALLEL_SYNTHESIS_WORKERS > 1:
+        from inference import ParallelModel  # noqa: PLC0415
+        model = ParallelModel(
+            model,
+            parallelism=config.PARALLEL_SYNTHESIS_WORKERS,
+            min_chars=config.PARALLEL_MIN_CHARS,
+            max_chars=config.PARALLEL_SEGMENT_CHARS,
+            pause=config.SEGMENT_PAUSE_MS / 1000.0,
+            paragraph_pause=config.SEGMENT_PARAGRAPH_PAUSE_MS / 1000.0,
+        )
+    if config.CACHE_ENABLED:
+        from cache import get_synthesis_cache  # noqa: PLC0415
+        cache = get_synthesis_cache()
+        model = SegmentedModel(
+            name,
+            model,
+            cache,
+            max_chars=config.SEGMENT_MAX_CHARS,
+            pause=config.SEGMENT_PAUSE_MS / 1000.0,
+            paragraph_pause=config.SEGMENT_PARAGRAPH_PAUSE_MS / 1000.0,
+            default=config.INCREMENTAL_DEFAULT,
+        )
+        model = CachedModel(name, model, cache)
+    return model
+
+
+def loaded_models() -> dict[str, TTSModel]:
+    """Return the model instances created so far, keyed by registry name."""
+    return dict(_INSTANCES)
+
+
+def find_layer(model: TTSModel, cls: type[_T]) -> Optional[_T]:
+    """Return the first layer of type *cls* in a stack of WrappedModels."""
+    while True:
+        if isinstance(model, cls):
+            return model
+        if not isinstance(model, WrappedModel):
+            return None
+        model = model.inner
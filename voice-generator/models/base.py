@@ -1,5 +1,9 @@
+import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+import numpy as np
 
 
 @dataclass
@@ -10,17 +14,56 @@ class TTSRequest:
     speed: float = 1.0
     language: str = "a"
     # Future extensibility: add format, sample_rate, etc.
+    # extra["phonemes"] = True marks *text* as pre-phonemized input
+    # extra["deadline"] is a time.time() after which synthesis is abandoned
+    # extra["cancel"] is a flag with is_set() (e.g. threading.Event) that
+    # aborts synthesis once set; see `check_cancelled`
     extra: dict = field(default_factory=dict)
 
 
+class SynthesisCancelled(Exception):
+    """Synthesis was abandoned because its caller cancelled the request."""
+
+
+class DeadlineExceeded(SynthesisCancelled):
+    """Synthesis was abandoned because the request's deadline passed."""
+
+
+def check_cancelled(request: TTSRequest) -> None:
+    """Raise if *request* has been cancelled or is past its deadline.
+
+    Backends call this between chunks, so an abandoned request stops
+    occupying the model after at most one more chunk.
+    """
+    cancel = request.extra.get("cancel")
+    if cancel is not None and cancel.is_set():
+        raise SynthesisCancelled("Request was cancelled")
+    deadline = request.extra.get("deadline")
+    if deadline is not None and time.time() > deadline:
+        raise DeadlineExceeded("Request deadline exceeded")
+
+
 class TTSModel(ABC):
     """Abstract base class for all TTS backends.
 
     To add a new backend:
     1. Subclass TTSModel and implement `generate`.
     2. Register it in models/__init__.py under a unique key.
+
+    Backends that produce audio incrementally can also override
+    `generate_stream` so callers receive audio before synthesis finishes.
     """
 
+    # Sample rate (Hz) of the audio produced by this backend
+    SAMPLE_RATE: int = 24_000
+
+    # Whether `phonemize` is implemented and ``extra["phonemes"]`` input is accepted
+    SUPPORTS_PHONEMES: bool = False
+
+    # Cheap backends (e.g. espeak) skip the worker pool, parallel chunking
+    # and admission control
+    LIGHTWEIGHT: bool = False
+
     @abstractmethod
     def generate(self, request: TTSRequest) -> bytes:
         """Generate audio from *request* and return raw PCM/WAV bytes.
@@ -30,6 +73,54 @@ class TTSModel(ABC):
         """
         ...
 
+    def generate_stream(self, request: TTSRequest) -> Iterator[np.ndarray]:
+        """Yield mono float32 PCM chunks at ``SAMPLE_RATE`` as they are produced.
+
+        The default implementation runs `generate` to completion and yields
+        the decoded audio as a single chunk. Override it to stream.
+        """
+        from audio import decode_wav  # noqa: PLC0415
+
+        samples, _sample_rate = decode_wav(self.generate(request))
+        yield samples
+
+    def generate_batch(self, requests: list[TTSRequest]) -> list[bytes | Exception]:
+        """Generate audio for several requests in one call.
+
+        Returns one entry per request, in order: the WAV bytes, or the
+        exception raised for that request. The default implementation runs
+        `generate` for each request; backends with a true batched forward
+        pass can override it.
+        """
+        results: list[bytes | Exception] = []
+        for request in requests:
+            try:
+                results.append(self.generate(request))
+            except Exception as exc:
+                results.append(exc)
+        return results
+
+    def preload(self, languages: list[str]) -> None:
+        """Optional: eagerly load whatever is needed to serve *languages*."""
+        return None
+
+    def warm(self, request: TTSRequest) -> None:
+        """Optional: run *request* once everywhere inference happens, so
+        first-call costs are paid before real traffic (see warmup.py)."""
+        self.generate(request)
+
+    def phonemize(self, text: str, language: str) -> list[list[tuple[str, str]]]:
+        """Optional: return ``(segment, phonemes)`` pairs for each paragraph of *text*.
+
+        Joining the phonemes with spaces within a paragraph and newlines
+        between paragraphs gives input suitable for ``extra["phonemes"]``.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support phonemization")
+
+    def g2p_cache_stats(self) -> Optional[dict]:
+        """Optional: counters for the model's grapheme-to-phoneme cache."""
+        return None
+
     def supported_voices(self) -> list[str]:
         """Optional: return a list of voice identifiers this model supports."""
         return []
@@ -37,3 +128,44 @@ class TTSModel(ABC):
     def supported_languages(self) -> list[str]:
         """Optional: return BCP-47 or model-specific language codes."""
         return []
+
+
+class WrappedModel(TTSModel):
+    """Base for layers that sit in front of another TTSModel.
+
+    Everything is delegated to *inner*; subclasses override only what they
+    change (caching, scheduling, ...).
+    """
+
+    def __init__(self, inner: TTSModel) -> None:
+        self.inner = inner
+        self.SAMPLE_RATE = inner.SAMPLE_RATE
+        self.SUPPORTS_PHONEMES = inner.SUPPORTS_PHONEMES
+        self.LIGHTWEIGHT = inner.LIGHTWEIGHT
+
+    def generate(self, request: TTSRequest) -> bytes:
+        return self.inner.generate(request)
+
+    def generate_stream(self, request: TTSRequest) -> Iterator[np.ndarray]:
+        return self.inner.generate_stream(request)
+
+    def generate_batch(self, requests: list[TTSRequest]) -> list[bytes | Exception]:
+        return self.inner.generate_batch(requests)
+
+    def preload(self, languages: list[str]) -> None:
+        self.inner.preload(languages)
+
+    def warm(self, request: TTSRequest) -> None:
+        self.inner.warm(request)
+
+    def phonemize(self, text: str, language: str) -> list[list[tuple[str, str]]]:
+        return self.inner.phonemize(text, language)
+
+    def g2p_cache_stats(self) -> Optional[dict]:
+        return self.inner.g2p_cache_stats()
+
+    def supported_voices(self) -> list[str]:
+        return self.inner.supported_voices()
+
+    def supported_languages(self) -> list[str]:
+        return self.inner.supported_languages()
@@ -0,0 +1,75 @@
+from typing import Iterator
+
+import numpy as np
+
+from audio import decode_wav, encode_wav
+from cache import SynthesisCache, make_key
+
+from .base import SynthesisCancelled, TTSModel, TTSRequest, WrappedModel, check_cancelled
+
+
+class CachedModel(WrappedModel):
+    """Wrap any TTSModel with the content-addressed synthesis cache.
+
+    The cache key is a hash of (model name, voice, speed, language, text),
+    plus an input marker for pre-phonemized text, so identical narration
+    scripts re-submitted by the slide workflow are served without running
+    the model again. Set ``request.extra["cache"]`` to ``False`` to bypass
+    the cache for a single request.
+    """
+
+    def __init__(self, name: str, inner: TTSModel, cache: SynthesisCache) -> None:
+        super().__init__(inner)
+        self.name = name
+        self.cache = cache
+
+    def cache_key(self, request: TTSRequest) -> str:
+        parts = [self.name, request.voice, request.speed, request.language, request.text]
+        if request.extra.get("phonemes"):
+            parts.append("phonemes")
+        if request.extra.get("incremental"):
+            # Stitched audio differs from a single pass
+            parts.append("incremental")
+        return make_key(*parts)
+
+    def generate(self, request: TTSRequest) -> bytes:
+        key = self.cache_key(request)
+        bypass = request.extra.get("cache") is False
+
+        def compute() -> bytes:
+            return self.inner.generate(request)
+
+        def check() -> None:
+            # Waiting on an identical request still honours this one's
+            # deadline and disconnect
+            check_cancelled(request)
+
+        try:
+            return self.cache.get_or_compute(key, compute, bypass=bypass, check=check)
+        except SynthesisCancelled:
+            # Coalesced onto a request that was cancelled: unless this one
+            # was cancelled too, synthesise it ourselves
+            check_cancelled(request)
+            return self.cache.get_or_compute(key, compute, bypass=bypass, check=check)
+
+    def generate_stream(self, request: TTSRequest) -> Iterator[np.ndarray]:
+        """Stream from the cache on a hit; otherwise stream from the wrapped
+        model and store the assembled audio once the stream completes.
+        """
+        bypass = request.extra.get("cache") is False
+        key = self.cache_key(request)
+
+        cached = self.cache.lookup(key, bypass=bypass)
+        if cached is not None:
+            samples, _sample_rate = decode_wav(cached)
+            yield samples
+            return
+
+        chunks: list[np.ndarray] = []
+        for chunk in self.inner.generate_stream(request):
+            if not bypass:
+                chunks.append(chunk)
+            yield chunk
+
+        if not bypass and chunks:
+            self.cache.put(key, encode_wav(np.concatenate(chunks), self.SAMPLE_RATE))
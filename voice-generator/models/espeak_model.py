@@ -0,0 +1,122 @@
+import re
+import shutil
+import struct
+import subprocess
+import threading
+from typing import Iterator
+
+import numpy as np
+
+from audio import encode_wav
+
+from .base import TTSModel, TTSRequest, check_cancelled
+
+# Kokoro language codes → espeak-ng voices, so requests meant for Kokoro
+# can be served unchanged; other codes are passed to espeak-ng as-is
+_LANGUAGES = {
+    "a": "en-us",
+    "b": "en-gb",
+    "e": "es",
+    "f": "fr-fr",
+    "h": "hi",
+    "i": "it",
+    "j": "ja",
+    "p": "pt-br",
+    "z": "cmn",
+}
+
+# espeak-ng's default rate (speed 1.0) and accepted range, in words per minute
+_BASE_WPM = 175
+_MIN_WPM, _MAX_WPM = 80, 450
+
+
+def _read_wav(data: bytes) -> tuple[np.ndarray, int]:
+    """Decode espeak-ng's ``--stdout`` WAV (16-bit mono).
+
+    The chunk sizes in the header are placeholders when espeak-ng writes
+    to a pipe, so the data chunk is taken to run to the end of *data*.
+    """
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise RuntimeError("espeak-ng did not produce WAV output")
+    sample_rate = struct.unpack_from("<I", data, 24)[0]
+    offset = data.find(b"data", 12)
+    if offset < 0:
+        raise RuntimeError("espeak-ng output has no data chunk")
+    pcm = data[offset + 8:]
+    pcm = pcm[: len(pcm) - len(pcm) % 2]
+    return np.frombuffer(pcm, dtype="<i2").astype(np.float32) / 32768.0, sample_rate
+
+
+class EspeakModel(TTSModel):
+    """Formant synthesis with the espeak-ng command-line tool.
+
+    Sounds robotic, but runs hundreds of times faster than real time on one
+    core with no weights to load, which makes it the cheap tier for drafts
+    and for shedding load when the neural model is saturated (see
+    ``routing``). espeak-ng is already in the runtime image as Kokoro's
+    phonemiser.
+
+    Kokoro voice names and language codes are accepted: the language code
+    picks the espeak-ng voice and the voice's second letter (``af_heart``,
+    ``am_adam``) a female or male variant. Each line is synthesised by its
+    own espeak-ng process, at most ``ESPEAK_MAX_CONCURRENT`` at a time.
+    """
+
+    SAMPLE_RATE = 22_050
+
+    LIGHTWEIGHT = True
+
+    def __init__(self, binary: str | None = None, max_concurrent: int | None = None) -> None:
+        import config  # local import to avoid circular dependency at module level
+
+        self.binary = binary or config.ESPEAK_BINARY
+        self._slots = threading.BoundedSemaphore(max(1, max_concurrent or config.ESPEAK_MAX_CONCURRENT))
+
+    def _voice(self, request: TTSRequest) -> str:
+        voice = _LANGUAGES.get(request.language, request.language)
+        name = request.voice
+        if name in ("female", "male"):
+            return f"{voice}+{name[0]}3"
+        if len(name) > 2 and name[2] == "_" and name[1] in "fm":
+            return f"{voice}+{name[1]}3"
+        return voice
+
+    def _run(self, text: str, request: TTSRequest) -> np.ndarray:
+        wpm = min(_MAX_WPM, max(_MIN_WPM, round(_BASE_WPM * request.speed)))
+        command = [self.binary, "--stdout", "-b", "1", "-v", self._voice(request), "-s", str(wpm), "--stdin"]
+        with self._slots:
+            try:
+                proc = subprocess.run(command, input=text.encode("utf-8"), capture_output=True, timeout=60)
+            except FileNotFoundError:
+                raise RuntimeError(f"espeak-ng binary '{self.binary}' not found")
+        if proc.returncode != 0:
+            raise RuntimeError(f"espeak-ng failed: {proc.stderr.decode('utf-8', 'replace').strip()}")
+        samples, sample_rate = _read_wav(proc.stdout)
+        if sample_rate != self.SAMPLE_RATE:
+            from audio import resample  # noqa: PLC0415
+            samples = resample(samples, sample_rate, self.SAMPLE_RATE)
+        return samples
+
+    def generate(self, request: TTSRequest) -> bytes:
+        return encode_wav(np.concatenate(list(self.generate_stream(request))), self.SAMPLE_RATE)
+
+    def generate_stream(self, request: TTSRequest) -> Iterator[np.ndarray]:
+        produced = False
+        for line in re.split(r"\n+", request.text.strip()):
+            if not line.strip():
+                continue
+            check_cancelled(request)
+            produced = True
+            yield self._run(line, request)
+        if not produced:
+            raise RuntimeError("espeak-ng was given no text.")
+
+    def preload(self, languages: list[str]) -> None:
+        if shutil.which(self.binary) is None:
+            raise RuntimeError(f"espeak-ng binary '{self.binary}' not found")
+
+    def supported_voices(self) -> list[str]:
+        return ["female", "male"]
+
+    def supported_languages(self) -> list[str]:
+        return list(_LANGUAGES)
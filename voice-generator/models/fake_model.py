@@ -0,0 +1,81 @@
+import hashlib
+import re
+import time
+from typing import Iterator
+
+import numpy as np
+
+from audio import encode_wav
+
+from .base import TTSModel, TTSRequest, check_cancelled
+
+
+class FakeModel(TTSModel):
+    """Deterministic stand-in for a neural TTS model.
+
+    Produces a quiet synthetic tone whose length follows the text
+    (``FAKE_MODEL_CHARS_PER_SECOND`` at speed 1.0), chunked per line like
+    Kokoro. The same request always yields the same samples. With
+    ``FAKE_MODEL_REAL_TIME_FACTOR`` > 0 each chunk sleeps to simulate
+    inference at that speed.
+
+    Needs no weights or network access, which makes it suitable for
+    benchmarking the server, cache and storage layers in isolation.
+    """
+
+    SAMPLE_RATE = 24_000
+
+    # Phoneme input is sized like text; `phonemize` lower-cases each sentence
+    SUPPORTS_PHONEMES = True
+
+    def __init__(
+        self,
+        chars_per_second: float | None = None,
+        real_time_factor: float | None = None,
+    ) -> None:
+        import config  # local import to avoid circular dependency at module level
+
+        self.chars_per_second = chars_per_second or config.FAKE_MODEL_CHARS_PER_SECOND
+        self.real_time_factor = (
+            config.FAKE_MODEL_REAL_TIME_FACTOR if real_time_factor is None else real_time_factor
+        )
+
+    def _chunk(self, text: str, request: TTSRequest) -> np.ndarray:
+        seconds = max(0.1, len(text) / (self.chars_per_second * request.speed))
+        frames = int(seconds * self.SAMPLE_RATE)
+
+        # Pitch derived from the content so different texts sound different
+        digest = hashlib.sha256(f"{request.voice}|{text}".encode("utf-8")).digest()
+        pitch = 110.0 + digest[0]
+        t = np.arange(frames, dtype=np.float32) / self.SAMPLE_RATE
+        return (0.2 * np.sin(2.0 * np.pi * pitch * t)).astype(np.float32)
+
+    def generate(self, request: TTSRequest) -> bytes:
+        return encode_wav(np.concatenate(list(self.generate_stream(request))), self.SAMPLE_RATE)
+
+    def generate_stream(self, request: TTSRequest) -> Iterator[np.ndarray]:
+        produced = False
+        for line in re.split(r"\n+", request.text.strip()):
+            if not line.strip():
+                continue
+            check_cancelled(request)
+            chunk = self._chunk(line, request)
+            if self.real_time_factor > 0:
+                time.sleep(len(chunk) / self.SAMPLE_RATE / self.real_time_factor)
+            produced = True
+            yield chunk
+        if not produced:
+            raise RuntimeError("Fake model was given no text.")
+
+    def phonemize(self, text: str, language: str) -> list[list[tuple[str, str]]]:
+        return [
+            [(sentence, sentence.lower()) for sentence in re.split(r"(?<=[.!?])\s+", line.strip()) if sentence]
+            for line in re.split(r"\n+", text.strip())
+            if line.strip()
+        ]
+
+    def supported_voices(self) -> list[str]:
+        return ["default"]
+
+    def supported_languages(self) -> list[str]:
+        return ["a", "b"]
@@ -1,21 +1,80 @@
+import copy
 import io
+import re
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Iterator, Optional
+
 import numpy as np
 import soundfile as sf
-from kokoro import KPipeline
 
-from .base import TTSModel, TTSRequest
+from metrics import Profile, stage, timed_iter
+
+from .base import TTSModel, TTSRequest, check_cancelled
+
+if TYPE_CHECKING:
+    from kokoro import KModel, KPipeline
+
+# Longest phoneme sequence Kokoro accepts in one forward pass
+PHONEME_LIMIT = 510
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def _split_paragraphs(text: str) -> list[str]:
+    """Split on newlines like ``KPipeline.__call__``, dropping blank lines."""
+    return [p for p in re.split(r"\n+", text.strip()) if p.strip()]
+
+
+def _split_sentences(paragraph: str) -> list[str]:
+    return [s for s in _SENTENCE_END.split(paragraph.strip()) if s]
+
+
+def _chunk_phonemes(phonemes: str, limit: int = PHONEME_LIMIT) -> list[str]:
+    """Split a phoneme string into pieces of at most *limit* characters.
+
+    Breaks between words, preferring the last one that ends a clause.
+    """
+    chunks = []
+    rest = phonemes.strip()
+    while len(rest) > limit:
+        window = rest[: limit + 1]
+        cut = max(window.rfind(p + " ") + 1 for p in ".!?,;:")
+        if cut <= 0:
+            cut = window.rfind(" ")
+        if cut <= 0:
+            cut = limit
+        chunks.append(rest[:cut].strip())
+        rest = rest[cut:].strip()
+    if rest:
+        chunks.append(rest)
+    return chunks
 
 
 class KokoroModel(TTSModel):
     """TTS backend powered by the Kokoro neural TTS library.
 
     Model weights (~300 MB) are downloaded automatically on first use and
-    cached by the kokoro library.
+    cached by the kokoro library. The kokoro and torch imports themselves
+    (several seconds, pulling in spaCy and misaki) are also deferred to
+    first use so the service can answer health checks straight away.
+
+    One KPipeline is kept per language (G2P is language-specific), up to
+    ``KOKORO_MAX_PIPELINES``; the least-recently-used pipeline is evicted
+    beyond that. All pipelines share a single KModel, so the weights are
+    loaded once regardless of how many languages are in use.
+
+    English G2P results are cached per sentence (``KOKORO_G2P_CACHE_SIZE``
+    entries, LRU), and ``extra["phonemes"]`` input skips G2P entirely.
     """
 
     # Kokoro's native output sample rate
     SAMPLE_RATE = 24_000
 
+    SUPPORTS_PHONEMES = True
+
+    REPO_ID = "hexgrad/Kokoro-82M"
+
     # Voices bundled with Kokoro at the time of writing
     _VOICES = [
         "af_heart", "af_bella", "af_sarah", "af_sky",
@@ -24,15 +83,129 @@ class KokoroModel(TTSModel):
         "bm_george", "bm_lewis",
     ]
 
-    def __init__(self) -> None:
-        # Pipeline is initialised lazily so the import doesn't block startup
-        self._pipeline: KPipeline | None = None
+    def __init__(self, max_pipelines: int | None = None) -> None:
+        import config  # local import to avoid circular dependency at module level
+
+        # Model and pipelines are initialised lazily so the import doesn't
+        # block startup
+        self._model: "KModel | None" = None
+        self._pipelines: "OrderedDict[str, KPipeline]" = OrderedDict()
+        self._max_pipelines = max(1, max_pipelines or config.KOKORO_MAX_PIPELINES)
+        self._lock = threading.Lock()
+
+        # (lang_code, sentence) -> (phonemes, tokens), shared by all requests
+        self._g2p_cache: "OrderedDict[tuple[str, str], tuple[str, list]]" = OrderedDict()
+        self._g2p_cache_size = max(0, config.KOKORO_G2P_CACHE_SIZE)
+        self._g2p_lock = threading.Lock()
+        # misaki/spaCy G2P is not thread-safe; inference may run concurrently
+        self._g2p_run_lock = threading.Lock()
+        self._g2p_hits = 0
+        self._g2p_misses = 0
+
+    def _get_model(self) -> "KModel":
+        """Return (and lazily initialise) the KModel shared by all pipelines.
+
+        Must be called with the lock held.
+        """
+        if self._model is None:
+            import torch  # noqa: PLC0415
+            from kokoro import KModel  # noqa: PLC0415
 
-    def _get_pipeline(self, lang_code: str) -> KPipeline:
-        """Return (and lazily initialise) the Kokoro pipeline."""
-        if self._pipeline is None or self._pipeline.lang_code != lang_code:
-            self._pipeline = KPipeline(lang_code=lang_code)
-        return self._pipeline
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+            self._model = KModel(repo_id=self.REPO_ID).to(device).eval()
+        return self._model
+
+    def _build_pipeline(self, lang_code: str) -> "KPipeline":
+        """Create the pipeline for *lang_code*. Must be called with the lock held."""
+        from kokoro import KPipeline  # noqa: PLC0415
+
+        return KPipeline(lang_code=lang_code, repo_id=self.REPO_ID, model=self._get_model())
+
+    def _get_pipeline(self, lang_code: str) -> "KPipeline":
+        """Return (and lazily initialise) the Kokoro pipeline for *lang_code*."""
+        with self._lock:
+            pipeline = self._pipelines.get(lang_code)
+            if pipeline is not None:
+                self._pipelines.move_to_end(lang_code)
+                return pipeline
+
+            pipeline = self._build_pipeline(lang_code)
+            self._pipelines[lang_code] = pipeline
+            while len(self._pipelines) > self._max_pipelines:
+                self._pipelines.popitem(last=False)
+            return pipeline
+
+    # ------------------------------------------------------------------
+    # G2P
+    # ------------------------------------------------------------------
+
+    def _g2p(self, pipeline: "KPipeline", sentence: str) -> tuple[str, list]:
+        """Phonemize *sentence* through the shared LRU cache.
+
+        Returns the phoneme string and a private copy of the tokens:
+        ``generate_from_tokens`` writes timestamps onto them, so cached
+        tokens are never handed out directly.
+        """
+        key = (pipeline.lang_code, sentence)
+        if self._g2p_cache_size:
+            with self._g2p_lock:
+                cached = self._g2p_cache.get(key)
+                if cached is not None:
+                    self._g2p_cache.move_to_end(key)
+                    self._g2p_hits += 1
+                else:
+                    self._g2p_misses += 1
+            if cached is not None:
+                return cached[0], copy.deepcopy(cached[1])
+
+        with self._g2p_run_lock:
+            phonemes, tokens = pipeline.g2p(sentence)
+        if self._g2p_cache_size:
+            with self._g2p_lock:
+                self._g2p_cache[key] = (phonemes, copy.deepcopy(tokens))
+                while len(self._g2p_cache) > self._g2p_cache_size:
+                    self._g2p_cache.popitem(last=False)
+        return phonemes, tokens
+
+    def _paragraph_tokens(self, pipeline: "KPipeline", paragraph: str, profile: Optional[Profile]) -> list:
+        """Phonemize *paragraph* sentence by sentence and join the tokens.
+
+        Sentences are the cache unit because narration reuses them across
+        scripts far more often than whole paragraphs.
+        """
+        tokens: list = []
+        for sentence in _split_sentences(paragraph):
+            with stage("g2p", profile):
+                _phonemes, sentence_tokens = self._g2p(pipeline, sentence)
+            if tokens and sentence_tokens and not tokens[-1].whitespace:
+                tokens[-1].whitespace = " "
+            tokens.extend(sentence_tokens)
+        return tokens
+
+    def _results(self, pipeline: "KPipeline", request: TTSRequest, voice: str, profile: Optional[Profile]):
+        """Yield Kokoro results for *request*, timing G2P and inference separately."""
+        speed = request.speed
+        if request.extra.get("phonemes"):
+            for paragraph in _split_paragraphs(request.text):
+                for chunk in _chunk_phonemes(paragraph):
+                    yield from timed_iter(
+                        pipeline.generate_from_tokens(chunk, voice=voice, speed=speed), "inference", profile
+                    )
+            return
+
+        if pipeline.lang_code not in ("a", "b"):
+            # Non-English G2P is interleaved with chunking inside KPipeline
+            yield from timed_iter(
+                pipeline(request.text, voice=voice, speed=speed, split_pattern=r"\n+"), "inference", profile
+            )
+            return
+
+        # Same paragraph split as KPipeline.__call__, with G2P run explicitly
+        for paragraph in _split_paragraphs(request.text):
+            tokens = self._paragraph_tokens(pipeline, paragraph, profile)
+            yield from timed_iter(
+                pipeline.generate_from_tokens(tokens, voice=voice, speed=speed), "inference", profile
+            )
 
     # ------------------------------------------------------------------
     # TTSModel interface
@@ -40,31 +213,69 @@ class KokoroModel(TTSModel):
 
     def generate(self, request: TTSRequest) -> bytes:
         """Synthesise *request.text* and return a WAV file as bytes."""
+        chunks = list(self.generate_stream(request))
+
+        profile = request.extra.get("profile")
+        with stage("concatenate", profile):
+            combined = np.concatenate(chunks)
+
+        # Encode to WAV in-memory
+        with stage("encode", profile):
+            buf = io.BytesIO()
+            sf.write(buf, combined, self.SAMPLE_RATE, format="WAV")
+            return buf.getvalue()
+
+    def generate_stream(self, request: TTSRequest) -> Iterator[np.ndarray]:
+        """Yield float32 PCM for each chunk as soon as Kokoro produces it."""
         pipeline = self._get_pipeline(request.language)
 
         voice = request.voice if request.voice != "default" else "af_heart"
 
-        generator = pipeline(
-            request.text,
-            voice=voice,
-            speed=request.speed,
-            split_pattern=r"\n+",
-        )
+        results = self._results(pipeline, request, voice, request.extra.get("profile"))
 
-        all_audio: list[np.ndarray] = []
-        for _graphemes, _phonemes, audio_chunk in generator:
-            all_audio.append(audio_chunk)
+        produced = False
+        check_cancelled(request)
+        for result in results:
+            # Abandoned requests stop here instead of running the next chunk
+            check_cancelled(request)
+            if result.audio is None:
+                continue
+            produced = True
+            yield np.asarray(result.audio, dtype=np.float32)
 
-        if not all_audio:
+        if not produced:
             raise RuntimeError("Kokoro returned no audio chunks.")
 
-        combined = np.concatenate(all_audio)
+    def preload(self, languages: list[str]) -> None:
+        """Build pipelines for *languages* up front (and load the weights)."""
+        for lang_code in languages[: self._max_pipelines]:
+            self._get_pipeline(lang_code)
 
-        # Encode to WAV in-memory
-        buf = io.BytesIO()
-        sf.write(buf, combined, self.SAMPLE_RATE, format="WAV")
-        buf.seek(0)
-        return buf.read()
+    def phonemize(self, text: str, language: str) -> list[list[tuple[str, str]]]:
+        """Return ``(sentence, phonemes)`` pairs per paragraph, via the G2P cache."""
+        pipeline = self._get_pipeline(language)
+        paragraphs = []
+        for paragraph in _split_paragraphs(text):
+            if pipeline.lang_code not in ("a", "b"):
+                with self._g2p_run_lock:
+                    phonemes, _tokens = pipeline.g2p(paragraph)
+                paragraphs.append([(paragraph, phonemes)])
+                continue
+            paragraphs.append([
+                (sentence, self._g2p(pipeline, sentence)[0]) for sentence in _split_sentences(paragraph)
+            ])
+        return paragraphs
+
+    def g2p_cache_stats(self) -> Optional[dict]:
+        with self._g2p_lock:
+            lookups = self._g2p_hits + self._g2p_misses
+            return {
+                "entries": len(self._g2p_cache),
+                "max_entries": self._g2p_cache_size,
+                "hits": self._g2p_hits,
+                "misses": self._g2p_misses,
+                "hit_rate": self._g2p_hits / lookups if lookups else 0.0,
+            }
 
     def supported_voices(self) -> list[str]:
         return list(self._VOICES)
@@ -0,0 +1,147 @@
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Optional
+
+import numpy as np
+
+from .kokoro_model import KokoroModel
+
+if TYPE_CHECKING:
+    from kokoro import KPipeline
+
+# Graph input/output names, shared with the export tool (export_onnx)
+INPUT_IDS = "input_ids"
+STYLE = "style"
+SPEED = "speed"
+WAVEFORM = "waveform"
+
+
+@dataclass
+class _Output:
+    """Stands in for ``KModel.Output``; no durations, so no timestamps."""
+    audio: np.ndarray
+    pred_dur: None = None
+
+
+class _OnnxKModel:
+    """Duck-typed ``KModel`` that runs the exported graph on ONNX Runtime.
+
+    KPipeline calls its model as ``model(phonemes, ref_s, speed,
+    return_output=True)`` and moves voice packs to ``model.device``; this
+    class implements just that, so G2P, chunking and voice loading stay in
+    KPipeline.
+
+    The session is created on first use in each process: ONNX Runtime's
+    thread pools do not survive ``fork``, so worker processes must not
+    inherit a session built in the parent.
+    """
+
+    device = "cpu"
+
+    def __init__(self, path: str, vocab: dict[str, int], context_length: int, threads: int) -> None:
+        self.path = path
+        self.vocab = vocab
+        self.context_length = context_length
+        self.threads = threads
+        self._session: Any = None
+        self._session_pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _get_session(self):
+        with self._lock:
+            if self._session is None or self._session_pid != os.getpid():
+                import onnxruntime as ort  # noqa: PLC0415
+
+                options = ort.SessionOptions()
+                options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+                if self.threads > 0:
+                    options.intra_op_num_threads = self.threads
+                self._session = ort.InferenceSession(
+                    self.path, sess_options=options, providers=["CPUExecutionProvider"]
+                )
+                self._session_pid = os.getpid()
+            return self._session
+
+    def __call__(self, phonemes: str, ref_s, speed: float = 1, return_output: bool = False):
+        # Same tokenisation as KModel.forward: unknown symbols are dropped
+        input_ids = [i for i in map(self.vocab.get, phonemes) if i is not None]
+        if len(input_ids) + 2 > self.context_length:
+            raise ValueError(f"Phoneme sequence too long: {len(input_ids) + 2} > {self.context_length}")
+        style = np.asarray(ref_s, dtype=np.float32).reshape(1, -1)
+        (waveform,) = self._get_session().run(
+            [WAVEFORM],
+            {
+                INPUT_IDS: np.array([[0, *input_ids, 0]], dtype=np.int64),
+                STYLE: style,
+                SPEED: np.array([speed], dtype=np.float32),
+            },
+        )
+        audio = np.asarray(waveform, dtype=np.float32).reshape(-1)
+        return _Output(audio) if return_output else audio
+
+
+class KokoroOnnxModel(KokoroModel):
+    """Kokoro on ONNX Runtime (CPU) instead of PyTorch eager mode.
+
+    Runs the graph exported by ``python -m export_onnx`` from
+    ``KOKORO_ONNX_PATH``. Voices, languages, G2P (and its cache) and
+    phoneme input behave exactly as in `KokoroModel`; only the acoustic
+    model is swapped, so the PyTorch weights are never loaded.
+    """
+
+    QUANTIZED = False
+
+    def __init__(self, model_path: str | None = None, threads: int | None = None, **kwargs) -> None:
+        import config  # local import to avoid circular dependency at module level
+
+        super().__init__(**kwargs)
+        default_path = config.KOKORO_ONNX_INT8_PATH if self.QUANTIZED else config.KOKORO_ONNX_PATH
+        self.model_path = model_path or default_path
+        if threads is None:
+            threads = config.KOKORO_ONNX_THREADS
+            if not threads and config.INFERENCE_WORKERS > 0:
+                threads = config.INFERENCE_WORKER_THREADS
+        self.threads = threads
+
+    def _get_model(self) -> _OnnxKModel:  # type: ignore[override]
+        """Return (and lazily initialise) the ONNX model shared by all pipelines.
+
+        Must be called with the lock held.
+        """
+        if self._model is None:
+            if not os.path.exists(self.model_path):
+                raise RuntimeError(
+                    f"ONNX model not found at '{self.model_path}'. "
+                    "Export it with: python -m export_onnx --output <path>"
+                )
+            from huggingface_hub import hf_hub_download  # noqa: PLC0415
+
+            with open(hf_hub_download(repo_id=self.REPO_ID, filename="config.json"), encoding="utf-8") as f:
+                kconfig = json.load(f)
+            self._model = _OnnxKModel(
+                self.model_path,
+                vocab=kconfig["vocab"],
+                context_length=kconfig["plbert"]["max_position_embeddings"],
+                threads=self.threads,
+            )
+        return self._model
+
+    def _build_pipeline(self, lang_code: str) -> "KPipeline":
+        from kokoro import KPipeline  # noqa: PLC0415
+
+        # model=False skips loading the PyTorch KModel; the pipeline then
+        # calls the ONNX stand-in wherever it would call the KModel
+        pipeline = KPipeline(lang_code=lang_code, repo_id=self.REPO_ID, model=False)
+        pipeline.model = self._get_model()
+        return pipeline
+
+
+class KokoroOnnxInt8Model(KokoroOnnxModel):
+    """`KokoroOnnxModel` on the dynamically int8-quantized graph
+    (``KOKORO_ONNX_INT8_PATH``): smaller and faster, at a small cost in
+    audio fidelity. ``python -m export_onnx --quantize`` reports how much.
+    """
+
+    QUANTIZED = True
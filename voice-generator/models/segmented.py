@@ -0,0 +1,204 @@
+import re
+import threading
+from dataclasses import dataclass
+from typing import Iterator
+
+import numpy as np
+
+from audio import decode_wav, encode_wav, silence, stitch, trim_silence
+from cache import SynthesisCache, make_key
+from metrics import stage
+
+from .base import TTSModel, TTSRequest, WrappedModel
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_CLAUSE_END = re.compile(r"(?<=[,;:])\s+")
+
+
+@dataclass
+class Segment:
+    text: str
+    # Index of the newline-separated paragraph the segment belongs to
+    paragraph: int
+
+
+def _pack(pieces: list[str], max_chars: int) -> list[str]:
+    """Greedily join *pieces* with spaces into strings of at most *max_chars*."""
+    packed: list[str] = []
+    for piece in pieces:
+        if packed and len(packed[-1]) + 1 + len(piece) <= max_chars:
+            packed[-1] += " " + piece
+        else:
+            packed.append(piece)
+    return packed
+
+
+def split_segments(text: str, max_chars: int = 300) -> list[Segment]:
+    """Split *text* into sentence segments, grouped by paragraph.
+
+    Sentences longer than *max_chars* are split further at clause
+    punctuation, and failing that between words.
+    """
+    segments: list[Segment] = []
+    paragraphs = [p for p in re.split(r"\n+", text.strip()) if p.strip()]
+    for index, paragraph in enumerate(paragraphs):
+        for sentence in _SENTENCE_END.split(paragraph.strip()):
+            if not sentence:
+                continue
+            pieces = [sentence]
+            if len(sentence) > max_chars:
+                pieces = _pack(_CLAUSE_END.split(sentence), max_chars)
+                pieces = [
+                    part
+                    for piece in pieces
+                    for part in (_pack(piece.split(), max_chars) if len(piece) > max_chars else [piece])
+                ]
+            segments.extend(Segment(piece, index) for piece in pieces)
+    return segments
+
+
+def pack_segments(segments: list[Segment], max_chars: int) -> list[Segment]:
+    """Join consecutive segments of the same paragraph into chunks of at
+    most *max_chars* characters, so chunks still end on sentence boundaries.
+    """
+    packed: list[Segment] = []
+    for segment in segments:
+        last = packed[-1] if packed else None
+        if (
+            last is not None
+            and last.paragraph == segment.paragraph
+            and len(last.text) + 1 + len(segment.text) <= max_chars
+        ):
+            last.text += " " + segment.text
+        else:
+            packed.append(Segment(segment.text, segment.paragraph))
+    return packed
+
+
+class SegmentedModel(WrappedModel):
+    """Incremental synthesis: cache audio per sentence, not per script.
+
+    When a request is incremental (``request.extra["incremental"]``, else
+    *default*), the text is split into sentence/clause segments. Each
+    segment's audio is cached under (model name, voice, speed, language,
+    segment text), and only segments missing from the cache are
+    synthesised, together, through ``inner.generate_batch``. Editing one
+    sentence of a script therefore costs about one sentence of inference.
+
+    Segments are trimmed of leading/trailing silence and joined with fixed
+    pauses (*pause* seconds within a paragraph, *paragraph_pause* between
+    paragraphs), so the rhythm does not depend on which segments came
+    from the cache.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        inner: TTSModel,
+        cache: SynthesisCache,
+        max_chars: int = 300,
+        pause: float = 0.25,
+        paragraph_pause: float = 0.5,
+        default: bool = False,
+    ) -> None:
+        super().__init__(inner)
+        self.name = name
+        self.cache = cache
+        self.max_chars = max(1, max_chars)
+        self.pause = pause
+        self.paragraph_pause = paragraph_pause
+        self.default = default
+        self._lock = threading.Lock()
+        self.segments_reused = 0
+        self.segments_synthesised = 0
+
+    def _incremental(self, request: TTSRequest) -> bool:
+        flag = request.extra.get("incremental")
+        return self.default if flag is None else bool(flag)
+
+    def segment_key(self, request: TTSRequest, text: str) -> str:
+        parts = [self.name, "segment", request.voice, request.speed, request.language, text]
+        if request.extra.get("phonemes"):
+            parts.append("phonemes")
+        return make_key(*parts)
+
+    def _segment_request(self, request: TTSRequest, text: str) -> TTSRequest:
+        extra = {k: v for k, v in request.extra.items() if k not in ("cache", "incremental")}
+        return TTSRequest(
+            text=text,
+            voice=request.voice,
+            speed=request.speed,
+            language=request.language,
+            extra=extra,
+        )
+
+    def _pauses(self, segments: list[Segment]) -> list[float]:
+        return [
+            self.paragraph_pause if nxt.paragraph != cur.paragraph else self.pause
+            for cur, nxt in zip(segments, segments[1:])
+        ]
+
+    def _segment_audio(self, request: TTSRequest, texts: list[str]) -> list[np.ndarray]:
+        """Return trimmed audio for each of *texts*, synthesising only cache misses."""
+        bypass = request.extra.get("cache") is False
+        audio: dict[str, np.ndarray] = {}
+        missing: list[str] = []
+        for text in dict.fromkeys(texts):
+            cached = self.cache.lookup(self.segment_key(request, text), bypass=bypass)
+            if cached is None:
+                missing.append(text)
+            else:
+                audio[text] = decode_wav(cached)[0]
+
+        if missing:
+            results = self.inner.generate_batch([self._segment_request(request, t) for t in missing])
+            for text, result in zip(missing, results):
+                if isinstance(result, Exception):
+                    raise result
+                if not bypass:
+                    self.cache.put(self.segment_key(request, text), result)
+                audio[text] = decode_wav(result)[0]
+
+        with self._lock:
+            self.segments_reused += len(texts) - len(missing)
+            self.segments_synthesised += len(missing)
+        return [trim_silence(audio[text], self.SAMPLE_RATE) for text in texts]
+
+    def generate(self, request: TTSRequest) -> bytes:
+        if not self._incremental(request):
+            return self.inner.generate(request)
+
+        segments = split_segments(request.text, self.max_chars)
+        if not segments:
+            raise RuntimeError("No text to synthesise.")
+        audio = self._segment_audio(request, [s.text for s in segments])
+        with stage("stitch", request.extra.get("profile")):
+            combined = stitch(audio, self._pauses(segments), self.SAMPLE_RATE)
+            return encode_wav(combined, self.SAMPLE_RATE)
+
+    def generate_stream(self, request: TTSRequest) -> Iterator[np.ndarray]:
+        if not self._incremental(request):
+            yield from self.inner.generate_stream(request)
+            return
+
+        segments = split_segments(request.text, self.max_chars)
+        if not segments:
+            raise RuntimeError("No text to synthesise.")
+        pauses = self._pauses(segments) + [0.0]
+        for segment, pause in zip(segments, pauses):
+            yield self._segment_audio(request, [segment.text])[0]
+            if pause:
+                yield silence(pause, self.SAMPLE_RATE)
+
+    def generate_batch(self, requests: list[TTSRequest]) -> list[bytes | Exception]:
+        # Route through `generate` so incremental requests are segmented
+        return TTSModel.generate_batch(self, requests)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.segments_reused + self.segments_synthesised
+            return {
+                "segments_reused": self.segments_reused,
+                "segments_synthesised": self.segments_synthesised,
+                "reuse_rate": self.segments_reused / total if total else 0.0,
+            }
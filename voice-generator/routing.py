@@ -0,0 +1,191 @@
+"""Quality tiers and load shedding.
+
+Every synthesis request has a quality:
+
+- ``high`` is always served by the requested (primary) model.
+- ``draft`` is always served by the cheap fallback model (``FALLBACK_MODEL``).
+- ``auto`` is served by the primary model unless it is overloaded, in which
+  case it is degraded to the fallback model instead of queueing.
+
+The primary model counts as overloaded while at least
+``DEGRADE_QUEUE_DEPTH`` requests are queued for it, or while the p90 time
+requests recently waited for a synthesis slot is at least
+``DEGRADE_WAIT_MS``. Fallback requests bypass that queue, so degrading
+``auto`` requests relieves the primary model until it catches up.
+
+Responses report the tier that served them (``X-TTS-Tier``), so workflows
+can re-render drafts in high quality later.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+QUALITIES = ("high", "auto", "draft")
+
+
+@dataclass
+class Route:
+    """Where a request is served: *model* at *tier* ("high" or "fallback").
+
+    *reason* says why a request runs on the fallback tier: ``"requested"``,
+    ``"queue_depth"`` or ``"wait"``; None on the high tier.
+    """
+    model: str
+    tier: str
+    reason: Optional[str] = None
+
+
+def _queued(model: str) -> int:
+    """Requests waiting for *model*: the admission queues if admission
+    control is on, otherwise the worker pool's backlog."""
+    import config  # local import to avoid circular dependency at module level
+
+    if config.ADMISSION_ENABLED:
+        from admission import get_admission  # noqa: PLC0415
+        return sum(get_admission().queue_depths().values())
+
+    from inference import ProcessPoolModel  # noqa: PLC0415
+    from models import find_layer, loaded_models  # noqa: PLC0415
+
+    instance = loaded_models().get(model)
+    pool = find_layer(instance, ProcessPoolModel) if instance is not None else None
+    return pool.queue_depth if pool is not None else 0
+
+
+def _fallback_available(model: str) -> bool:
+    from models import get_model  # noqa: PLC0415
+
+    try:
+        get_model(model).preload([])
+    except Exception as exc:
+        logger.warning("Fallback model '%s' is unavailable; not degrading requests: %s", model, exc)
+        return False
+    return True
+
+
+class TierRouter:
+    """Pick the tier and model for each request from its quality and the
+    primary model's load."""
+
+    def __init__(
+        self,
+        fallback_model: str,
+        max_queue_depth: int = 0,
+        max_wait: float = 0.0,
+        window: float = 30.0,
+        queue_depth: Callable[[str], int] = _queued,
+        fallback_available: Callable[[str], bool] = _fallback_available,
+    ) -> None:
+        self.fallback_model = fallback_model
+        self.max_queue_depth = max_queue_depth
+        self.max_wait = max_wait
+        self.window = window
+        self._queue_depth = queue_depth
+        self._fallback_available = fallback_available
+        self._available: Optional[bool] = None
+        self._lock = threading.Lock()
+        # (monotonic time, seconds waited) for recent high-tier requests
+        self._waits: deque[tuple[float, float]] = deque()
+        self._served: dict[tuple[str, str], int] = {}
+
+    # ------------------------------------------------------------------
+
+    def observe_wait(self, seconds: float) -> None:
+        """Record how long a high-tier request waited for a synthesis slot."""
+        with self._lock:
+            self._waits.append((time.monotonic(), seconds))
+            self._prune()
+
+    def _prune(self) -> None:
+        """Must be called with the lock held."""
+        cutoff = time.monotonic() - self.window
+        while self._waits and self._waits[0][0] < cutoff:
+            self._waits.popleft()
+
+    def recent_wait(self) -> float:
+        """p90 slot wait over the last ``window`` seconds (0 without samples)."""
+        with self._lock:
+            self._prune()
+            if not self._waits:
+                return 0.0
+            return float(np.percentile([w for _t, w in self._waits], 90))
+
+    def overload(self, model: str) -> Optional[str]:
+        """Return why *model* counts as overloaded, or None if it does not."""
+        if self.max_queue_depth > 0 and self._queue_depth(model) >= self.max_queue_depth:
+            return "queue_depth"
+        if self.max_wait > 0 and self.recent_wait() >= self.max_wait:
+            return "wait"
+        return None
+
+    def _can_degrade(self) -> bool:
+        if self._available is None:
+            self._available = self._fallback_available(self.fallback_model)
+        return self._available
+
+    def route(self, model: str, quality: str, phonemes: bool = False) -> Route:
+        """Return the route for a request for *model* at *quality*.
+
+        Pre-phonemized input is model-specific and never degraded; neither
+        is anything when the fallback model cannot run here.
+        """
+        if quality not in QUALITIES:
+            raise ValueError(f"Unknown quality '{quality}'. Expected one of {list(QUALITIES)}")
+        if model == self.fallback_model:
+            route = Route(model, "fallback", "requested")
+        elif quality == "high" or phonemes or not self._can_degrade():
+            route = Route(model, "high")
+        elif quality == "draft":
+            route = Route(self.fallback_model, "fallback", "requested")
+        else:
+            reason = self.overload(model)
+            route = Route(self.fallback_model, "fallback", reason) if reason else Route(model, "high")
+        with self._lock:
+            key = (route.tier, route.reason or "")
+            self._served[key] = self._served.get(key, 0) + 1
+        return route
+
+    def served(self) -> dict[tuple[str, str], int]:
+        """Requests routed so far, keyed by (tier, reason)."""
+        with self._lock:
+            return dict(self._served)
+
+    def snapshot(self) -> dict:
+        return {
+            "fallback_model": self.fallback_model,
+            "fallback_available": self._available,
+            "max_queue_depth": self.max_queue_depth,
+            "max_wait_s": self.max_wait,
+            "recent_wait_p90_s": round(self.recent_wait(), 4),
+            "served": [
+                {"tier": tier, "reason": reason or None, "count": count}
+                for (tier, reason), count in sorted(self.served().items())
+            ],
+        }
+
+
+_ROUTER: Optional[TierRouter] = None
+_ROUTER_LOCK = threading.Lock()
+
+
+def get_router() -> TierRouter:
+    """Return the process-wide tier router, built from config on first use."""
+    import config  # local import to avoid circular dependency at module level
+
+    global _ROUTER
+    with _ROUTER_LOCK:
+        if _ROUTER is None:
+            _ROUTER = TierRouter(
+                fallback_model=config.FALLBACK_MODEL,
+                max_queue_depth=config.DEGRADE_QUEUE_DEPTH,
+                max_wait=config.DEGRADE_WAIT_MS / 1000.0,
+                window=config.DEGRADE_WINDOW_S,
+            )
+    return _ROUTER
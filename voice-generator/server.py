@@ -3,33 +3,266 @@
 Routes
 ------
 GET  /health              — liveness probe
+GET  /ready               — readiness probe: 503 until warmup has finished
 GET  /models              — list registered TTS models
+GET  /cache/stats         — synthesis and G2P cache hit/miss counters
+GET  /scheduler/stats     — parallel synthesis, inference worker, admission
+                            and routing status
+GET  /metrics             — Prometheus metrics (latency, RTF, queue depth, cache, RSS)
+POST /phonemize           — text → phonemes, for reuse as /generate input
 POST /generate            — synthesise and stream WAV bytes directly
+                            (incrementally, chunk by chunk, with ``stream=true``)
 POST /generate/save       — synthesise, persist to a storage backend, return metadata
+POST /generate/batch      — synthesise and persist many scripts (e.g. a whole deck),
+                            return a per-item manifest
+GET  /uploads/{upload_id} — status of a background (async_upload) upload
+
+Send ``X-Profile: 1`` with any request to get a per-stage timing breakdown
+(G2P, inference, encode, storage, ...) back in the ``Server-Timing`` header.
+
+Synthesis requests pass admission control: ``interactive`` requests (the
+default for /generate) are served ahead of ``bulk`` ones (the default for
+/generate/save and /generate/batch). When a queue is full the request is
+rejected with 429, and with 503 if no slot frees up in time; both carry
+``Retry-After``. A request whose client disconnects, or whose
+``deadline_ms`` passes (504), is abandoned between chunks.
+
+Requests with ``quality="auto"`` fall back to a cheap model (espeak-ng)
+while the primary model is overloaded, and ``quality="draft"`` always uses
+it. The tier that served a request is reported in the ``X-TTS-Tier`` header
+(and in the ``tier`` field of save and batch results).
 """
-import io
+import time
+
+# Taken before the remaining imports so startup time covers them
+_IMPORT_STARTED = time.perf_counter()
+
+import asyncio
+import contextvars
+import threading
 import uuid
 import logging
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from typing import Iterator, Literal, Optional
 
 import uvicorn
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse, JSONResponse
 from pydantic import BaseModel, Field
+from starlette.background import BackgroundTask
 
 import config
-from models import get_model
-from models.base import TTSRequest
-from storage import get_storage
+import metrics
+from admission import Rejected, Slot, get_admission
+from audio import (
+    OutputFormat,
+    available_formats,
+    can_encode_incrementally,
+    get_format,
+    open_encoder,
+    output_rate,
+    resample_stream,
+    to_pcm16,
+    transcode,
+    wav_duration,
+    wav_header,
+)
+from models import find_layer, get_model, loaded_models
+from models.base import DeadlineExceeded, SynthesisCancelled, TTSModel, TTSRequest
+from routing import Route, get_router
+from storage import AudioStorage, UploadQueueFull, get_storage, get_uploader
 from storage.base import SaveResult
+from warmup import WarmupState
 
 logging.basicConfig(level=config.LOG_LEVEL.upper())
 logger = logging.getLogger(__name__)
 
+
+WARMUP = WarmupState()
+_STARTUP_SECONDS: Optional[float] = None
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """Start serving as soon as possible and warm the models in the background.
+
+    Heavy imports (kokoro, torch, boto3) are deferred to first use, so
+    /health answers right away. The warmup thread then builds the configured
+    models, language pipelines and voices and runs a dummy synthesis; /ready
+    reports 503 until it has finished.
+    """
+    global _STARTUP_SECONDS
+
+    if config.INFERENCE_WORKERS > 0:
+        # Fork the workers now, before request handler threads exist.
+        for name in config.WARMUP_MODELS or [config.DEFAULT_MODEL]:
+            try:
+                get_model(name)
+            except Exception:
+                # Warmup hits the same error and reports it via /ready
+                logger.exception("Failed to build model '%s'", name)
+
+    _STARTUP_SECONDS = time.perf_counter() - _IMPORT_STARTED
+    logger.info("Startup took %.2fs", _STARTUP_SECONDS)
+
+    if config.WARMUP_ENABLED:
+        logger.info(
+            "Warming up models %s (languages %s, voices %s)",
+            config.WARMUP_MODELS, config.WARMUP_LANGUAGES, config.WARMUP_VOICES,
+        )
+        WARMUP.start(config.WARMUP_MODELS, config.WARMUP_LANGUAGES, config.WARMUP_VOICES, config.WARMUP_TEXT)
+    else:
+        WARMUP.mark_ready()
+    yield
+
+    from inference import ProcessPoolModel  # noqa: PLC0415
+    for model in loaded_models().values():
+        pool = find_layer(model, ProcessPoolModel)
+        if pool is not None:
+            pool.close()
+
+
 app = FastAPI(
     title="Voice Generator Service",
     description="Text-to-speech microservice with pluggable models and storage backends.",
     version="1.0.0",
+    lifespan=lifespan,
+)
+
+
+@app.middleware("http")
+async def observe_request(request: Request, call_next):
+    """Record request latency and, when asked via ``X-Profile``, return the
+    request's stage breakdown as a ``Server-Timing`` header.
+
+    For ``stream=true`` responses the breakdown only covers the work done
+    before the first chunk was sent.
+    """
+    profile = None
+    if request.headers.get("x-profile", "").lower() in ("1", "true", "yes"):
+        profile = metrics.Profile()
+    token = metrics.set_profile(profile)
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        metrics.reset_profile(token)
+    elapsed = time.perf_counter() - start
+
+    route = request.scope.get("route")
+    route_path = getattr(route, "path", "unmatched")
+    metrics.REQUEST_LATENCY.observe(elapsed, request.method, route_path, str(response.status_code))
+
+    if profile is not None:
+        profile.add("total", elapsed)
+        response.headers["Server-Timing"] = profile.server_timing()
+    return response
+
+
+def _queue_depths() -> dict[tuple[str, ...], float]:
+    from inference import ProcessPoolModel  # noqa: PLC0415
+
+    depths = {}
+    for name, model in loaded_models().items():
+        pool = find_layer(model, ProcessPoolModel)
+        if pool is not None:
+            depths[("worker_pool", name)] = pool.queue_depth
+    depths[("upload", "")] = get_uploader().queue_depth
+    if config.ADMISSION_ENABLED:
+        for priority, depth in get_admission().queue_depths().items():
+            depths[(f"admission_{priority}", "")] = depth
+    return depths
+
+
+def _cache_counters() -> dict[tuple[str, ...], float]:
+    if not config.CACHE_ENABLED:
+        return {}
+    from cache import get_synthesis_cache  # noqa: PLC0415
+    stats = get_synthesis_cache().stats
+    return {
+        ("memory_hit",): stats.memory_hits,
+        ("disk_hit",): stats.disk_hits,
+        ("coalesced",): stats.coalesced,
+        ("miss",): stats.misses,
+        ("bypass",): stats.bypassed,
+    }
+
+
+def _g2p_stats() -> dict[str, dict]:
+    stats = {}
+    for name, model in loaded_models().items():
+        entry = model.g2p_cache_stats()
+        if entry is not None:
+            stats[name] = entry
+    return stats
+
+
+def _g2p_counters() -> dict[tuple[str, ...], float]:
+    samples = {}
+    for name, entry in _g2p_stats().items():
+        samples[(name, "hit")] = entry["hits"]
+        samples[(name, "miss")] = entry["misses"]
+    return samples
+
+
+def _segment_stats() -> dict[str, dict]:
+    from models.segmented import SegmentedModel  # noqa: PLC0415
+
+    stats = {}
+    for name, model in loaded_models().items():
+        layer = find_layer(model, SegmentedModel)
+        if layer is not None:
+            stats[name] = layer.stats()
+    return stats
+
+
+def _segment_counters() -> dict[tuple[str, ...], float]:
+    samples = {}
+    for name, entry in _segment_stats().items():
+        samples[(name, "reused")] = entry["segments_reused"]
+        samples[(name, "synthesised")] = entry["segments_synthesised"]
+    return samples
+
+
+def _cache_hit_rate() -> dict[tuple[str, ...], float]:
+    if not config.CACHE_ENABLED:
+        return {}
+    from cache import get_synthesis_cache  # noqa: PLC0415
+    return {(): get_synthesis_cache().stats.as_dict()["hit_rate"]}
+
+
+metrics.CallbackMetric(
+    "tts_queue_depth", "Requests waiting in each queue.", _queue_depths, labels=("queue", "model")
+)
+metrics.CallbackMetric(
+    "tts_cache_lookups_total", "Synthesis cache lookups by outcome.", _cache_counters,
+    labels=("result",), kind="counter",
+)
+metrics.CallbackMetric(
+    "tts_g2p_cache_lookups_total", "Grapheme-to-phoneme cache lookups by outcome.", _g2p_counters,
+    labels=("model", "result"), kind="counter",
+)
+metrics.CallbackMetric(
+    "tts_incremental_segments_total", "Incremental synthesis segments by outcome.", _segment_counters,
+    labels=("model", "result"), kind="counter",
+)
+metrics.CallbackMetric(
+    "tts_startup_seconds", "Seconds from server import until the app accepted requests.",
+    lambda: {} if _STARTUP_SECONDS is None else {(): _STARTUP_SECONDS},
+)
+metrics.CallbackMetric(
+    "tts_warmup_seconds", "Duration of the startup warmup phase.",
+    lambda: {} if WARMUP.seconds is None else {(): WARMUP.seconds},
+)
+metrics.CallbackMetric("tts_ready", "1 once warmup has finished successfully.", lambda: {(): float(WARMUP.ready)})
+metrics.CallbackMetric(
+    "tts_tier_requests_total", "Requests routed to each quality tier, by degradation reason.",
+    lambda: {key: float(count) for key, count in get_router().served().items()},
+    labels=("tier", "reason"), kind="counter",
+)
+metrics.CallbackMetric(
+    "tts_cache_hit_ratio", "Fraction of synthesis cache lookups served without synthesis.", _cache_hit_rate
 )
 
 
@@ -38,7 +271,14 @@ app = FastAPI(
 # ---------------------------------------------------------------------------
 
 class GenerateRequest(BaseModel):
-    text: str = Field(..., description="Text to synthesise.")
+    text: str = Field(..., description="Text to synthesise (or phonemes, with phonemes=true).")
+    phonemes: bool = Field(
+        False,
+        description=(
+            "Treat text as pre-phonemized input, e.g. the 'phonemes' field returned "
+            "by /phonemize. Skips grapheme-to-phoneme conversion."
+        ),
+    )
     model: str = Field(config.DEFAULT_MODEL, description="TTS model name (e.g. 'kokoro').")
     voice: str = Field(config.DEFAULT_VOICE, description="Voice identifier (model-specific).")
     speed: float = Field(config.DEFAULT_SPEED, ge=0.1, le=4.0, description="Speech rate multiplier.")
@@ -46,14 +286,86 @@ class GenerateRequest(BaseModel):
         config.DEFAULT_LANGUAGE,
         description="Language/dialect code (model-specific, e.g. 'a' = American English for Kokoro).",
     )
+    cache: bool = Field(
+        True,
+        description="Serve identical requests from the synthesis cache. Set to false to force re-synthesis.",
+    )
+    incremental: Optional[bool] = Field(
+        None,
+        description=(
+            "Synthesise and cache audio sentence by sentence, so re-submitting an "
+            "edited script only synthesises the changed sentences. Requires the "
+            "synthesis cache. Defaults to INCREMENTAL_DEFAULT."
+        ),
+    )
+    format: str = Field(
+        config.DEFAULT_FORMAT,
+        description="Output format: 'wav' (16-bit PCM), 'flac', 'ogg' (Vorbis), 'opus' or 'mp3'.",
+    )
+    sample_rate: Optional[int] = Field(
+        None,
+        ge=8_000,
+        le=48_000,
+        description=(
+            "Output sample rate in Hz. Defaults to the model's native rate, or the nearest rate "
+            "the format accepts (Opus: 8000, 12000, 16000, 24000 or 48000)."
+        ),
+    )
+    priority: Optional[Literal["interactive", "bulk"]] = Field(
+        None,
+        description=(
+            "Scheduling class. Defaults to 'interactive' for /generate and 'bulk' "
+            "for /generate/save and /generate/batch."
+        ),
+    )
+    deadline_ms: Optional[int] = Field(
+        None,
+        ge=1,
+        description="Give up (504) if synthesis has not finished within this many milliseconds.",
+    )
+    quality: Optional[Literal["high", "auto", "draft"]] = Field(
+        None,
+        description=(
+            "'high' always uses the requested model, 'draft' the fast fallback model, "
+            "and 'auto' the requested model unless it is overloaded. Defaults to "
+            "QUALITY_DEFAULT. The X-TTS-Tier response header says which tier served it."
+        ),
+    )
+
+
+class StreamRequest(GenerateRequest):
+    stream: bool = Field(
+        False,
+        description=(
+            "Send the WAV header immediately and flush PCM for each chunk as "
+            "soon as it is synthesised. The header carries a streaming "
+            "placeholder length. Only supported for format='wav'."
+        ),
+    )
 
 
 class SaveRequest(GenerateRequest):
-    storage: str = Field("local", description="Storage backend: 'local' or 's3'.")
+    storage: str = Field("local", description="Storage backend: 'local', 's3' or 'memory' (benchmarks).")
     filename: Optional[str] = Field(
         None,
         description="Output filename. Auto-generated UUID if omitted.",
     )
+    async_upload: bool = Field(
+        False,
+        description=(
+            "Return the location/URL immediately and upload in the background. "
+            "Poll GET /uploads/{upload_id} for completion."
+        ),
+    )
+    long_form: Optional[bool] = Field(
+        None,
+        description=(
+            "Encode and write audio to storage chunk by chunk with constant memory "
+            "(bypasses the cache and async_upload). Defaults to true for texts of at "
+            "least LONG_FORM_MIN_CHARS characters, in formats that can be encoded "
+            "incrementally on this host."
+        ),
+    )
 
 
 class SaveResponse(BaseModel):
@@ -62,33 +374,389 @@ class SaveResponse(BaseModel):
     content_type: str
     backend: str
     filename: str
+    upload_id: Optional[str] = None
+    duration: Optional[float] = None
+    model: Optional[str] = None
+    tier: Optional[Literal["high", "fallback"]] = None
+
+
+class BatchItem(BaseModel):
+    """One script in a batch; unset fields fall back to the batch defaults."""
+    text: str = Field(..., description="Text to synthesise.")
+    phonemes: Optional[bool] = Field(None, description="Treat text as pre-phonemized input.")
+    incremental: Optional[bool] = Field(None, description="Reuse cached audio for unchanged sentences.")
+    quality: Optional[Literal["high", "auto", "draft"]] = Field(None, description="See /generate.")
+    filename: Optional[str] = Field(None, description="Output filename. Auto-generated UUID if omitted.")
+    model: Optional[str] = None
+    voice: Optional[str] = None
+    speed: Optional[float] = Field(None, ge=0.1, le=4.0)
+    language: Optional[str] = None
+    format: Optional[str] = None
+    sample_rate: Optional[int] = Field(None, ge=8_000, le=48_000)
+
+
+class BatchRequest(BaseModel):
+    items: list[BatchItem] = Field(
+        ...,
+        min_length=1,
+        max_length=config.BATCH_REQUEST_MAX_ITEMS,
+        description="Scripts to synthesise, e.g. one per slide.",
+    )
+    model: str = Field(config.DEFAULT_MODEL, description="Default TTS model name.")
+    voice: str = Field(config.DEFAULT_VOICE, description="Default voice identifier.")
+    speed: float = Field(config.DEFAULT_SPEED, ge=0.1, le=4.0, description="Default speech rate multiplier.")
+    language: str = Field(config.DEFAULT_LANGUAGE, description="Default language/dialect code.")
+    format: str = Field(config.DEFAULT_FORMAT, description="Default output format.")
+    sample_rate: Optional[int] = Field(None, ge=8_000, le=48_000, description="Default output sample rate.")
+    cache: bool = Field(True, description="Serve identical scripts from the synthesis cache.")
+    storage: str = Field("local", description="Storage backend: 'local', 's3' or 'memory' (benchmarks).")
+    async_upload: bool = Field(False, description="Upload in the background (see /generate/save).")
+    quality: Optional[Literal["high", "auto", "draft"]] = Field(
+        None, description="Default quality (see /generate)."
+    )
+
+
+class PhonemizeRequest(BaseModel):
+    text: str = Field(..., description="Text to convert to phonemes.")
+    model: str = Field(config.DEFAULT_MODEL, description="TTS model name (e.g. 'kokoro').")
+    language: str = Field(config.DEFAULT_LANGUAGE, description="Language/dialect code (model-specific).")
+
+
+class PhonemeSegment(BaseModel):
+    text: str
+    phonemes: str
+    paragraph: int
+
+
+class PhonemizeResponse(BaseModel):
+    model: str
+    language: str
+    phonemes: str = Field(..., description="Pass as text with phonemes=true to /generate.")
+    segments: list[PhonemeSegment]
+
+
+class BatchItemResult(BaseModel):
+    index: int
+    status: Literal["ok", "error"]
+    filename: Optional[str] = None
+    location: Optional[str] = None
+    url: Optional[str] = None
+    content_type: Optional[str] = None
+    duration: Optional[float] = None
+    upload_id: Optional[str] = None
+    model: Optional[str] = None
+    tier: Optional[Literal["high", "fallback"]] = None
+    error: Optional[str] = None
+
+
+class BatchResponse(BaseModel):
+    items: list[BatchItemResult]
+    succeeded: int
+    failed: int
 
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
+# Set per request by `_cancel_on_disconnect` and read by `_build_tts_request`
+_CANCEL: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar(
+    "tts_cancel", default=None
+)
+# Set per request by `_cancel_on_disconnect`; a streamed body sets the event
+# once it has sent everything, after which a disconnect is the normal end
+_FINISHED: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar(
+    "tts_finished", default=None
+)
+# Cleared for batch items: the batch endpoint already limits their concurrency
+_ADMISSION_BOUNDED: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "tts_admission_bounded", default=True
+)
+
+ADMISSION_REJECTIONS = metrics.Counter(
+    "tts_admission_rejections_total", "Requests rejected by admission control.", labels=("priority", "status")
+)
+
+
+async def _cancel_on_disconnect(request: Request):
+    """Dependency: set the request's cancel flag if the client disconnects
+    before the handler (or the body it streams) has finished."""
+    cancel = threading.Event()
+    finished = threading.Event()
+    _CANCEL.set(cancel)
+    _FINISHED.set(finished)
+
+    async def watch() -> None:
+        # The body has been read, so the next message is the disconnect
+        while (await request.receive())["type"] != "http.disconnect":
+            pass
+        if finished.is_set():
+            return  # the response was complete
+        logger.info("Client disconnected; cancelling %s", request.url.path)
+        cancel.set()
+
+    watcher = asyncio.create_task(watch())
+    try:
+        yield cancel
+    finally:
+        finished.set()
+        watcher.cancel()
+
+
+def _priority(req: GenerateRequest) -> str:
+    if req.priority is not None:
+        return req.priority
+    return "bulk" if isinstance(req, SaveRequest) else "interactive"
+
+
+def _route(req: GenerateRequest) -> Route:
+    """Pick the tier for *req* and point ``req.model`` at the model serving it."""
+    route = get_router().route(req.model, req.quality or config.QUALITY_DEFAULT, req.phonemes)
+    req.model = route.model
+    return route
+
+
+def _tier_headers(route: Route) -> dict[str, str]:
+    headers = {"X-TTS-Tier": route.tier, "X-TTS-Model": route.model}
+    if route.reason is not None:
+        headers["X-TTS-Tier-Reason"] = route.reason
+    return headers
+
+
 def _build_tts_request(req: GenerateRequest) -> TTSRequest:
+    extra = {"cache": req.cache, "priority": _priority(req)}
+    if req.phonemes:
+        extra["phonemes"] = True
+    extra["incremental"] = config.INCREMENTAL_DEFAULT if req.incremental is None else req.incremental
+    if req.deadline_ms is not None:
+        extra["deadline"] = time.time() + req.deadline_ms / 1000.0
+    cancel = _CANCEL.get()
+    if cancel is not None:
+        extra["cancel"] = cancel
+    profile = metrics.current_profile()
+    if profile is not None:
+        # Carried explicitly so stages that run on other threads (parallel
+        # chunks, worker pool readers) are attributed to this request too.
+        extra["profile"] = profile
     return TTSRequest(
         text=req.text,
         voice=req.voice,
         speed=req.speed,
         language=req.language,
+        extra=extra,
     )
 
 
+def _resolve_model(req: GenerateRequest) -> TTSModel:
+    """Return the model for *req*, or raise 400 if it cannot serve it."""
+    try:
+        model = get_model(req.model)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if req.phonemes and not model.SUPPORTS_PHONEMES:
+        raise HTTPException(status_code=400, detail=f"Model '{req.model}' does not accept phoneme input")
+    return model
+
+
+def _synthesis_error(exc: Exception, what: str = "TTS generation") -> HTTPException:
+    """Map a synthesis failure to an HTTPException. Call from an except block."""
+    if isinstance(exc, DeadlineExceeded):
+        return HTTPException(status_code=504, detail=str(exc))
+    if isinstance(exc, SynthesisCancelled):
+        # The client has gone; 499 (client closed request) keeps these out of the 5xx rate
+        return HTTPException(status_code=499, detail=str(exc))
+    logger.exception("%s failed", what)
+    return HTTPException(status_code=500, detail=f"{what} failed: {exc}")
+
+
+def _admit(tts_request: TTSRequest, model: TTSModel) -> Optional[Slot]:
+    """Wait for a synthesis slot, or raise 429/503 with Retry-After.
+
+    Lightweight (fallback tier) models are not admission-controlled.
+    """
+    if not config.ADMISSION_ENABLED or model.LIGHTWEIGHT:
+        return None
+    priority = tts_request.extra["priority"]
+    start = time.perf_counter()
+    try:
+        with metrics.stage("admission"):
+            slot = get_admission().acquire(
+                priority,
+                deadline=tts_request.extra.get("deadline"),
+                cancel=tts_request.extra.get("cancel"),
+                bounded=_ADMISSION_BOUNDED.get(),
+            )
+        get_router().observe_wait(time.perf_counter() - start)
+        return slot
+    except Rejected as exc:
+        get_router().observe_wait(time.perf_counter() - start)
+        ADMISSION_REJECTIONS.inc(1, priority, str(exc.status_code))
+        raise HTTPException(
+            status_code=exc.status_code, detail=exc.detail, headers={"Retry-After": str(exc.retry_after)}
+        )
+    except SynthesisCancelled as exc:
+        raise _synthesis_error(exc)
+
+
+@contextmanager
+def _admitted(tts_request: TTSRequest, model: TTSModel) -> Iterator[None]:
+    slot = _admit(tts_request, model)
+    try:
+        yield
+    finally:
+        if slot is not None:
+            slot.release()
+
+
 def _synthesise(req: GenerateRequest) -> bytes:
     """Run TTS synthesis and return raw WAV bytes."""
+    model = _resolve_model(req)
+    tts_request = _build_tts_request(req)
+
+    with _admitted(tts_request, model):
+        try:
+            with metrics.stage("synthesise"):
+                return model.generate(tts_request)
+        except Exception as exc:
+            raise _synthesis_error(exc)
+
+
+def _output_format(req: GenerateRequest) -> OutputFormat:
     try:
-        model = get_model(req.model)
+        return get_format(req.format, req.sample_rate)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
 
+
+def _render(req: GenerateRequest) -> tuple[bytes, OutputFormat, float]:
+    """Synthesise *req* and encode it in the requested output format.
+
+    Returns the encoded bytes, the format and the duration in seconds.
+    """
+    fmt = _output_format(req)
+    start = time.perf_counter()
+    wav_bytes = _synthesise(req)
+    elapsed = time.perf_counter() - start
+    try:
+        with metrics.stage("transcode"):
+            duration = wav_duration(wav_bytes)
+            encoded = transcode(wav_bytes, fmt, req.sample_rate)
+        metrics.observe_synthesis(req.model, len(req.text), duration, elapsed)
+        return encoded, fmt, duration
+    except Exception as exc:
+        logger.exception("Audio encoding failed")
+        raise HTTPException(status_code=500, detail=f"Audio encoding failed: {exc}")
+
+
+def _synthesise_stream(req: GenerateRequest) -> tuple[Iterator[bytes], Optional[Slot]]:
+    """Start streaming synthesis and return an iterator of WAV body bytes,
+    plus the admission slot it holds.
+
+    The first audio chunk is produced before returning so that model errors
+    still surface as a proper HTTP error instead of a truncated body. The
+    slot is released when the body finishes or is closed; the caller should
+    also release it once the response is done, in case the body never ran.
+    """
+    if _output_format(req).name != "wav":
+        raise HTTPException(status_code=400, detail="Streaming is only supported for format='wav'")
+
+    model = _resolve_model(req)
+    tts_request = _build_tts_request(req)
+
+    native_rate = model.SAMPLE_RATE
+    sample_rate = req.sample_rate or native_rate
+    finished = _FINISHED.get()
+    slot = _admit(tts_request, model)
+    start = time.perf_counter()
+    chunks = resample_stream(model.generate_stream(tts_request), native_rate, sample_rate)
     try:
-        return model.generate(_build_tts_request(req))
+        first = next(chunks)
+    except StopIteration:
+        if slot is not None:
+            slot.release()
+        raise HTTPException(status_code=500, detail="TTS generation produced no audio")
     except Exception as exc:
-        logger.exception("TTS generation failed")
-        raise HTTPException(status_code=500, detail=f"TTS generation failed: {exc}")
+        if slot is not None:
+            slot.release()
+        raise _synthesis_error(exc)
+
+    def body() -> Iterator[bytes]:
+        closed_early = False
+        try:
+            yield wav_header(sample_rate) + to_pcm16(first)
+            frames = len(first)
+            try:
+                for chunk in chunks:
+                    frames += len(chunk)
+                    yield to_pcm16(chunk)
+            except SynthesisCancelled:
+                return
+            except Exception:
+                # Headers are already sent; all we can do is end the body early.
+                logger.exception("TTS generation failed mid-stream")
+                return
+            metrics.observe_synthesis(
+                req.model, len(req.text), frames / sample_rate, time.perf_counter() - start
+            )
+        except GeneratorExit:
+            closed_early = True
+            raise
+        finally:
+            # Once the whole body is out, the disconnect that follows is the
+            # normal end of the response, not a reason to cancel
+            if finished is not None and not closed_early:
+                finished.set()
+            # Closing the generator early (client went away) stops synthesis
+            chunks.close()
+            if slot is not None:
+                slot.release()
+
+    return body(), slot
+
+
+def _save_long_form(
+    req: SaveRequest,
+    fmt: OutputFormat,
+    backend: AudioStorage,
+    filename: str,
+) -> tuple[SaveResult, float]:
+    """Stream synthesis straight into *backend* with constant memory.
+
+    Each chunk is resampled (continuously across chunks), encoded and
+    handed to the backend's writer as soon as it is produced, so the full
+    recording is never assembled in memory. The synthesis cache is bypassed for the same reason.
+
+    Returns the SaveResult and the duration in seconds.
+    """
+    model = _resolve_model(req)
+
+    tts_request = _build_tts_request(req)
+    tts_request.extra["cache"] = False
+    sample_rate = output_rate(fmt, model.SAMPLE_RATE, req.sample_rate)
+
+    with _admitted(tts_request, model):
+        try:
+            writer = backend.open_writer(filename, content_type=fmt.content_type)
+        except Exception as exc:
+            logger.exception("Storage save failed")
+            raise HTTPException(status_code=500, detail=f"Storage save failed: {exc}")
+
+        try:
+            start = time.perf_counter()
+            encoder = open_encoder(fmt, sample_rate, writer.write)
+            frames = 0
+            for chunk in resample_stream(model.generate_stream(tts_request), model.SAMPLE_RATE, sample_rate):
+                with metrics.stage("encode_write"):
+                    encoder.write(chunk)
+                frames += len(chunk)
+            with metrics.stage("storage"):
+                result = writer.close(header=encoder.finish())
+            duration = frames / sample_rate
+            metrics.observe_synthesis(req.model, len(req.text), duration, time.perf_counter() - start)
+            return result, duration
+        except Exception as exc:
+            writer.abort()
+            raise _synthesis_error(exc, "Long-form synthesis")
 
 
 # ---------------------------------------------------------------------------
@@ -101,64 +769,228 @@ def health() -> dict:
     return {"status": "ok"}
 
 
+@app.get("/ready", tags=["ops"])
+def ready():
+    """Readiness probe: 200 once warmup has finished, 503 while warming up
+    (or if warmup failed). Includes startup and per-step warmup timings."""
+    body = {
+        **WARMUP.snapshot(),
+        "startup_seconds": round(_STARTUP_SECONDS, 4) if _STARTUP_SECONDS is not None else None,
+    }
+    if not WARMUP.ready:
+        return JSONResponse(status_code=503, content=body)
+    return body
+
+
 @app.get("/models", tags=["ops"])
 def list_models() -> dict:
-    """Return registered TTS model names."""
+    """Return registered TTS model names and the locally encodable output formats."""
     from models import _REGISTRY  # noqa: PLC0415
-    return {"models": list(_REGISTRY.keys())}
+    return {"models": list(_REGISTRY.keys()), "formats": available_formats()}
+
+
+@app.get("/cache/stats", tags=["ops"])
+def cache_stats() -> dict:
+    """Return synthesis cache counters and occupancy, plus the per-model
+    grapheme-to-phoneme cache counters under ``g2p`` and incremental
+    segment reuse under ``segments``."""
+    stats: dict = {"enabled": config.CACHE_ENABLED}
+    if config.CACHE_ENABLED:
+        from cache import get_synthesis_cache  # noqa: PLC0415
+        stats.update(get_synthesis_cache().snapshot())
+    stats["g2p"] = _g2p_stats()
+    stats["segments"] = _segment_stats()
+    return stats
+
+
+@app.get("/scheduler/stats", tags=["ops"])
+def scheduler_stats() -> dict:
+    """Return per-model parallel long-text settings and inference worker
+    pool status, plus admission control occupancy per priority class and
+    quality tier routing."""
+    from inference import ParallelModel, ProcessPoolModel  # noqa: PLC0415
+
+    stats = {}
+    for name, model in loaded_models().items():
+        entry = {}
+        parallel = find_layer(model, ParallelModel)
+        if parallel is not None:
+            entry["parallel"] = parallel.stats()
+        pool = find_layer(model, ProcessPoolModel)
+        if pool is not None:
+            entry["pool"] = pool.stats()
+        stats[name] = entry
+    return {
+        "inference_workers": config.INFERENCE_WORKERS,
+        "admission": get_admission().snapshot() if config.ADMISSION_ENABLED else None,
+        "routing": get_router().snapshot(),
+        "models": stats,
+    }
+
+
+@app.get("/metrics", tags=["ops"], response_class=PlainTextResponse)
+def prometheus_metrics() -> PlainTextResponse:
+    """Prometheus scrape endpoint (text exposition format 0.0.4)."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.post("/phonemize", response_model=PhonemizeResponse, tags=["voice"])
+def phonemize(req: PhonemizeRequest):
+    """Convert text to the model's phoneme representation.
+
+    Upstream workflows can phonemize a script once and send the returned
+    ``phonemes`` to ``/generate`` (with ``phonemes=true``) as often as they
+    like. Results come from, and warm, the model's G2P cache.
+    """
+    try:
+        model = get_model(req.model)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if not model.SUPPORTS_PHONEMES:
+        raise HTTPException(status_code=400, detail=f"Model '{req.model}' does not support phonemization")
+
+    try:
+        with metrics.stage("g2p"):
+            paragraphs = model.phonemize(req.text, req.language)
+    except Exception as exc:
+        logger.exception("Phonemization failed")
+        raise HTTPException(status_code=500, detail=f"Phonemization failed: {exc}")
+
+    return PhonemizeResponse(
+        model=req.model,
+        language=req.language,
+        phonemes="\n".join(" ".join(ps for _text, ps in paragraph) for paragraph in paragraphs),
+        segments=[
+            PhonemeSegment(text=text, phonemes=ps, paragraph=index)
+            for index, paragraph in enumerate(paragraphs)
+            for text, ps in paragraph
+        ],
+    )
 
 
 @app.post(
     "/generate",
     tags=["voice"],
     response_class=StreamingResponse,
+    dependencies=[Depends(_cancel_on_disconnect)],
     responses={
         200: {
-            "content": {"audio/wav": {}},
-            "description": "WAV audio file streamed directly.",
+            "content": {
+                "audio/wav": {},
+                "audio/flac": {},
+                "audio/ogg": {},
+                "audio/mpeg": {},
+            },
+            "description": "Audio file in the requested format, streamed directly.",
         }
     },
 )
-def generate(req: GenerateRequest):
-    """Synthesise text and stream the resulting WAV file back to the caller.
+def generate(req: StreamRequest):
+    """Synthesise text and stream the resulting audio file back to the caller.
 
-    The response body is the raw WAV file; set ``Accept: audio/wav`` or simply
-    read the binary content.
+    The response body is the raw audio file in the requested ``format``
+    (WAV by default); simply read the binary content. With ``stream=true``
+    the first bytes arrive as soon as the first chunk (roughly the first
+    line) has been synthesised.
     """
-    wav_bytes = _synthesise(req)
+    route = _route(req)
+    if req.stream:
+        filename = f"{uuid.uuid4()}.wav"
+        body, slot = _synthesise_stream(req)
+        return StreamingResponse(
+            body,
+            media_type="audio/wav",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"', **_tier_headers(route)},
+            background=BackgroundTask(slot.release) if slot is not None else None,
+        )
 
-    filename = f"{uuid.uuid4()}.wav"
-    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    audio_bytes, fmt, _duration = _render(req)
 
-    return StreamingResponse(
-        io.BytesIO(wav_bytes),
-        media_type="audio/wav",
+    filename = f"{uuid.uuid4()}{fmt.extension}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"', **_tier_headers(route)}
+
+    # A plain Response: iterating a BytesIO would split the audio on newline
+    # bytes and send it as many tiny chunks
+    return Response(
+        content=audio_bytes,
+        media_type=fmt.content_type,
         headers=headers,
     )
 
 
-@app.post("/generate/save", response_model=SaveResponse, tags=["voice"])
+@app.post(
+    "/generate/save",
+    response_model=SaveResponse,
+    tags=["voice"],
+    dependencies=[Depends(_cancel_on_disconnect)],
+)
 def generate_and_save(req: SaveRequest):
-    """Synthesise text, persist the WAV to the chosen storage backend, and
+    """Synthesise text, persist the audio to the chosen storage backend, and
     return a JSON payload describing where the file was stored.
 
+    The stored file (and its extension and content type) follows the
+    requested ``format``.
+
     - ``storage="local"`` saves to the local filesystem (``LOCAL_OUTPUT_DIR``).
     - ``storage="s3"``   uploads to the configured S3 bucket and returns a
       pre-signed URL valid for ``S3_PRESIGN_TTL`` seconds.
+
+    With ``async_upload=true`` the response is returned before the upload
+    finishes and carries an ``upload_id``; a full upload queue yields 503.
+
+    Long scripts (``long_form``) are encoded and written incrementally —
+    appended to a local file, or sent as S3 multipart parts — so peak
+    memory does not grow with script length.
+
+    ``model`` and ``tier`` say which model served the request.
     """
-    wav_bytes = _synthesise(req)
+    route = _route(req)
+    fmt = _output_format(req)
 
-    filename = req.filename or f"{uuid.uuid4()}.wav"
-    if not filename.endswith(".wav"):
-        filename += ".wav"
+    filename = req.filename or f"{uuid.uuid4()}{fmt.extension}"
+    if not filename.endswith(fmt.extension):
+        filename += fmt.extension
 
     try:
         backend = get_storage(req.storage)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
 
+    long_form = req.long_form
+    if long_form is None:
+        # Formats only ffmpeg can encode fall back to the buffered path
+        long_form = len(req.text) >= config.LONG_FORM_MIN_CHARS and can_encode_incrementally(fmt)
+    elif long_form and not can_encode_incrementally(fmt):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Output format '{fmt.name}' cannot be written incrementally (long_form) on this host",
+        )
+
+    if long_form:
+        result, duration = _save_long_form(req, fmt, backend, filename)
+        return SaveResponse(
+            location=result.location,
+            url=result.url,
+            content_type=result.content_type,
+            backend=result.backend,
+            filename=filename,
+            duration=duration,
+            model=route.model,
+            tier=route.tier,
+        )
+
+    audio_bytes, fmt, duration = _render(req)
+
     try:
-        result: SaveResult = backend.save(wav_bytes, filename)
+        with metrics.stage("storage"):
+            if req.async_upload:
+                result: SaveResult = backend.save_async(
+                    audio_bytes, filename, get_uploader(), content_type=fmt.content_type
+                )
+            else:
+                result = backend.save(audio_bytes, filename, content_type=fmt.content_type)
+    except UploadQueueFull as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "1"})
     except Exception as exc:
         logger.exception("Storage save failed")
         raise HTTPException(status_code=500, detail=f"Storage save failed: {exc}")
@@ -169,9 +1001,75 @@ def generate_and_save(req: SaveRequest):
         content_type=result.content_type,
         backend=result.backend,
         filename=filename,
+        upload_id=result.upload_id,
+        duration=duration,
+        model=route.model,
+        tier=route.tier,
     )
 
 
+@app.post(
+    "/generate/batch",
+    response_model=BatchResponse,
+    tags=["voice"],
+    dependencies=[Depends(_cancel_on_disconnect)],
+)
+def generate_batch(req: BatchRequest):
+    """Synthesise and persist every item, e.g. one narration per slide.
+
+    Items run concurrently, up to ``BATCH_REQUEST_PARALLELISM`` at a time,
+    and each one goes through the same path as ``/generate/save``. A failing
+    item is reported in its manifest entry and does not fail the batch.
+    """
+    defaults = req.model_dump(exclude={"items"})
+
+    def run(index: int, item: BatchItem) -> BatchItemResult:
+        # Items queue for admission without the bulk queue limit; there are
+        # at most BATCH_REQUEST_PARALLELISM of them per batch
+        _ADMISSION_BOUNDED.set(False)
+        try:
+            save_req = SaveRequest(**{**defaults, **item.model_dump(exclude_none=True)})
+            saved = generate_and_save(save_req)
+        except HTTPException as exc:
+            return BatchItemResult(index=index, status="error", error=str(exc.detail))
+        except Exception as exc:
+            logger.exception("Batch item %d failed", index)
+            return BatchItemResult(index=index, status="error", error=str(exc))
+        return BatchItemResult(
+            index=index,
+            status="ok",
+            filename=saved.filename,
+            location=saved.location,
+            url=saved.url,
+            content_type=saved.content_type,
+            duration=saved.duration,
+            upload_id=saved.upload_id,
+            model=saved.model,
+            tier=saved.tier,
+        )
+
+    workers = min(len(req.items), config.BATCH_REQUEST_PARALLELISM)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts-batch") as pool:
+        # Copy the request context so items record into this request's profile
+        futures = [
+            pool.submit(contextvars.copy_context().run, run, index, item)
+            for index, item in enumerate(req.items)
+        ]
+        results = [future.result() for future in futures]
+
+    failed = sum(1 for r in results if r.status == "error")
+    return BatchResponse(items=results, succeeded=len(results) - failed, failed=failed)
+
+
+@app.get("/uploads/{upload_id}", tags=["voice"])
+def upload_status(upload_id: str) -> dict:
+    """Return the status of a background upload started with ``async_upload``."""
+    status = get_uploader().status(upload_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Unknown upload '{upload_id}'")
+    return status
+
+
 # ---------------------------------------------------------------------------
 # Entrypoint
 # ---------------------------------------------------------------------------
@@ -1,17 +1,40 @@
-from .base import AudioStorage, SaveResult
+import logging
+import threading
+from typing import Optional
+
+from .base import AudioStorage, AudioWriter, SaveResult
 from .local_storage import LocalStorage
+from .memory_storage import MemoryStorage
 from .s3_storage import S3Storage
+from .uploader import BackgroundUploader, UploadQueueFull
+
+logger = logging.getLogger(__name__)
+
+# Singleton cache — one instance per backend name, reused across all
+# requests so the S3 client and its connection pool are built only once.
+_INSTANCES: dict[str, AudioStorage] = {}
+_INSTANCES_LOCK = threading.Lock()
+
+_UPLOADER: Optional[BackgroundUploader] = None
 
 
 def get_storage(name: str) -> AudioStorage:
-    """Return a configured storage backend by name.
+    """Return a shared, configured storage backend by name.
 
-    Supported names: ``"local"``, ``"s3"``.
+    Supported names: ``"local"``, ``"s3"``, ``"memory"`` (benchmark stand-in).
     Configuration values are read from the application config (config.py).
     """
+    with _INSTANCES_LOCK:
+        if name not in _INSTANCES:
+            _INSTANCES[name] = _build(name)
+    return _INSTANCES[name]
+
+
+def _build(name: str) -> AudioStorage:
+    """Construct storage backend *name* from the application config."""
     import config  # local import to avoid circular dependency at module level
 
-    print(f"get_storage: name={name}")
+    logger.debug("Creating storage backend '%s'", name)
 
     if name == "local":
         return LocalStorage(output_dir=config.LOCAL_OUTPUT_DIR)
@@ -24,11 +47,45 @@ def get_storage(name: str) -> AudioStorage:
             presign_ttl=config.S3_PRESIGN_TTL,
             aws_access_key_id=config.AWS_ACCESS_KEY_ID or None,
             aws_secret_access_key=config.AWS_SECRET_ACCESS_KEY or None,
+            endpoint_url=config.S3_ENDPOINT_URL or None,
+            max_pool_connections=config.S3_MAX_POOL_CONNECTIONS,
+            max_attempts=config.S3_MAX_ATTEMPTS,
+            multipart_part_size=config.S3_MULTIPART_PART_SIZE,
         )
 
+    if name == "memory":
+        return MemoryStorage()
+
     raise ValueError(
-        f"Unknown storage backend '{name}'. Available: local, s3"
+        f"Unknown storage backend '{name}'. Available: local, s3, memory"
     )
 
 
-__all__ = ["AudioStorage", "SaveResult", "LocalStorage", "S3Storage", "get_storage"]
+def get_uploader() -> BackgroundUploader:
+    """Return the process-wide background uploader, starting it on first use."""
+    import config  # local import to avoid circular dependency at module level
+
+    global _UPLOADER
+    with _INSTANCES_LOCK:
+        if _UPLOADER is None:
+            _UPLOADER = BackgroundUploader(
+                workers=config.UPLOAD_WORKERS,
+                max_queue=config.UPLOAD_QUEUE_SIZE,
+                max_attempts=config.UPLOAD_MAX_ATTEMPTS,
+                status_ttl=config.UPLOAD_STATUS_TTL,
+            )
+    return _UPLOADER
+
+
+__all__ = [
+    "AudioStorage",
+    "AudioWriter",
+    "BackgroundUploader",
+    "LocalStorage",
+    "MemoryStorage",
+    "S3Storage",
+    "SaveResult",
+    "UploadQueueFull",
+    "get_storage",
+    "get_uploader",
+]
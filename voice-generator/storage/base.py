@@ -1,6 +1,10 @@
+import tempfile
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from .uploader import BackgroundUploader
 
 
 @dataclass
@@ -14,6 +18,62 @@ class SaveResult:
     content_type: str = "audio/wav"
     # Backend that performed the save
     backend: str = "unknown"
+    # Set when the data is still being uploaded in the background
+    upload_id: Optional[str] = None
+
+
+class AudioWriter(ABC):
+    """Incremental writer returned by `AudioStorage.open_writer`.
+
+    Call `write` any number of times, then `close` to commit, or `abort` to
+    discard everything written so far.
+    """
+
+    @abstractmethod
+    def write(self, data: bytes) -> None:
+        """Append *data* to the object being written."""
+        ...
+
+    @abstractmethod
+    def close(self, header: Optional[bytes] = None) -> SaveResult:
+        """Commit the object and return a SaveResult.
+
+        If *header* is given it replaces the first ``len(header)`` bytes
+        written. This lets encoders fix up a length field once the total
+        size is known (e.g. the WAV header).
+        """
+        ...
+
+    @abstractmethod
+    def abort(self) -> None:
+        """Discard the partially written object."""
+        ...
+
+
+class _SpooledWriter(AudioWriter):
+    """Fallback writer: spool to a temp file, then call `AudioStorage.save`."""
+
+    def __init__(self, storage: "AudioStorage", filename: str, content_type: str) -> None:
+        self._storage = storage
+        self._filename = filename
+        self._content_type = content_type
+        self._spool = tempfile.TemporaryFile()
+
+    def write(self, data: bytes) -> None:
+        self._spool.write(data)
+
+    def close(self, header: Optional[bytes] = None) -> SaveResult:
+        try:
+            if header:
+                self._spool.seek(0)
+                self._spool.write(header)
+            self._spool.seek(0)
+            return self._storage.save(self._spool.read(), self._filename, self._content_type)
+        finally:
+            self._spool.close()
+
+    def abort(self) -> None:
+        self._spool.close()
 
 
 class AudioStorage(ABC):
@@ -22,6 +82,9 @@ class AudioStorage(ABC):
     To add a new backend:
     1. Subclass AudioStorage and implement `save`.
     2. Register it in storage/__init__.py under a unique key.
+
+    Backends that can persist data incrementally should also override
+    `open_writer` so long recordings never have to be held in memory.
     """
 
     @abstractmethod
@@ -33,3 +96,26 @@ class AudioStorage(ABC):
     ) -> SaveResult:
         """Persist *data* under *filename* and return a SaveResult."""
         ...
+
+    def save_async(
+        self,
+        data: bytes,
+        filename: str,
+        uploader: "BackgroundUploader",
+        content_type: str = "audio/wav",
+    ) -> SaveResult:
+        """Return where *data* will be stored and persist it in the background.
+
+        Backends with slow writes (e.g. S3) override this to hand the write
+        to *uploader* and return immediately with ``SaveResult.upload_id``
+        set. The default simply saves synchronously.
+        """
+        return self.save(data, filename, content_type)
+
+    def open_writer(self, filename: str, content_type: str = "audio/wav") -> AudioWriter:
+        """Return an AudioWriter that persists data under *filename* as it arrives.
+
+        The default spools to a temporary file and calls `save` on close,
+        which reads the whole file back into memory. Override it to stream.
+        """
+        return _SpooledWriter(self, filename, content_type)
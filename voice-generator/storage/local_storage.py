@@ -1,7 +1,44 @@
 import os
+import tempfile
 from pathlib import Path
+from typing import Optional
 
-from .base import AudioStorage, SaveResult
+from .base import AudioStorage, AudioWriter, SaveResult
+
+
+class _LocalWriter(AudioWriter):
+    """Append to a temp file next to the destination, then rename it in place."""
+
+    def __init__(self, dest: Path, content_type: str) -> None:
+        self._dest = dest
+        self._content_type = content_type
+        fd, self._tmp = tempfile.mkstemp(dir=dest.parent, prefix=f".{dest.name}.", suffix=".part")
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, data: bytes) -> None:
+        self._file.write(data)
+
+    def close(self, header: Optional[bytes] = None) -> SaveResult:
+        try:
+            if header:
+                self._file.seek(0)
+                self._file.write(header)
+            self._file.close()
+            os.replace(self._tmp, self._dest)
+        except BaseException:
+            self.abort()
+            raise
+        return SaveResult(
+            location=str(self._dest.resolve()),
+            url=None,
+            content_type=self._content_type,
+            backend="local",
+        )
+
+    def abort(self) -> None:
+        self._file.close()
+        if os.path.exists(self._tmp):
+            os.remove(self._tmp)
 
 
 class LocalStorage(AudioStorage):
@@ -29,3 +66,6 @@ class LocalStorage(AudioStorage):
             content_type=content_type,
             backend="local",
         )
+
+    def open_writer(self, filename: str, content_type: str = "audio/wav") -> AudioWriter:
+        return _LocalWriter(self.output_dir / filename, content_type)
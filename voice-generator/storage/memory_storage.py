@@ -0,0 +1,63 @@
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from .base import AudioStorage, AudioWriter, SaveResult
+
+
+class _MemoryWriter(AudioWriter):
+    def __init__(self, storage: "MemoryStorage", filename: str, content_type: str) -> None:
+        self._storage = storage
+        self._filename = filename
+        self._content_type = content_type
+        self._buffer = bytearray()
+
+    def write(self, data: bytes) -> None:
+        self._buffer += data
+
+    def close(self, header: Optional[bytes] = None) -> SaveResult:
+        if header:
+            self._buffer[: len(header)] = header
+        return self._storage.save(bytes(self._buffer), self._filename, self._content_type)
+
+    def abort(self) -> None:
+        self._buffer = bytearray()
+
+
+class MemoryStorage(AudioStorage):
+    """Keep saved audio in process memory.
+
+    A stand-in backend for benchmarks and tests: it measures server
+    overhead without disk or network I/O. Only the most recent
+    *max_objects* files are retained.
+    """
+
+    def __init__(self, max_objects: int = 256) -> None:
+        self.max_objects = max(1, max_objects)
+        self._objects: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def save(
+        self,
+        data: bytes,
+        filename: str,
+        content_type: str = "audio/wav",
+    ) -> SaveResult:
+        with self._lock:
+            self._objects[filename] = data
+            self._objects.move_to_end(filename)
+            while len(self._objects) > self.max_objects:
+                self._objects.popitem(last=False)
+        return SaveResult(
+            location=f"memory://{filename}",
+            url=None,
+            content_type=content_type,
+            backend="memory",
+        )
+
+    def open_writer(self, filename: str, content_type: str = "audio/wav") -> AudioWriter:
+        return _MemoryWriter(self, filename, content_type)
+
+    def get(self, filename: str) -> Optional[bytes]:
+        with self._lock:
+            return self._objects.get(filename)
@@ -1,10 +1,107 @@
 import io
 from typing import Optional
 
-import boto3
-from botocore.exceptions import ClientError
+from .base import AudioStorage, AudioWriter, SaveResult
+from .uploader import BackgroundUploader
 
-from .base import AudioStorage, SaveResult
+# S3 rejects multipart parts smaller than this (except the last one)
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+class _S3MultipartWriter(AudioWriter):
+    """Stream an object to S3 as a multipart upload with bounded memory.
+
+    Part 1 is held back until `close` so that its leading bytes (e.g. a WAV
+    header) can still be patched. Every later part is uploaded as soon as
+    *part_size* bytes have accumulated. Peak memory is about two parts
+    regardless of the object size. Objects that never fill more than a part
+    or two are sent with a single put_object instead.
+    """
+
+    def __init__(
+        self,
+        storage: "S3Storage",
+        key: str,
+        content_type: str,
+        part_size: int,
+    ) -> None:
+        self._storage = storage
+        self._key = key
+        self._content_type = content_type
+        self._part_size = max(part_size, MIN_PART_SIZE)
+        self._first = bytearray()
+        self._buffer = bytearray()
+        self._parts: list[dict] = []
+        self._upload_id: Optional[str] = None
+
+    def _upload_part(self, number: int, body: bytes) -> None:
+        s3 = self._storage._s3
+        if self._upload_id is None:
+            self._upload_id = s3.create_multipart_upload(
+                Bucket=self._storage.bucket,
+                Key=self._key,
+                ContentType=self._content_type,
+            )["UploadId"]
+        response = s3.upload_part(
+            Bucket=self._storage.bucket,
+            Key=self._key,
+            UploadId=self._upload_id,
+            PartNumber=number,
+            Body=body,
+        )
+        self._parts.append({"PartNumber": number, "ETag": response["ETag"]})
+
+    def write(self, data: bytes) -> None:
+        room = self._part_size - len(self._first)
+        if room > 0:
+            self._first += data[:room]
+            data = data[room:]
+        if not data:
+            return
+        self._buffer += data
+        while len(self._buffer) >= self._part_size:
+            self._upload_part(len(self._parts) + 2, bytes(self._buffer[: self._part_size]))
+            del self._buffer[: self._part_size]
+
+    def close(self, header: Optional[bytes] = None) -> SaveResult:
+        if header:
+            self._first[: len(header)] = header
+        try:
+            if self._upload_id is None:
+                self._storage._put(bytes(self._first + self._buffer), self._key, self._content_type)
+            else:
+                if self._buffer:
+                    self._upload_part(len(self._parts) + 2, bytes(self._buffer))
+                self._upload_part(1, bytes(self._first))
+                self._storage._s3.complete_multipart_upload(
+                    Bucket=self._storage.bucket,
+                    Key=self._key,
+                    UploadId=self._upload_id,
+                    MultipartUpload={
+                        "Parts": sorted(self._parts, key=lambda p: p["PartNumber"])
+                    },
+                )
+        except BaseException:
+            self.abort()
+            raise
+        finally:
+            self._first.clear()
+            self._buffer.clear()
+        return self._storage._result(self._key, self._content_type)
+
+    def abort(self) -> None:
+        from botocore.exceptions import ClientError  # noqa: PLC0415
+
+        if self._upload_id is not None:
+            try:
+                self._storage._s3.abort_multipart_upload(
+                    Bucket=self._storage.bucket,
+                    Key=self._key,
+                    UploadId=self._upload_id,
+                )
+            except ClientError:
+                pass
+            self._upload_id = None
 
 
 class S3Storage(AudioStorage):
@@ -16,6 +113,11 @@ class S3Storage(AudioStorage):
     A pre-signed URL (valid for *presign_ttl* seconds) is generated and
     returned in SaveResult.url so callers can share or redirect to it
     immediately without additional roundtrips.
+
+    Instances are meant to be long-lived (see storage/__init__.py): the
+    boto3 client keeps a pool of up to *max_pool_connections* keep-alive
+    connections that is reused across saves. *endpoint_url* points the
+    client at an S3-compatible stand-in such as MinIO or moto.
     """
 
     def __init__(
@@ -26,24 +128,38 @@ class S3Storage(AudioStorage):
         presign_ttl: int = 3600,
         aws_access_key_id: Optional[str] = None,
         aws_secret_access_key: Optional[str] = None,
+        endpoint_url: Optional[str] = None,
+        max_pool_connections: int = 32,
+        max_attempts: int = 3,
+        multipart_part_size: int = 8 * 1024 * 1024,
     ) -> None:
         self.bucket = bucket
+        self.multipart_part_size = multipart_part_size
         self.prefix = prefix.rstrip("/") + "/"
         self.presign_ttl = presign_ttl
+
+        # Imported here so the service starts without paying for boto3
+        # unless the S3 backend is actually used
+        import boto3  # noqa: PLC0415
+        from botocore.config import Config  # noqa: PLC0415
+
         self._s3 = boto3.client(
             "s3",
             region_name=region,
+            endpoint_url=endpoint_url,
             aws_access_key_id=aws_access_key_id,
             aws_secret_access_key=aws_secret_access_key,
+            config=Config(
+                max_pool_connections=max_pool_connections,
+                retries={"max_attempts": max_attempts, "mode": "standard"},
+                tcp_keepalive=True,
+            ),
         )
 
-    def save(
-        self,
-        data: bytes,
-        filename: str,
-        content_type: str = "audio/wav",
-    ) -> SaveResult:
-        key = f"{self.prefix}{filename}"
+    def _key(self, filename: str) -> str:
+        return f"{self.prefix}{filename}"
+
+    def _put(self, data: bytes, key: str, content_type: str) -> None:
         self._s3.put_object(
             Bucket=self.bucket,
             Key=key,
@@ -51,6 +167,9 @@ class S3Storage(AudioStorage):
             ContentType=content_type,
         )
 
+    def _result(self, key: str, content_type: str, upload_id: Optional[str] = None) -> SaveResult:
+        from botocore.exceptions import ClientError  # noqa: PLC0415
+
         try:
             url = self._s3.generate_presigned_url(
                 "get_object",
@@ -65,4 +184,39 @@ class S3Storage(AudioStorage):
             url=url,
             content_type=content_type,
             backend="s3",
+            upload_id=upload_id,
+        )
+
+    def save(
+        self,
+        data: bytes,
+        filename: str,
+        content_type: str = "audio/wav",
+    ) -> SaveResult:
+        key = self._key(filename)
+        self._put(data, key, content_type)
+        return self._result(key, content_type)
+
+    def save_async(
+        self,
+        data: bytes,
+        filename: str,
+        uploader: BackgroundUploader,
+        content_type: str = "audio/wav",
+    ) -> SaveResult:
+        """Queue the upload and return the key and pre-signed URL right away.
+
+        The URL is valid as soon as the upload completes; poll the returned
+        ``upload_id`` to find out when that is.
+        """
+        key = self._key(filename)
+        upload_id = uploader.submit(
+            lambda: self._put(data, key, content_type),
+            location=f"s3://{self.bucket}/{key}",
+        )
+        return self._result(key, content_type, upload_id=upload_id)
+
+    def open_writer(self, filename: str, content_type: str = "audio/wav") -> AudioWriter:
+        return _S3MultipartWriter(
+            self, self._key(filename), content_type, self.multipart_part_size
         )
@@ -0,0 +1,127 @@
+import logging
+import queue
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class UploadQueueFull(Exception):
+    """Raised when the background upload queue cannot take more work."""
+
+
+@dataclass
+class UploadStatus:
+    upload_id: str
+    location: str
+    # pending → uploading → done | failed
+    status: str = "pending"
+    attempts: int = 0
+    error: Optional[str] = None
+    submitted_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class _Job:
+    status: UploadStatus
+    upload: Callable[[], None]
+
+
+class BackgroundUploader:
+    """Run uploads on a small pool of threads behind a bounded queue.
+
+    Each job is retried up to *max_attempts* times with exponential backoff
+    starting at *backoff* seconds. Statuses are kept in memory for
+    *status_ttl* seconds after the job finishes so callers can poll them.
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        max_queue: int = 256,
+        max_attempts: int = 3,
+        backoff: float = 0.5,
+        status_ttl: float = 3600.0,
+    ) -> None:
+        self.max_attempts = max(1, max_attempts)
+        self.backoff = backoff
+        self.status_ttl = status_ttl
+        self._queue: "queue.Queue[_Job]" = queue.Queue(maxsize=max_queue)
+        self._statuses: dict[str, UploadStatus] = {}
+        self._lock = threading.Lock()
+        for i in range(max(1, workers)):
+            threading.Thread(
+                target=self._run, name=f"s3-uploader-{i}", daemon=True
+            ).start()
+
+    def submit(self, upload: Callable[[], None], location: str) -> str:
+        """Queue *upload* and return its upload id.
+
+        Raises UploadQueueFull instead of blocking when the queue is full.
+        """
+        status = UploadStatus(upload_id=uuid.uuid4().hex, location=location)
+        with self._lock:
+            self._prune()
+            self._statuses[status.upload_id] = status
+        try:
+            self._queue.put_nowait(_Job(status=status, upload=upload))
+        except queue.Full:
+            with self._lock:
+                del self._statuses[status.upload_id]
+            raise UploadQueueFull("Upload queue is full")
+        return status.upload_id
+
+    def status(self, upload_id: str) -> Optional[dict]:
+        with self._lock:
+            status = self._statuses.get(upload_id)
+            return status.as_dict() if status is not None else None
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def _prune(self) -> None:
+        """Drop statuses that finished more than *status_ttl* ago.
+
+        Must be called with the lock held.
+        """
+        cutoff = time.time() - self.status_ttl
+        expired = [
+            upload_id for upload_id, status in self._statuses.items()
+            if status.finished_at is not None and status.finished_at < cutoff
+        ]
+        for upload_id in expired:
+            del self._statuses[upload_id]
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            status = job.status
+            status.status = "uploading"
+            for attempt in range(1, self.max_attempts + 1):
+                status.attempts = attempt
+                try:
+                    job.upload()
+                except Exception as exc:
+                    status.error = f"{type(exc).__name__}: {exc}"
+                    logger.warning(
+                        "Upload %s to %s failed (attempt %d/%d): %s",
+                        status.upload_id, status.location, attempt,
+                        self.max_attempts, status.error,
+                    )
+                    if attempt < self.max_attempts:
+                        time.sleep(self.backoff * 2 ** (attempt - 1))
+                    continue
+                status.status = "done"
+                status.error = None
+                break
+            else:
+                status.status = "failed"
+            status.finished_at = time.time()
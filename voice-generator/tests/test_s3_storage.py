@@ -0,0 +1,143 @@
+"""S3 multipart writer and background uploader, against moto's S3 stand-in."""
+import struct
+import threading
+import time
+
+import boto3
+import numpy as np
+import pytest
+from botocore.exceptions import ClientError
+from moto import mock_aws
+
+from audio import decode_wav, get_format, open_encoder
+from storage import BackgroundUploader, S3Storage
+from storage.s3_storage import MIN_PART_SIZE
+
+BUCKET = "voice-test"
+SAMPLE_RATE = 24000
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket=BUCKET)
+        yield S3Storage(bucket=BUCKET, prefix="out/", multipart_part_size=MIN_PART_SIZE)
+
+
+def _get(storage, key):
+    return storage._s3.get_object(Bucket=BUCKET, Key=key)["Body"].read()
+
+
+def _pending_uploads(storage):
+    return storage._s3.list_multipart_uploads(Bucket=BUCKET).get("Uploads", [])
+
+
+def _stream_wav(writer, seconds, chunk_seconds=1.0):
+    """Write *seconds* of a sine through a WAV encoder; return the samples."""
+    encoder = open_encoder(get_format("wav"), SAMPLE_RATE, writer.write)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    samples = (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+    step = int(chunk_seconds * SAMPLE_RATE)
+    for start in range(0, len(samples), step):
+        encoder.write(samples[start : start + step])
+    return samples, encoder.finish()
+
+
+def _wait_status(uploader, upload_id, statuses, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while (status := uploader.status(upload_id))["status"] not in statuses:
+        assert time.monotonic() < deadline, status
+        time.sleep(0.01)
+    return status
+
+
+def test_multipart_wav_gets_final_header(storage):
+    writer = storage.open_writer("long.wav")
+    # ~14 MB of PCM: part 1 is held back, part 2 goes up while writing and
+    # the rest as part 3 on close, followed by part 1 with the real header
+    samples, header = _stream_wav(writer, seconds=300)
+    assert [part["PartNumber"] for part in writer._parts] == [2]
+    result = writer.close(header=header)
+
+    assert result.location == f"s3://{BUCKET}/out/long.wav"
+    assert result.url
+    data = _get(storage, "out/long.wav")
+    assert len(data) == 44 + 2 * len(samples)
+    riff_size, = struct.unpack_from("<I", data, 4)
+    data_size, = struct.unpack_from("<I", data, 40)
+    assert riff_size == len(data) - 8
+    assert data_size == 2 * len(samples)
+    decoded, rate = decode_wav(data)
+    assert rate == SAMPLE_RATE
+    np.testing.assert_allclose(decoded, samples, atol=1 / 32767)
+    assert _pending_uploads(storage) == []
+
+
+def test_small_object_uses_single_put(storage):
+    writer = storage.open_writer("short.wav")
+    samples, header = _stream_wav(writer, seconds=2)
+    writer.close(header=header)
+
+    assert writer._upload_id is None
+    data = _get(storage, "out/short.wav")
+    assert data[:44] == header
+    assert len(data) == 44 + 2 * len(samples)
+
+
+def test_abort_discards_multipart_upload(storage):
+    writer = storage.open_writer("aborted.wav")
+    _stream_wav(writer, seconds=300)
+    assert len(_pending_uploads(storage)) == 1
+    writer.abort()
+
+    assert _pending_uploads(storage) == []
+    with pytest.raises(ClientError):
+        _get(storage, "out/aborted.wav")
+
+
+def test_failed_close_aborts_multipart_upload(storage, monkeypatch):
+    writer = storage.open_writer("broken.wav")
+    _, header = _stream_wav(writer, seconds=300)
+
+    def fail(**_kwargs):
+        raise ClientError({"Error": {"Code": "InternalError", "Message": "boom"}}, "CompleteMultipartUpload")
+
+    monkeypatch.setattr(storage._s3, "complete_multipart_upload", fail)
+    with pytest.raises(ClientError):
+        writer.close(header=header)
+
+    assert _pending_uploads(storage) == []
+    with pytest.raises(ClientError):
+        _get(storage, "out/broken.wav")
+
+
+def test_background_upload_pending_then_done(storage):
+    uploader = BackgroundUploader(workers=1, backoff=0)
+    # Occupy the only worker so the next upload stays queued
+    release = threading.Event()
+    uploader.submit(release.wait, location="blocker")
+
+    result = storage.save_async(b"RIFF-data", "async.wav", uploader)
+    assert result.upload_id
+    assert uploader.status(result.upload_id)["status"] == "pending"
+
+    release.set()
+    status = _wait_status(uploader, result.upload_id, ("done", "failed"))
+    assert status["status"] == "done"
+    assert status["attempts"] == 1
+    assert status["error"] is None
+    assert status["finished_at"] is not None
+    assert _get(storage, "out/async.wav") == b"RIFF-data"
+
+
+def test_background_upload_fails_after_retries(storage):
+    uploader = BackgroundUploader(workers=1, max_attempts=2, backoff=0)
+    storage.bucket = "missing-bucket"
+
+    result = storage.save_async(b"data", "lost.wav", uploader)
+    status = _wait_status(uploader, result.upload_id, ("done", "failed"))
+    assert status["status"] == "failed"
+    assert status["attempts"] == 2
+    assert "NoSuchBucket" in status["error"]
@@ -0,0 +1,101 @@
+"""Startup warmup and readiness tracking.
+
+`WarmupState.start` builds the configured models in a background thread,
+preloads their language pipelines and runs a short dummy synthesis for each
+language and voice in every inference worker process, so that weight
+loading, voice loading and first-call allocator/JIT costs are paid before
+real traffic arrives. ``GET /ready`` reports the state tracked here.
+"""
+import logging
+import threading
+import time
+from typing import Callable, Optional, TypeVar
+
+_T = TypeVar("_T")
+
+logger = logging.getLogger(__name__)
+
+
+class WarmupState:
+    """Progress of the warmup phase: pending → warming → ready | failed."""
+
+    def __init__(self) -> None:
+        self.status = "pending"
+        self.error: Optional[str] = None
+        self.steps: list[dict] = []
+        self.started_at: Optional[float] = None
+        self.seconds: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def mark_ready(self) -> None:
+        """Skip warmup and report ready immediately."""
+        with self._lock:
+            self.status = "ready"
+            self.seconds = 0.0
+
+    def start(self, models: list[str], languages: list[str], voices: list[str], text: str) -> threading.Thread:
+        """Run `run` in a daemon thread and return it."""
+        thread = threading.Thread(
+            target=self.run, args=(models, languages, voices, text), name="tts-warmup", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _step(self, name: str, fn: Callable[[], _T]) -> _T:
+        start = time.perf_counter()
+        result = fn()
+        seconds = time.perf_counter() - start
+        logger.info("Warmup: %s took %.2fs", name, seconds)
+        with self._lock:
+            self.steps.append({"step": name, "seconds": round(seconds, 4)})
+        return result
+
+    def run(self, models: list[str], languages: list[str], voices: list[str], text: str) -> None:
+        """Warm *models* for *languages* and *voices*; never raises."""
+        from models import get_model  # noqa: PLC0415
+        from models.base import TTSRequest  # noqa: PLC0415
+
+        with self._lock:
+            self.status = "warming"
+            self.started_at = time.perf_counter()
+        try:
+            for name in models:
+                model = self._step(f"load {name}", lambda: get_model(name))
+                self._step(f"preload {name} languages {','.join(languages)}", lambda: model.preload(languages))
+
+                # Every voice in the first language, then the first voice in
+                # each other language: loads each voice pack and pipeline
+                # once. No voices (or languages) skips the dummy synthesis.
+                pairs = []
+                if languages and voices:
+                    pairs = [(languages[0], voice) for voice in voices]
+                    pairs += [(language, voices[0]) for language in languages[1:]]
+                for language, voice in pairs:
+                    request = TTSRequest(text=text, voice=voice, language=language, extra={"cache": False})
+                    # In every inference worker, if the model runs in a pool
+                    self._step(f"synthesise {name} {language}/{voice}", lambda: model.warm(request))
+        except Exception as exc:
+            logger.exception("Warmup failed")
+            with self._lock:
+                self.status = "failed"
+                self.error = str(exc)
+                self.seconds = time.perf_counter() - self.started_at
+            return
+
+        with self._lock:
+            self.status = "ready"
+            self.seconds = time.perf_counter() - self.started_at
+        logger.info("Warmup finished in %.2fs", self.seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "status": self.status,
+                "warmup_seconds": round(self.seconds, 4) if self.seconds is not None else None,
+                "steps": list(self.steps),
+                "error": self.error,
+            }